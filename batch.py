@@ -0,0 +1,368 @@
+"""
+Headless batch redaction for whole directories of PDFs
+
+Usage:
+    python batch.py INPUT_DIR OUTPUT_DIR [--workers N] [--mode aggressive]
+
+Documents are processed concurrently on a pool of worker processes, each
+holding its own OCR models. Every finished document is appended to a JSONL
+manifest (OUTPUT_DIR/manifest.jsonl by default) with its status, stats,
+redaction spans and timings; re-running the same command resumes from the
+manifest and skips documents that already finished.
+
+A document that crashes its worker process (a segfault or the OOM killer
+on a malformed PDF) or runs past the per-document timeout is recorded as
+"failed", the pool is replaced and the other documents in flight are
+resubmitted. Documents in flight when a worker crashed are retried one at
+a time, so the crash is pinned on the document that caused it. Resuming
+skips failed documents unless --retry-failed is given.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Add project root to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import OCR_PROFILES, BATCH_DOCUMENT_TIMEOUT_SECONDS
+
+# Manifest statuses that count as done when resuming
+FINISHED_STATUSES = ("ok", "empty", "failed")
+
+# Seconds between checks of running documents against the timeout
+POLL_SECONDS = 1.0
+
+# Per-process state of a batch worker, set up by _init_worker
+_processor = None
+_errors = []
+_started = None
+
+def _init_worker(torch_threads, render_options, started=None):
+    """
+    Load the pipeline and OCR models once when a worker process starts
+
+    Args:
+        torch_threads (int): Torch intra-op threads for this worker
+        render_options (dict): OCRProcessor overrides (dpi, grayscale, batched, ocr_profile)
+        started (multiprocessing.Queue): Receives (relative path, start time)
+            of every document the worker starts, for the timeout
+    """
+    global _processor, _started
+    _started = started
+    import torch
+    from core.model_registry import get_model_registry
+    from core.reporting import set_error_handler
+    from utils.helpers import DocumentProcessor
+
+    torch.set_num_threads(torch_threads)
+    set_error_handler(_errors.append)
+    if "ocr_profile" in render_options:
+        get_model_registry().warmup(render_options["ocr_profile"])
+    else:
+        get_model_registry().warmup()
+    # Documents are already spread across processes; OCR stays in-process
+    _processor = DocumentProcessor(parallel=False, **render_options)
+
+def _process_file(input_path, relative_path, output_dir, mode, profile=False, ner=False):
+    """
+    Redact one document inside a worker and write its outputs
+
+    Args:
+        input_path (str): Path of the source PDF
+        relative_path (str): Path relative to the input directory, used as the manifest key
+        output_dir (str): Root output directory
+        mode (str): "conservative" or "aggressive"
+        profile (bool): Save per-stage profiles of the document
+        ner (bool): Also redact names and organizations (aggressive mode)
+
+    Returns:
+        dict: Manifest record for the document
+    """
+    from core.ingest import SpooledDocument
+
+    del _errors[:]
+    if _started is not None:
+        _started.put((relative_path, time.time()))
+    started = time.perf_counter()
+    record = {"file": relative_path, "status": "ok", "outputs": [], "stats": None}
+    try:
+        redaction_mode = "Conservative" if mode == "conservative" else "Aggressive"
+        # Opened by path; the document is never read into memory whole
+        pdf_file = SpooledDocument(input_path)
+        redacted_text, output_pdf, output_word, stats = _processor.process_document(
+            pdf_file, redaction_mode, profile=profile, ner=ner
+        )
+
+        if redacted_text is None:
+            record["status"] = "error" if _errors else "empty"
+        else:
+            record["stats"] = stats
+            # Redaction records without the redacted values, for downstream audit
+            record["spans"] = [span.to_dict() for span in _processor.spans]
+            base = os.path.join(output_dir, os.path.splitext(relative_path)[0] + ".redacted")
+            os.makedirs(os.path.dirname(base), exist_ok=True)
+            for temp_path, extension in ((output_pdf, ".pdf"), (output_word, ".docx")):
+                if temp_path:
+                    shutil.move(temp_path, base + extension)
+                    record["outputs"].append(os.path.relpath(base + extension, output_dir))
+                else:
+                    record["status"] = "error"
+    except Exception as e:
+        record["status"] = "error"
+        _errors.append(str(e))
+
+    if _errors:
+        record["error"] = "; ".join(_errors)
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+def find_pdfs(input_dir):
+    """
+    List PDFs under a directory
+
+    Args:
+        input_dir (str): Directory to scan recursively
+
+    Returns:
+        list: (absolute path, path relative to input_dir) pairs, sorted
+    """
+    pdfs = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                pdfs.append((path, os.path.relpath(path, input_dir)))
+    return sorted(pdfs, key=lambda pdf: pdf[1])
+
+def load_finished(manifest_path, retry_failed=False):
+    """
+    Read the files already finished in an existing manifest
+
+    Args:
+        manifest_path (str): Path to the JSONL manifest
+        retry_failed (bool): Leave out documents that crashed or timed out,
+            so they are processed again
+
+    Returns:
+        set: Relative paths of finished documents
+    """
+    statuses = [status for status in FINISHED_STATUSES if not (retry_failed and status == "failed")]
+    finished = set()
+    if not os.path.exists(manifest_path):
+        return finished
+    with open(manifest_path, encoding="utf-8") as manifest:
+        for line in manifest:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partially written line from an interrupted run
+            if record.get("status") in statuses:
+                finished.add(record["file"])
+    return finished
+
+def _failed_record(relative_path, error, seconds=0.0):
+    """Manifest record of a document that crashed its worker or timed out"""
+    return {"file": relative_path, "status": "failed", "outputs": [], "stats": None,
+            "error": error, "seconds": round(seconds, 3)}
+
+def _start_pool(workers, torch_threads, render_options, started):
+    """Start a pool of batch worker processes reporting document starts to ``started``"""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(torch_threads, render_options, started)
+    )
+
+def _stop_pool(pool):
+    """Shut a pool down without waiting for the documents it is running"""
+    terminate = getattr(pool, "terminate_workers", None)  # Python 3.14+
+    if terminate is not None:
+        terminate()
+        return
+    # Earlier versions have no public way to stop a running task
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+def run_batch(input_dir, output_dir, workers=2, mode="conservative", manifest_path=None,
+              torch_threads=1, profile=False, render_options=None, ner=False,
+              timeout=BATCH_DOCUMENT_TIMEOUT_SECONDS, retry_failed=False):
+    """
+    Redact every PDF under input_dir, resuming from the manifest
+
+    Args:
+        input_dir (str): Directory with source PDFs
+        output_dir (str): Directory for redacted outputs
+        workers (int): Number of worker processes
+        mode (str): "conservative" or "aggressive"
+        manifest_path (str): JSONL manifest path, defaults to OUTPUT_DIR/manifest.jsonl
+        torch_threads (int): Torch threads per worker
+        profile (bool): Save per-stage profiles of every document
+        render_options (dict): OCRProcessor overrides (dpi, grayscale, batched, ocr_profile)
+        ner (bool): Also redact names and organizations (aggressive mode)
+        timeout (float): Seconds a document may run on a worker, 0 for no limit
+        retry_failed (bool): Process documents that failed in an earlier run again
+
+    Returns:
+        dict: Document counts per status for this run
+    """
+    manifest_path = manifest_path or os.path.join(output_dir, "manifest.jsonl")
+    os.makedirs(output_dir, exist_ok=True)
+    finished = load_finished(manifest_path, retry_failed)
+    todo = [pdf for pdf in find_pdfs(input_dir) if pdf[1] not in finished]
+    logging.info("%d documents to process, %d already finished", len(todo), len(finished))
+
+    counts = {"ok": 0, "empty": 0, "error": 0, "failed": 0}
+    pending = iter(todo)
+    retries = deque()  # Documents interrupted when the pool was replaced
+    suspects = deque()  # Documents in flight when a worker crashed, retried one at a time
+    in_flight = {}  # future -> (absolute path, relative path)
+    # Workers report when they start a document: queued documents and worker
+    # start-up do not count against the timeout
+    started_queue = multiprocessing.get_context("spawn").Queue()
+    started_at = {}  # relative path -> start time
+    pool = _start_pool(workers, torch_threads, render_options or {}, started_queue)
+
+    with open(manifest_path, "a", encoding="utf-8") as manifest:
+        def write(record):
+            counts[record["status"]] += 1
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+            logging.info("%s: %s (%.1fs)", record["file"], record["status"], record["seconds"])
+
+        try:
+            while True:
+                # Keep a bounded number of documents queued instead of one future per file
+                while len(in_flight) < (1 if suspects else workers * 2):
+                    if suspects:
+                        pdf = suspects.popleft()
+                    elif retries:
+                        pdf = retries.popleft()
+                    else:
+                        pdf = next(pending, None)
+                    if pdf is None:
+                        break
+                    future = pool.submit(_process_file, pdf[0], pdf[1], output_dir, mode, profile, ner)
+                    in_flight[future] = pdf
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+                crashed = False
+                for future in done:
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        crashed = True
+                        continue  # Handled with the rest of the pool below
+                    pdf = in_flight.pop(future)
+                    started_at.pop(pdf[1], None)
+                    try:
+                        write(future.result())
+                    except Exception as e:
+                        write(_failed_record(pdf[1], str(e)))
+
+                while True:
+                    try:
+                        relative_path, started = started_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    started_at[relative_path] = started
+                now = time.time()
+                timed_out = [future for future, pdf in in_flight.items()
+                             if timeout and now - started_at.get(pdf[1], now) > timeout]
+                if not crashed and not timed_out:
+                    continue
+
+                # The pool cannot go on: replace it and resubmit what it was running
+                _stop_pool(pool)
+                pool = _start_pool(workers, torch_threads, render_options or {}, started_queue)
+                for future in timed_out:
+                    pdf = in_flight.pop(future)
+                    write(_failed_record(pdf[1], f"Timed out after {timeout} seconds",
+                                         now - started_at.pop(pdf[1])))
+                interrupted = []
+                for future, pdf in in_flight.items():
+                    if future.done() and future.exception() is None:
+                        write(future.result())
+                    else:
+                        interrupted.append(pdf)
+                in_flight.clear()
+                if crashed and len(interrupted) == 1:
+                    # It ran alone, so it is the document that crashed the worker
+                    relative_path = interrupted[0][1]
+                    write(_failed_record(relative_path, "Worker process crashed "
+                                         "(out of memory or a malformed PDF)",
+                                         now - started_at.get(relative_path, now)))
+                elif crashed:
+                    logging.warning("A worker crashed; retrying %d documents one at a time",
+                                    len(interrupted))
+                    suspects.extend(interrupted)
+                else:
+                    retries.extend(interrupted)
+                for pdf in interrupted:
+                    started_at.pop(pdf[1], None)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return counts
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Redact every PDF in a directory")
+    parser.add_argument("input_dir", help="Directory with source PDFs (scanned recursively)")
+    parser.add_argument("output_dir", help="Directory for redacted PDF and Word outputs")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                        help="Number of worker processes")
+    parser.add_argument("--torch-threads", type=int, default=1,
+                        help="Torch threads per worker")
+    parser.add_argument("--mode", choices=["conservative", "aggressive"], default="conservative",
+                        help="Redaction mode")
+    parser.add_argument("--manifest", help="JSONL manifest path (default: OUTPUT_DIR/manifest.jsonl)")
+    parser.add_argument("--timeout", type=float, default=BATCH_DOCUMENT_TIMEOUT_SECONDS,
+                        help="Seconds a document may run before it is stopped and "
+                             "recorded as failed (0: no limit)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Process documents that crashed or timed out in an earlier run again")
+    parser.add_argument("--dpi", type=int, help="OCR render resolution (default: RENDER_DPI)")
+    parser.add_argument("--color", action="store_true",
+                        help="Render pages in RGB instead of grayscale for OCR")
+    parser.add_argument("--batched-ocr", action="store_true",
+                        help="Recognize text regions of several pages in shared batches")
+    parser.add_argument("--ocr-profile", choices=list(OCR_PROFILES),
+                        help="OCR engine profile (default: OCR_PROFILE)")
+    parser.add_argument("--ner", action="store_true",
+                        help="Also redact names and organizations with spaCy (aggressive mode)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Save cProfile and tracemalloc artifacts per stage (see PROFILE_OUTPUT_DIR)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    render_options = {}
+    if args.dpi:
+        render_options["dpi"] = args.dpi
+    if args.color:
+        render_options["grayscale"] = False
+    if args.batched_ocr:
+        render_options["batched"] = True
+    if args.ocr_profile:
+        render_options["ocr_profile"] = args.ocr_profile
+    counts = run_batch(args.input_dir, args.output_dir, workers=args.workers, mode=args.mode,
+                       manifest_path=args.manifest, torch_threads=args.torch_threads,
+                       profile=args.profile, render_options=render_options, ner=args.ner,
+                       timeout=args.timeout, retry_failed=args.retry_failed)
+    print(json.dumps(counts))
+    return 1 if counts["error"] or counts["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
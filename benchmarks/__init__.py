@@ -0,0 +1,3 @@
+"""
+Benchmark suite for the Document Redaction System
+"""
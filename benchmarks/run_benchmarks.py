@@ -0,0 +1,235 @@
+"""
+Throughput and accuracy benchmarks for the redaction pipeline
+
+Usage:
+    python -m benchmarks.run_benchmarks [--scenarios text-20 scan-10] [--mode aggressive]
+                                        [--ocr-profiles fast accurate]
+                                        [--output results.json] [--baseline baseline.json]
+                                        [--save-baseline baseline.json]
+
+Each scenario runs in a fresh process so peak RSS is measured per scenario.
+Reported per scenario: pages/sec, per-stage latency (OCR per page,
+redaction, export), peak RSS and detection recall on the planted PII.
+With --ner, the spaCy entity pass is timed separately from the regex
+engine so its per-page cost can be checked against NER_PAGE_BUDGET_MS.
+Given several OCR engine profiles, every scenario runs once per profile
+so their speed and recall can be compared side by side.
+When a baseline is given, throughput drops or recall losses beyond the
+tolerance are reported as regressions and the exit code is non-zero.
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import SCENARIOS, generate_document
+from config.settings import OCR_PROFILES, OCR_PROFILE
+
+def run_scenario(scenario, mode="aggressive", seed=0, ocr_options=None, ner=False):
+    """
+    Run one scenario through OCR, redaction and export
+
+    Args:
+        scenario (dict): Entry from SCENARIOS
+        mode (str): "conservative" or "aggressive"
+        seed (int): Random seed for document generation
+        ocr_options (dict): OCRProcessor overrides, e.g. dpi, grayscale, batched
+            and ocr_profile
+        ner (bool): Also run the spaCy name detector before redaction
+
+    Returns:
+        dict: Metrics for the scenario
+    """
+    from core.ocr_processor import OCRProcessor
+    from core.redactor import TextRedactor
+    from core.file_handler import FileHandler
+
+    pdf_bytes, planted = generate_document(
+        scenario["kind"], scenario["pages"], scenario["noise"], seed=seed
+    )
+    # The OCR cache would turn repeat runs into cache reads
+    ocr_processor = OCRProcessor(use_cache=False, **(ocr_options or {}))
+    text_redactor = TextRedactor()
+    file_handler = FileHandler()
+
+    # Extraction, timed per page as it streams out
+    page_times = []
+    page_texts = []
+    started = time.perf_counter()
+    last = started
+    for page in ocr_processor.iter_pages(io.BytesIO(pdf_bytes)):
+        now = time.perf_counter()
+        page_times.append(now - last)
+        page_texts.append(page.text)
+        last = now
+    extract_seconds = last - started
+
+    # Entity detection, in the same page batches as the pipeline
+    entity_spans = [None] * len(page_texts)
+    ner_stats = {}
+    started = time.perf_counter()
+    if ner:
+        from core.ner_detector import NERDetector
+        detector = NERDetector()
+        for offset in range(0, len(page_texts), detector.batch_size):
+            batch = page_texts[offset:offset + detector.batch_size]
+            entity_spans[offset:offset + len(batch)] = detector.find_spans(batch)
+        ner_stats = detector.get_stats()
+    ner_seconds = time.perf_counter() - started
+
+    # Redaction
+    started = time.perf_counter()
+    redacted_pages = [
+        text_redactor.redact_with_spans(text, mode=mode, entity_spans=spans)[0]
+        for text, spans in zip(page_texts, entity_spans)
+    ]
+    redact_seconds = time.perf_counter() - started
+    redacted_text = "\n".join(redacted_pages)
+
+    # Export
+    started = time.perf_counter()
+    outputs = file_handler.create_output_files(redacted_text)
+    export_seconds = time.perf_counter() - started
+    for path in outputs:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    # Recall: a planted value counts as detected when extraction recovered it
+    # and redaction removed it; values lost by OCR count as missed
+    extracted_text = "\n".join(page_texts)
+    detected = {}
+    for _, redaction_type, value in planted:
+        found, total = detected.get(redaction_type, (0, 0))
+        hit = value in extracted_text and value not in redacted_text
+        detected[redaction_type] = (found + hit, total + 1)
+    found_total = sum(found for found, _ in detected.values())
+
+    total_seconds = extract_seconds + ner_seconds + redact_seconds + export_seconds
+    return {
+        "scenario": scenario["name"],
+        "ocr_profile": ocr_processor.ocr_profile,
+        "pages": scenario["pages"],
+        "pages_per_sec": round(scenario["pages"] / total_seconds, 3),
+        "extract_seconds": round(extract_seconds, 4),
+        "page_latency_p50": round(statistics.median(page_times), 4),
+        "page_latency_max": round(max(page_times), 4),
+        "redact_seconds": round(redact_seconds, 4),
+        "redact_ms_per_page": round(1000 * redact_seconds / scenario["pages"], 3),
+        "ner_seconds": round(ner_seconds, 4),
+        "ner": ner_stats,
+        "export_seconds": round(export_seconds, 4),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "recall": round(found_total / len(planted), 4),
+        "recall_by_type": {
+            redaction_type: round(found / total, 4)
+            for redaction_type, (found, total) in sorted(detected.items())
+        },
+        "page_sources": ocr_processor.get_extraction_stats()
+    }
+
+def run_isolated(scenario, mode, seed, ocr_options=None, ner=False):
+    """Run a scenario in a fresh spawned process so peak RSS is its own"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_scenario, scenario, mode, seed, ocr_options, ner).result()
+
+def compare_to_baseline(results, baseline, tolerance=0.1):
+    """
+    Compare results against a stored baseline
+
+    Args:
+        results (list): Metrics from run_scenario
+        baseline (list): Previously saved metrics
+        tolerance (float): Allowed relative throughput drop
+
+    Returns:
+        list: Human-readable regression descriptions
+    """
+    baseline_by_name = {(entry["scenario"], entry.get("ocr_profile")): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_name.get((result["scenario"], result["ocr_profile"]))
+        if base is None:
+            continue
+        name = f"{result['scenario']}/{result['ocr_profile']}"
+        if result["pages_per_sec"] < base["pages_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: pages/sec {result['pages_per_sec']} < baseline {base['pages_per_sec']}"
+            )
+        if result["recall"] < base["recall"]:
+            regressions.append(f"{name}: recall {result['recall']} < baseline {base['recall']}")
+    return regressions
+
+def print_report(results):
+    """Print a summary table of scenario metrics"""
+    header = (f"{'scenario':<16}{'OCR':<10}{'pages/s':>10}{'p50 page s':>12}{'redact s':>10}"
+              f"{'NER ms/pg':>11}{'export s':>10}{'RSS MB':>9}{'recall':>8}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['scenario']:<16}{result['ocr_profile']:<10}{result['pages_per_sec']:>10}"
+              f"{result['page_latency_p50']:>12}{result['redact_seconds']:>10}"
+              f"{result['ner'].get('ner_ms_per_page', '-'):>11}"
+              f"{result['export_seconds']:>10}{result['peak_rss_mb']:>9}{result['recall']:>8}")
+
+def main(argv=None):
+    """Command-line entry point"""
+    names = [scenario["name"] for scenario in SCENARIOS]
+    parser = argparse.ArgumentParser(description="Benchmark the redaction pipeline")
+    parser.add_argument("--scenarios", nargs="+", choices=names, default=names)
+    parser.add_argument("--mode", choices=["conservative", "aggressive"], default="aggressive")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dpi", type=int, help="OCR render resolution (default: RENDER_DPI)")
+    parser.add_argument("--color", action="store_true", help="Render RGB instead of grayscale")
+    parser.add_argument("--batched-ocr", action="store_true",
+                        help="Recognize text regions of several pages in shared batches")
+    parser.add_argument("--ocr-profiles", nargs="+", choices=list(OCR_PROFILES), default=[OCR_PROFILE],
+                        help="OCR engine profiles to compare")
+    parser.add_argument("--ner", action="store_true",
+                        help="Time the spaCy name detector next to the regex engine")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a saved results file")
+    parser.add_argument("--save-baseline", help="Save these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative pages/sec drop against the baseline")
+    args = parser.parse_args(argv)
+
+    ocr_options = {}
+    if args.dpi:
+        ocr_options["dpi"] = args.dpi
+    if args.color:
+        ocr_options["grayscale"] = False
+    if args.batched_ocr:
+        ocr_options["batched"] = True
+
+    results = [
+        run_isolated(scenario, args.mode, args.seed, dict(ocr_options, ocr_profile=profile), args.ner)
+        for scenario in SCENARIOS if scenario["name"] in args.scenarios
+        for profile in args.ocr_profiles
+    ]
+    print_report(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
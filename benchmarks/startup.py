@@ -0,0 +1,183 @@
+"""
+Cold-start benchmark: import time and memory of each entry point
+
+Usage:
+    python -m benchmarks.startup [--entry-points app service] [--repeat 5]
+                                 [--warmup] [--output startup.json]
+                                 [--baseline startup.json] [--save-baseline startup.json]
+
+Every measurement runs in a fresh interpreter, the way a restarted server
+or a new batch worker starts. Reported per entry point: interpreter
+start-up plus import time, import time alone, peak RSS after import, and
+which heavy libraries the import pulled in. Heavy libraries are meant to
+load on first use, so an entry point that imports one, or that exceeds
+its time budget or the baseline, is reported and the exit code is
+non-zero. With --warmup the OCR model load that workers do at start-up is
+timed as well.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that should only be imported once a document is processed
+HEAVY_MODULES = ["fitz", "numpy", "torch", "easyocr", "fpdf", "spacy"]
+
+# Entry points: modules imported at start-up and the import time budget
+ENTRY_POINTS = [
+    {"name": "app", "modules": ["main"], "budget_seconds": 2.0},
+    {"name": "service", "modules": ["service"], "budget_seconds": 0.5},
+    {"name": "batch", "modules": ["batch"], "budget_seconds": 0.5},
+    {"name": "batch-worker", "modules": ["batch", "utils.helpers"], "budget_seconds": 0.5},
+    {"name": "redactor", "modules": ["core.redactor"], "budget_seconds": 0.2},
+]
+
+# Runs inside the child interpreter; prints one JSON line
+_PROBE = """
+import importlib, json, resource, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+import_seconds = time.perf_counter() - started
+warmup_seconds = None
+if {warmup!r}:
+    from core.model_registry import get_model_registry
+    started = time.perf_counter()
+    get_model_registry().warmup()
+    warmup_seconds = time.perf_counter() - started
+print(json.dumps({{
+    "import_seconds": import_seconds,
+    "warmup_seconds": warmup_seconds,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+def measure_once(entry_point, warmup=False):
+    """
+    Start a fresh interpreter and import an entry point's modules
+
+    Args:
+        entry_point (dict): Entry from ENTRY_POINTS
+        warmup (bool): Also load the OCR models after importing
+
+    Returns:
+        dict: Raw measurements of one start-up
+    """
+    probe = _PROBE.format(root=ROOT, modules=entry_point["modules"],
+                          warmup=warmup, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True,
+                               text=True, check=True)
+    total_seconds = time.perf_counter() - started
+    measurement = json.loads(completed.stdout.strip().splitlines()[-1])
+    measurement["total_seconds"] = total_seconds
+    return measurement
+
+def measure(entry_point, repeat=5, warmup=False):
+    """
+    Measure an entry point's cold start several times
+
+    Args:
+        entry_point (dict): Entry from ENTRY_POINTS
+        repeat (int): Number of fresh interpreters to start
+        warmup (bool): Also time the OCR model load
+
+    Returns:
+        dict: Median timings and memory for the entry point
+    """
+    runs = [measure_once(entry_point, warmup) for _ in range(repeat)]
+    result = {
+        "entry_point": entry_point["name"],
+        "total_seconds": round(statistics.median(run["total_seconds"] for run in runs), 4),
+        "import_seconds": round(statistics.median(run["import_seconds"] for run in runs), 4),
+        "rss_mb": round(statistics.median(run["rss_mb"] for run in runs), 1),
+        "heavy_modules": runs[-1]["heavy_modules"],
+        "budget_seconds": entry_point["budget_seconds"]
+    }
+    if warmup:
+        result["warmup_seconds"] = round(statistics.median(run["warmup_seconds"] for run in runs), 4)
+    return result
+
+def check_results(results, baseline=None, tolerance=0.2):
+    """
+    Check results against the budgets and an optional baseline
+
+    Args:
+        results (list): Metrics from measure
+        baseline (list): Previously saved metrics
+        tolerance (float): Allowed relative increase over the baseline
+
+    Returns:
+        list: Human-readable regression descriptions
+    """
+    baseline_by_name = {entry["entry_point"]: entry for entry in baseline or []}
+    regressions = []
+    for result in results:
+        name = result["entry_point"]
+        if result["heavy_modules"]:
+            regressions.append(f"{name}: imports {', '.join(result['heavy_modules'])} at start-up")
+        if result["import_seconds"] > result["budget_seconds"]:
+            regressions.append(
+                f"{name}: import {result['import_seconds']}s > budget {result['budget_seconds']}s"
+            )
+        base = baseline_by_name.get(name)
+        if base is None:
+            continue
+        for metric in ("import_seconds", "rss_mb"):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {result[metric]} > baseline {base[metric]}")
+    return regressions
+
+def print_report(results):
+    """Print a summary table of start-up metrics"""
+    header = f"{'entry point':<14}{'total s':>9}{'import s':>10}{'RSS MB':>9}  heavy modules"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['entry_point']:<14}{result['total_seconds']:>9}{result['import_seconds']:>10}"
+              f"{result['rss_mb']:>9}  {', '.join(result['heavy_modules']) or '-'}")
+
+def main(argv=None):
+    """Command-line entry point"""
+    names = [entry_point["name"] for entry_point in ENTRY_POINTS]
+    parser = argparse.ArgumentParser(description="Measure cold-start time and memory")
+    parser.add_argument("--entry-points", nargs="+", choices=names, default=names)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--warmup", action="store_true", help="Also time loading the OCR models")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a saved results file")
+    parser.add_argument("--save-baseline", help="Save these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative import time and RSS increase against the baseline")
+    args = parser.parse_args(argv)
+
+    results = [
+        measure(entry_point, args.repeat, args.warmup)
+        for entry_point in ENTRY_POINTS if entry_point["name"] in args.entry_points
+    ]
+    print_report(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = check_results(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
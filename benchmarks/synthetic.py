@@ -0,0 +1,146 @@
+"""
+Synthetic PDF generation with planted PII for benchmarks
+
+Documents are generated deterministically from a seed, so every run of
+the suite measures exactly the same input.
+"""
+
+import random
+import fitz  # PyMuPDF for PDF handling
+import numpy as np
+
+FILLER_WORDS = (
+    "invoice account billing statement period balance payment due amount "
+    "service charge customer reference total previous credit adjustment "
+    "usage summary plan monthly annual tax fee discount"
+).split()
+
+STREETS = ["Main", "Oak", "Maple", "Cedar", "Elm", "Pine", "Lake", "Hill"]
+STREET_TYPES = ["Street", "Avenue", "Road", "Drive", "Lane", "Boulevard"]
+
+# Text-layer and scanned documents of varying length and scan quality
+SCENARIOS = [
+    {"name": "text-1", "kind": "text", "pages": 1, "noise": 0.0},
+    {"name": "text-20", "kind": "text", "pages": 20, "noise": 0.0},
+    {"name": "text-200", "kind": "text", "pages": 200, "noise": 0.0},
+    {"name": "scan-1", "kind": "scan", "pages": 1, "noise": 0.0},
+    {"name": "scan-10", "kind": "scan", "pages": 10, "noise": 0.0},
+    {"name": "scan-10-noisy", "kind": "scan", "pages": 10, "noise": 0.02},
+    {"name": "packet-12", "kind": "packet", "pages": 12, "noise": 0.0},
+]
+
+COVER_LINES = [
+    "CONFIDENTIAL - DOCUMENT PACKET",
+    "This packet contains records intended only for the named recipient.",
+    "If you received it in error, notify the sender and destroy all copies.",
+]
+
+def make_pii(rng):
+    """
+    Generate one set of labeled PII values
+
+    Args:
+        rng (random.Random): Seeded random generator
+
+    Returns:
+        list: (redaction type, line, planted value) tuples
+    """
+    ssn = f"{rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}"
+    card = " ".join(str(rng.randint(1000, 9999)) for _ in range(4))
+    address = f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(STREET_TYPES)}"
+    zip_code = str(rng.randint(10000, 99999))
+    # The same number as OCR often reads it, with the dashes taken for letters
+    garbled_ssn = ssn.replace("-", "o")
+    # Card numbers with a dropped last digit and with a stray letter
+    short_card = card[:-1]
+    smudged_card = card[:13] + rng.choice("AEHKX") + card[14:]
+    return [
+        ("ssn", f"SSN: {ssn}", ssn),
+        ("ssn", f"SSN: {garbled_ssn}", garbled_ssn),
+        ("credit_card", f"Credit Card: {card}", card),
+        ("credit_card", f"Card: {short_card}", short_card),
+        ("credit_card", f"Card: {smudged_card}", smudged_card),
+        ("address", f"Address: {address}", address),
+        ("zip", f"ZIP: {zip_code}", zip_code),
+    ]
+
+def make_page_lines(rng, filler_lines=20):
+    """
+    Build the text lines of one page with PII planted among filler
+
+    Args:
+        rng (random.Random): Seeded random generator
+        filler_lines (int): Number of non-sensitive lines
+
+    Returns:
+        tuple: (lines, planted) where planted lists (redaction type, value)
+    """
+    lines = [" ".join(rng.choice(FILLER_WORDS) for _ in range(8)) for _ in range(filler_lines)]
+    planted = []
+    for redaction_type, line, value in make_pii(rng):
+        lines.insert(rng.randint(0, len(lines)), line)
+        planted.append((redaction_type, value))
+    return lines, planted
+
+def add_noise(pix, noise, rng):
+    """
+    Flip a fraction of pixels to simulate scanner speckle
+
+    Args:
+        pix (fitz.Pixmap): Grayscale pixmap without alpha
+        noise (float): Fraction of pixels to flip
+        rng (random.Random): Seeded random generator
+
+    Returns:
+        fitz.Pixmap: Speckled copy of the pixmap
+    """
+    samples = np.frombuffer(pix.samples, dtype=np.uint8).copy()
+    np_rng = np.random.default_rng(rng.randint(0, 2 ** 32 - 1))
+    flips = np_rng.random(samples.size) < noise
+    samples[flips] = 255 - samples[flips]
+    return fitz.Pixmap(fitz.csGRAY, pix.width, pix.height, samples.tobytes(), False)
+
+def generate_document(kind="text", pages=1, noise=0.0, seed=0, dpi=150):
+    """
+    Generate a synthetic PDF
+
+    Args:
+        kind (str): "text" for a selectable text layer, "scan" for image-only
+            pages, "packet" for scanned pages where every fourth page is the
+            same cover sheet followed by a blank separator page
+        pages (int): Number of pages
+        noise (float): Fraction of speckled pixels on scanned pages
+        seed (int): Random seed
+        dpi (int): Scan resolution for image-only pages
+
+    Returns:
+        tuple: (pdf_bytes, planted) where planted lists (page, redaction type, value)
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    planted = []
+
+    for page_num in range(pages):
+        page = doc.new_page()
+        if kind == "packet" and page_num % 4 == 0:
+            page.insert_text((54, 60), "\n".join(COVER_LINES), fontsize=11, fontname="helv")
+        elif kind == "packet" and page_num % 4 == 1:
+            pass  # Blank separator
+        else:
+            lines, page_planted = make_page_lines(rng)
+            planted.extend((page_num, redaction_type, value) for redaction_type, value in page_planted)
+            page.insert_text((54, 60), "\n".join(lines), fontsize=11, fontname="helv")
+
+        if kind in ("scan", "packet"):
+            # Replace the page with a rasterized copy that has no text layer
+            pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            if noise:
+                pix = add_noise(pix, noise, rng)
+            rect = page.rect
+            doc.delete_page(page_num)
+            scanned = doc.new_page(pno=page_num, width=rect.width, height=rect.height)
+            scanned.insert_image(rect, pixmap=pix)
+
+    pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return pdf_bytes, planted
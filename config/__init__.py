@@ -1,25 +1,125 @@
-"""
-Configuration package for Document Redaction System
-"""
-
-from .settings import (
-    SSN_PATTERNS,
-    CREDIT_CARD_PATTERNS,
-    ADDRESS_PATTERNS,
-    OCR_CORRECTIONS,
-    APP_CONFIG,
-    SUPPORTED_FILE_TYPES,
-    MAX_FILE_SIZE_MB,
-    REDACTION_LABELS
-)
-
-__all__ = [
-    'SSN_PATTERNS',
-    'CREDIT_CARD_PATTERNS',
-    'ADDRESS_PATTERNS',
-    'OCR_CORRECTIONS',
-    'APP_CONFIG',
-    'SUPPORTED_FILE_TYPES',
-    'MAX_FILE_SIZE_MB',
-    'REDACTION_LABELS'
+"""
+Configuration package for Document Redaction System
+"""
+
+from .settings import (
+    SSN_PATTERNS,
+    CREDIT_CARD_PATTERNS,
+    ADDRESS_PATTERNS,
+    OCR_CORRECTIONS,
+    AGGRESSIVE_DETECTORS,
+    CONSERVATIVE_DETECTORS,
+    DETECTOR_CONTEXT_WINDOW,
+    NER_ENABLED,
+    NER_MODEL,
+    NER_LABELS,
+    NER_BATCH_SIZE,
+    NER_PROCESSES,
+    NER_PAGE_BUDGET_MS,
+    TEXT_LAYER_MIN_CHARS,
+    TEXT_LAYER_MIN_COVERAGE,
+    OCR_PARALLEL,
+    OCR_WORKERS,
+    OCR_TORCH_THREADS,
+    OCR_BATCHED,
+    OCR_BATCH_SIZE,
+    OCR_PROFILES,
+    OCR_PROFILE,
+    PAGE_SCREENING,
+    PAGE_BLANK_MAX_INK,
+    PAGE_HASH_MAX_DISTANCE,
+    PAGE_DUPLICATE_MAX_PIXELS,
+    PAGE_DEDUP_MAX_PAGES,
+    MODEL_IDLE_TTL_SECONDS,
+    MODEL_MAX_LOADED,
+    OCR_CACHE_ENABLED,
+    OCR_CACHE_DIR,
+    OCR_CACHE_MAX_MB,
+    STAGE_CACHE_MAX_ENTRIES,
+    PIPELINE_PAGE_WINDOW,
+    PROFILING_ENABLED,
+    PROFILE_OUTPUT_DIR,
+    RENDER_DPI,
+    RENDER_GRAYSCALE,
+    PDF_OUTPUT_MODE,
+    EXPORT_FONT_PATHS,
+    EXPORT_FONT_NAME,
+    EXPORT_DOCX_EMBED_FONT,
+    EXPORT_FONT_SIZE,
+    EXPORT_LINE_HEIGHT_MM,
+    JOB_WORKERS,
+    JOB_MAX_QUEUE,
+    JOB_MAX_PER_USER,
+    JOB_RESULT_TTL_SECONDS,
+    JOB_POLL_SECONDS,
+    BUNDLE_MAX_FILES,
+    BUNDLE_ZIP_PART_MB,
+    BATCH_DOCUMENT_TIMEOUT_SECONDS,
+    SUPPORTED_FILE_TYPES,
+    MAX_FILE_SIZE_MB,
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SERVICE_SYNC_TIMEOUT_SECONDS,
+    REDACTION_LABELS
+)
+
+__all__ = [
+    'SSN_PATTERNS',
+    'CREDIT_CARD_PATTERNS',
+    'ADDRESS_PATTERNS',
+    'OCR_CORRECTIONS',
+    'AGGRESSIVE_DETECTORS',
+    'CONSERVATIVE_DETECTORS',
+    'DETECTOR_CONTEXT_WINDOW',
+    'NER_ENABLED',
+    'NER_MODEL',
+    'NER_LABELS',
+    'NER_BATCH_SIZE',
+    'NER_PROCESSES',
+    'NER_PAGE_BUDGET_MS',
+    'TEXT_LAYER_MIN_CHARS',
+    'TEXT_LAYER_MIN_COVERAGE',
+    'OCR_PARALLEL',
+    'OCR_WORKERS',
+    'OCR_TORCH_THREADS',
+    'OCR_BATCHED',
+    'OCR_BATCH_SIZE',
+    'OCR_PROFILES',
+    'OCR_PROFILE',
+    'PAGE_SCREENING',
+    'PAGE_BLANK_MAX_INK',
+    'PAGE_HASH_MAX_DISTANCE',
+    'PAGE_DUPLICATE_MAX_PIXELS',
+    'PAGE_DEDUP_MAX_PAGES',
+    'MODEL_IDLE_TTL_SECONDS',
+    'MODEL_MAX_LOADED',
+    'OCR_CACHE_ENABLED',
+    'OCR_CACHE_DIR',
+    'OCR_CACHE_MAX_MB',
+    'STAGE_CACHE_MAX_ENTRIES',
+    'PIPELINE_PAGE_WINDOW',
+    'PROFILING_ENABLED',
+    'PROFILE_OUTPUT_DIR',
+    'RENDER_DPI',
+    'RENDER_GRAYSCALE',
+    'PDF_OUTPUT_MODE',
+    'EXPORT_FONT_PATHS',
+    'EXPORT_FONT_NAME',
+    'EXPORT_DOCX_EMBED_FONT',
+    'EXPORT_FONT_SIZE',
+    'EXPORT_LINE_HEIGHT_MM',
+    'JOB_WORKERS',
+    'JOB_MAX_QUEUE',
+    'JOB_MAX_PER_USER',
+    'JOB_RESULT_TTL_SECONDS',
+    'JOB_POLL_SECONDS',
+    'BUNDLE_MAX_FILES',
+    'BUNDLE_ZIP_PART_MB',
+    'BATCH_DOCUMENT_TIMEOUT_SECONDS',
+    'SUPPORTED_FILE_TYPES',
+    'MAX_FILE_SIZE_MB',
+    'SERVICE_HOST',
+    'SERVICE_PORT',
+    'SERVICE_SYNC_TIMEOUT_SECONDS',
+    'REDACTION_LABELS'
 ]
\ No newline at end of file
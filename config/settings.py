@@ -1,54 +1,238 @@
-"""
-Configuration settings for the Document Redaction System
-"""
-
-# Enhanced regex patterns that account for OCR errors
-SSN_PATTERNS = [
-    r"\b\d{3}[-\s<>]\d{2}[-\s<>]\d{4}\b",  # Handles OCR errors like < > instead of -
-    r"\b\d{3}\s*\d{2}\s*\d{4}\b"  # More flexible spacing
-]
-
-CREDIT_CARD_PATTERNS = [
-    r"\b\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b",  # Standard 4-4-4-4 format
-    r"\b\d{4}[\s\-]\d{4}[\s\-]\d{3}[A-Za-z0-9][\s\-][A-Za-z0-9]\d{3}\b"  # Handles OCR errors in last groups
-]
-
-# More precise address patterns to avoid false positives
-ADDRESS_PATTERNS = [
-    r"\b\d{1,5}\s+[A-Za-z]+\s+(?:[A-Za-z]+\s+)?(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd|Way|Court|Ct|Place|Pl|Circle|Cir)\b",
-    r"\b\d{5}(?:[-\s]\d{4})?\b"  # ZIP codes only (5 digits or 5-4 format)
-]
-
-# OCR character corrections
-OCR_CORRECTIONS = {
-    '0': ['O', 'o', '°'],
-    '1': ['l', 'I', '|'],
-    '5': ['S', 's'],
-    '6': ['G', 'b'],
-    '8': ['B'],
-    'S': ['5'],
-    'O': ['0'],
-    'I': ['1', 'l'],
-    '<': ['-'],
-    '>': ['-'],
-}
-
-# Streamlit app configuration
-APP_CONFIG = {
-    "page_title": "AI Document Redaction System",
-    "page_icon": "🔒",
-    "layout": "wide",
-    "initial_sidebar_state": "expanded"
-}
-
-# File settings
-SUPPORTED_FILE_TYPES = ["pdf"]
-MAX_FILE_SIZE_MB = 50
-
-# Redaction labels
-REDACTION_LABELS = {
-    "ssn": "[REDACTED SSN]",
-    "credit_card": "[REDACTED CREDIT CARD]", 
-    "address": "[REDACTED ADDRESS]",
-    "zip": "[REDACTED ZIP]"
+"""
+Configuration settings for the Document Redaction System
+"""
+
+import os
+
+# Enhanced regex patterns that account for OCR errors
+SSN_PATTERNS = [
+    r"\b\d{3}[-\s<>]\d{2}[-\s<>]\d{4}\b",  # Handles OCR errors like < > instead of -
+    r"\b\d{3}\s*\d{2}\s*\d{4}\b"  # More flexible spacing
+]
+
+CREDIT_CARD_PATTERNS = [
+    r"\b\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b",  # Standard 4-4-4-4 format
+    r"\b\d{4}[\s\-]\d{4}[\s\-]\d{3}[A-Za-z0-9][\s\-][A-Za-z0-9]\d{3}\b"  # Handles OCR errors in last groups
+]
+
+# More precise address patterns to avoid false positives
+ADDRESS_PATTERNS = [
+    r"\b\d{1,5}\s+[A-Za-z]+\s+(?:[A-Za-z]+\s+)?(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd|Way|Court|Ct|Place|Pl|Circle|Cir)\b",
+    r"\b\d{5}(?:[-\s]\d{4})?\b"  # ZIP codes only (5 digits or 5-4 format)
+]
+
+# Detectors for the single-pass redaction engine, in priority order. Each
+# entry is (redaction type, regex, case-insensitive, context keywords); when
+# context keywords are given, one of them must appear within
+# DETECTOR_CONTEXT_WINDOW characters of the match for it to be redacted.
+# Detectors run on OCR-normalized text (see OCR_CORRECTIONS), so look-alike
+# letters in digit runs and '<'/'>' separators are already fixed
+AGGRESSIVE_DETECTORS = [
+    ("ssn", r"\b\d{3}[-\s]\d{2}[-\s]\d{4}\b", False, None),
+    ("credit_card", r"\b\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b", False, None),
+    # OCR misreads the normalizer can't fix: a dropped last digit, or a
+    # stray letter that is not a digit look-alike at the end of a group
+    ("credit_card", r"\b\d{4}[\s\-]\d{4}[\s\-]\d{3}[A-Za-z0-9][\s\-][A-Za-z0-9]?\d{3}\b", False, None),
+    ("address", r"\b\d{1,4}\s+[A-Za-z]+\s+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)\b", True, None),
+    ("zip", r"\b\d{5}(?:-\d{4})?\b", False, ["zip", "postal", "address", "mail"]),
+]
+
+# Conservative mode only redacts explicitly labeled values
+CONSERVATIVE_DETECTORS = [
+    ("ssn", r"\bSSN:\s*\d{3}[-\s]\d{2}[-\s]\d{4}\b", True, None),
+    ("ssn", r"\bSocial Security:\s*\d{3}[-\s]\d{2}[-\s]\d{4}\b", True, None),
+    ("credit_card", r"\bCredit Card:\s*\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b", True, None),
+    ("credit_card", r"\bCard Number:\s*\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b", True, None),
+    ("address", r"\bAddress:\s*[^\n]+", True, None),
+    ("zip", r"\bZIP:\s*\d{5}(?:-\d{4})?\b", True, None),
+]
+
+DETECTOR_CONTEXT_WINDOW = 10
+
+# OCR character corrections: correct character -> characters OCR mistakes it
+# for. Digit entries are applied to runs that are mostly digits, '<'/'>'
+# between digits become '-', and '-' entries are fixed in the separator
+# positions of SSN-shaped runs; other entries are kept for reference
+OCR_CORRECTIONS = {
+    '0': ['O', 'o', '°'],
+    '1': ['l', 'I', '|'],
+    '5': ['S', 's'],
+    '6': ['G', 'b'],
+    '8': ['B'],
+    'S': ['5'],
+    'O': ['0'],
+    'I': ['1', 'l'],
+    '<': ['-'],
+    '>': ['-'],
+    '-': ['o', 'O'],
+}
+
+# Optional spaCy entity detection for names and organizations (aggressive
+# mode only). Pages are run through nlp.pipe NER_BATCH_SIZE at a time on
+# NER_PROCESSES processes; pages without capitalized-word candidates are
+# skipped, and NER is skipped for the rest of a document once it averages
+# more than NER_PAGE_BUDGET_MS per page
+NER_ENABLED = False
+NER_MODEL = "en_core_web_sm"
+NER_LABELS = {"PERSON": "person", "ORG": "organization"}
+NER_BATCH_SIZE = 16
+NER_PROCESSES = 1
+NER_PAGE_BUDGET_MS = 50
+
+# Text-layer fast path: pages whose native text layer has at least this many
+# non-whitespace characters are read directly instead of being OCR'd, unless
+# the page has images and its text blocks cover less than
+# TEXT_LAYER_MIN_COVERAGE of their area (a scan with a typed header, stamp or
+# Bates number), in which case the page is OCR'd
+TEXT_LAYER_MIN_CHARS = 20
+TEXT_LAYER_MIN_COVERAGE = 0.2
+
+# Parallel OCR: pages are spread across a pool of worker processes, each
+# holding its own EasyOCR reader. OCR_WORKERS = 0 derives the worker count
+# from the CPU count so that workers x torch threads does not oversubscribe
+OCR_PARALLEL = False
+OCR_WORKERS = 0
+OCR_TORCH_THREADS = 1
+
+# Batched OCR: text is detected page by page, then the regions of all pages
+# in a window are recognized together in batches of OCR_BATCH_SIZE crops
+OCR_BATCHED = False
+OCR_BATCH_SIZE = 32
+
+# OCR engine profiles, selectable per job. "backend" picks the engine,
+# "languages" its language codes and "dpi" the render resolution
+# (RENDER_DPI when unset). EasyOCR profiles pass "reader" options to
+# easyocr.Reader (quantize: int8 models on CPU) and "readtext" options to
+# detection and recognition. The tesseract profile needs the tesseract
+# binary and the pytesseract package
+OCR_PROFILES = {
+    "fast": {
+        "backend": "easyocr",
+        "languages": ["en"],
+        "reader": {"quantize": True, "recog_network": "standard"},
+        "readtext": {"decoder": "greedy", "canvas_size": 1280},
+    },
+    "accurate": {
+        "backend": "easyocr",
+        "languages": ["en"],
+        "dpi": 150,
+        "reader": {"quantize": False, "recog_network": "standard"},
+        "readtext": {"decoder": "beamsearch", "beamWidth": 5, "mag_ratio": 1.5},
+    },
+    "tesseract": {
+        "backend": "tesseract",
+        "languages": ["eng"],
+        "dpi": 200,
+        "psm": 6,
+        "oem": 1,
+    },
+}
+OCR_PROFILE = "fast"
+
+# Pre-OCR page screening (core/page_screening.py): rendered pages with less
+# than PAGE_BLANK_MAX_INK of their pixels inked are skipped as blank, and a
+# page that repeats an earlier page of the same document reuses its OCR
+# result. Repeats must be within PAGE_HASH_MAX_DISTANCE bits of perceptual
+# hash, and their ink may differ by at most PAGE_DUPLICATE_MAX_PIXELS pixels
+# in any 4x4 window, so pages differing by a single digit stay apart. The
+# last PAGE_DEDUP_MAX_PAGES distinct pages of a document are compared
+PAGE_SCREENING = True
+PAGE_BLANK_MAX_INK = 0.0001
+PAGE_HASH_MAX_DISTANCE = 4
+PAGE_DUPLICATE_MAX_PIXELS = 2
+PAGE_DEDUP_MAX_PAGES = 32
+
+# Shared OCR model registry: readers and worker pools unused for longer than
+# the idle TTL are unloaded, and at most MODEL_MAX_LOADED stay resident
+MODEL_IDLE_TTL_SECONDS = 1800
+MODEL_MAX_LOADED = 4
+
+# On-disk OCR result cache, keyed by a hash of each rendered page
+OCR_CACHE_ENABLED = True
+OCR_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "docshield")
+OCR_CACHE_MAX_MB = 256
+
+# Per-session memo of pipeline stage outputs (core/stage_cache.py): the
+# extracted pages, redaction and exports of the last STAGE_CACHE_MAX_ENTRIES
+# stage runs are kept, so changing the redaction mode or PDF layout of an
+# already processed document skips extraction and OCR
+STAGE_CACHE_MAX_ENTRIES = 12
+
+# Streaming pipeline: maximum number of pages in flight at once. Parallel OCR
+# raises it to at least twice the worker count so every worker has pages
+PIPELINE_PAGE_WINDOW = 8
+
+# Opt-in per-document profiling (cProfile + tracemalloc per pipeline stage)
+PROFILING_ENABLED = os.environ.get("DOCSHIELD_PROFILE") == "1"
+PROFILE_OUTPUT_DIR = os.environ.get("DOCSHIELD_PROFILE_DIR", "profiles")
+
+# Page rendering for OCR. Grayscale carries a third of the pixel data of RGB;
+# higher DPI trades speed for accuracy on small print
+RENDER_DPI = 72
+RENDER_GRAYSCALE = True
+
+# Redacted PDF output: "retypeset" writes the redacted text into a new PDF,
+# "in_place" blacks out detected spans in the original document
+PDF_OUTPUT_MODE = "retypeset"
+
+# Re-typeset exports: every source page starts a new output page. The PDF
+# embeds the first Unicode TrueType font found in EXPORT_FONT_PATHS (DejaVu
+# Sans; DOCSHIELD_EXPORT_FONT overrides) and falls back to Helvetica, which
+# only covers Latin-1, when there is none. Word documents embed the same font,
+# subset to the characters used, unless EXPORT_DOCX_EMBED_FONT is off; without
+# a font file they only name EXPORT_FONT_NAME and leave it to the viewer
+EXPORT_FONT_PATHS = [
+    os.environ.get("DOCSHIELD_EXPORT_FONT", ""),
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/local/share/fonts/DejaVuSans.ttf",
+    "/Library/Fonts/DejaVuSans.ttf",
+    os.path.join(os.path.expanduser("~"), ".fonts", "DejaVuSans.ttf"),
+]
+EXPORT_FONT_NAME = "DejaVu Sans"
+EXPORT_DOCX_EMBED_FONT = True
+EXPORT_FONT_SIZE = 11
+EXPORT_LINE_HEIGHT_MM = 5.5
+
+# Background document jobs: worker threads, total queued jobs, queued jobs
+# per user, and how long finished results are kept for polling
+JOB_WORKERS = 2
+JOB_MAX_QUEUE = 16
+JOB_MAX_PER_USER = 2
+JOB_RESULT_TTL_SECONDS = 3600
+JOB_POLL_SECONDS = 1.0
+
+# Multi-document uploads: PDFs and ZIPs of PDFs uploaded together form a
+# bundle of at most BUNDLE_MAX_FILES documents. Its documents run as jobs on
+# the shared job queue, fed in as the session's queue share frees up.
+# Streamlit holds a download in memory while serving it, so the redacted
+# outputs are offered as ZIP parts of at most BUNDLE_ZIP_PART_MB each
+BUNDLE_MAX_FILES = 500
+BUNDLE_ZIP_PART_MB = 200
+
+# Headless batch runs (batch.py): a document still running this many seconds
+# after it was handed to a worker is stopped and recorded as failed
+BATCH_DOCUMENT_TIMEOUT_SECONDS = 1800
+
+# File settings
+SUPPORTED_FILE_TYPES = ["pdf"]
+# Uploads are spooled to disk and opened by path, so this is not bounded by
+# memory; keep server.maxUploadSize in .streamlit/config.toml in line
+MAX_FILE_SIZE_MB = 500
+
+# Local HTTP service (service.py): bind address, and how long a synchronous
+# request waits before answering with a job to poll instead
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_SYNC_TIMEOUT_SECONDS = 30
+
+# Redaction labels
+REDACTION_LABELS = {
+    "ssn": "[REDACTED SSN]",
+    "credit_card": "[REDACTED CREDIT CARD]", 
+    "address": "[REDACTED ADDRESS]",
+    "zip": "[REDACTED ZIP]",
+    "person": "[REDACTED NAME]",
+    "organization": "[REDACTED ORGANIZATION]"
 }
\ No newline at end of file
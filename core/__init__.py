@@ -1,13 +1,31 @@
-"""
-Core processing modules for Document Redaction System
-"""
-
-from .ocr_processor import OCRProcessor
-from .redactor import TextRedactor
-from .file_handler import FileHandler
-
-__all__ = [
-    'OCRProcessor',
-    'TextRedactor',
-    'FileHandler'
-]
\ No newline at end of file
+"""
+Core processing modules for Document Redaction System
+
+The public classes are imported on first attribute access, so importing
+one submodule (e.g. core.redactor) does not pull in PyMuPDF, EasyOCR or
+the export libraries.
+"""
+
+import importlib
+
+_LAZY_EXPORTS = {
+    'OCRProcessor': '.ocr_processor',
+    'TextRedactor': '.redactor',
+    'FileHandler': '.file_handler'
+}
+
+__all__ = [
+    'OCRProcessor',
+    'TextRedactor',
+    'FileHandler'
+]
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,354 @@
+"""
+Bundles of documents uploaded together
+
+Reviewers receive cases as dozens of PDFs, or as ZIP archives of them. A
+DocumentBundle spools every PDF of the upload to disk, then runs each
+document as its own job on the shared job queue: documents are processed
+concurrently on the queue's bounded worker pool, which the bundle shares
+fairly with other users. The queue only takes a few waiting jobs per
+user, so the bundle submits more documents as earlier ones start.
+
+Redacted outputs are written to temporary files. The bundle's ZIP is
+streamed from them one member at a time, together with a manifest of
+per-document statuses and stats, so no output is held in memory while it
+is written. Streamlit buffers every download in memory, though, so the
+outputs are split into ZIP parts of at most BUNDLE_ZIP_PART_MB each, and
+one download holds at most one part.
+"""
+
+import os
+import json
+import zipfile
+import tempfile
+import posixpath
+import weakref
+from core.ingest import SpooledDocument, looks_like_pdf, CHUNK_SIZE
+from core.jobs import QueueFullError, JOB_QUEUED, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from config.settings import BUNDLE_MAX_FILES, BUNDLE_ZIP_PART_MB, MAX_FILE_SIZE_MB
+
+# Bundle document states besides the job states
+FILE_WAITING = "waiting"  # Not submitted to the queue yet
+FILE_EMPTY = "empty"  # Processed, but no text could be extracted
+FINISHED_FILE_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED, FILE_EMPTY)
+
+# Output files of a processed document: result key -> file extension
+OUTPUT_EXTENSIONS = (("output_pdf", ".pdf"), ("output_word", ".docx"))
+
+def _remove_files(paths):
+    """Delete a bundle's temporary files"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def is_zip_upload(upload):
+    """Whether an upload is a ZIP archive, judged by its name"""
+    return upload.name.lower().endswith(".zip")
+
+class BundleFile:
+    """One document of a bundle and, once processed, its outcome"""
+
+    def __init__(self, name, document):
+        """
+        Args:
+            name (str): Name of the document, unique within the bundle; path
+                inside the archive for documents from a ZIP
+            document (SpooledDocument): Spooled PDF, released once processed
+        """
+        self.name = name
+        self.document = document
+        self.size = document.size
+        self.job_id = None
+        self.status = FILE_WAITING
+        self.pages_done = 0
+        self.total_pages = 0
+        self.stats = None
+        self.spans = None  # RedactionSpan records as dicts
+        self.outputs = {}  # extension -> temporary file path
+        self.error = None
+        self.seconds = None
+
+    @property
+    def finished(self):
+        """Whether the document has been processed, skipped or cancelled"""
+        return self.status in FINISHED_FILE_STATES
+
+    @property
+    def progress(self):
+        """Fraction of the document's pages processed"""
+        if self.finished:
+            return 1.0
+        if not self.total_pages:
+            return 0.0
+        return min(1.0, self.pages_done / self.total_pages)
+
+    def manifest_record(self):
+        """Manifest entry for the bundle ZIP, without redacted values"""
+        return {"file": self.name, "status": self.status, "stats": self.stats,
+                "spans": self.spans, "error": self.error, "seconds": self.seconds}
+
+class DocumentBundle:
+    """Documents uploaded together, processed as jobs on the shared queue"""
+
+    def __init__(self, process, redaction_mode, max_files=BUNDLE_MAX_FILES, **options):
+        """
+        Args:
+            process (callable): Job function, called as
+                process(job, document, name, redaction_mode, export="files", **options)
+                and returning a dict with redacted_text, output_pdf,
+                output_word and stats (utils.helpers.process_document_job)
+            redaction_mode: "conservative" or "aggressive"
+            max_files (int): Documents accepted; later ones are skipped
+            **options: Extra arguments for process (pdf_output, ner, ocr_profile)
+        """
+        self.process = process
+        self.redaction_mode = redaction_mode
+        self.options = options
+        self.max_files = max_files
+        self.files = []
+        self.skipped = []  # (name, reason) of uploads that are not processed
+        self._names = set()
+        self._temp_paths = []  # Outputs and ZIPs, deleted with the bundle
+        self._parts = None  # Documents of each ZIP part, once all are finished
+        self._zip_paths = {}  # part index -> written ZIP
+        self._finalizer = weakref.finalize(self, _remove_files, self._temp_paths)
+
+    def add_upload(self, upload):
+        """
+        Add an uploaded PDF, or every PDF in an uploaded ZIP archive
+
+        Invalid documents are recorded in ``self.skipped`` instead of raising.
+
+        Args:
+            upload: Readable binary file object with a name, e.g. a Streamlit upload
+        """
+        if not is_zip_upload(upload):
+            upload.seek(0)
+            self._add_document(upload.name, iter(lambda: upload.read(CHUNK_SIZE), b""))
+            return
+        try:
+            with zipfile.ZipFile(upload) as archive:
+                for info in archive.infolist():
+                    parts = info.filename.split("/")
+                    if info.is_dir() or "__MACOSX" in parts or parts[-1].startswith("."):
+                        continue  # Folders and archiver metadata
+                    if not info.filename.lower().endswith(".pdf"):
+                        self.skipped.append((info.filename, "not a PDF"))
+                        continue
+                    try:
+                        with archive.open(info) as member:
+                            self._add_document(info.filename,
+                                               iter(lambda: member.read(CHUNK_SIZE), b""))
+                    except (RuntimeError, zipfile.BadZipFile, NotImplementedError) as e:
+                        # Encrypted or damaged members
+                        self.skipped.append((info.filename, str(e)))
+        except zipfile.BadZipFile:
+            self.skipped.append((upload.name, "not a valid ZIP archive"))
+
+    def _add_document(self, name, chunks):
+        """Spool one PDF into the bundle, or record why it was skipped"""
+        if len(self.files) >= self.max_files:
+            self.skipped.append((name, f"more than {self.max_files} documents"))
+            return
+        try:
+            document = SpooledDocument.from_chunks(chunks, posixpath.basename(name),
+                                                   max_bytes=MAX_FILE_SIZE_MB * 1024 * 1024)
+        except ValueError as e:
+            self.skipped.append((name, str(e)))
+            return
+        if not looks_like_pdf(document):
+            document.close()
+            self.skipped.append((name, "not a PDF"))
+            return
+        self.files.append(BundleFile(self._unique_name(name), document))
+
+    def _unique_name(self, name):
+        """Make a document name safe as a ZIP member and unique within the bundle"""
+        parts = [part for part in posixpath.normpath(name.replace("\\", "/")).split("/")
+                 if part not in ("", ".", "..")]
+        name = "/".join(parts) or "document.pdf"
+        stem, extension = posixpath.splitext(name)
+        candidate, copy = name, 2
+        while candidate.lower() in self._names:
+            candidate = f"{stem} ({copy}){extension}"
+            copy += 1
+        self._names.add(candidate.lower())
+        return candidate
+
+    @property
+    def finished(self):
+        """Whether every document has been processed, skipped or cancelled"""
+        return all(bundle_file.finished for bundle_file in self.files)
+
+    @property
+    def progress(self):
+        """Fraction of the bundle processed, weighting documents equally"""
+        if not self.files:
+            return 1.0
+        return sum(bundle_file.progress for bundle_file in self.files) / len(self.files)
+
+    def submit_pending(self, queue, owner):
+        """
+        Submit waiting documents while the owner's share of the queue has room
+
+        Args:
+            queue (JobQueue): Shared job queue
+            owner (str): Session the jobs belong to
+
+        Returns:
+            int: Number of documents submitted
+        """
+        submitted = 0
+        for bundle_file in self.files:
+            if bundle_file.status != FILE_WAITING:
+                continue
+            try:
+                bundle_file.job_id = queue.submit(
+                    owner, self.process, bundle_file.document, bundle_file.name,
+                    self.redaction_mode, name=bundle_file.name, export="files", **self.options
+                )
+            except QueueFullError:
+                break
+            bundle_file.status = JOB_QUEUED
+            submitted += 1
+        return submitted
+
+    def update(self, queue):
+        """
+        Copy progress from the documents' jobs and collect finished outputs
+
+        Args:
+            queue (JobQueue): Queue the jobs were submitted to
+        """
+        for bundle_file in self.files:
+            if bundle_file.job_id is None or bundle_file.finished:
+                continue
+            job = queue.get(bundle_file.job_id)
+            if job is None:
+                bundle_file.status, bundle_file.error = JOB_FAILED, "Job expired"
+                bundle_file.document = None
+                continue
+            bundle_file.status = job.status
+            bundle_file.pages_done, bundle_file.total_pages = job.pages_done, job.total_pages
+            if job.finished:
+                self._collect(bundle_file, job)
+
+    def _collect(self, bundle_file, job):
+        """Record a finished job's outcome and take over its output files"""
+        bundle_file.document = None  # The spooled PDF is deleted once the job lets go
+        if job.started_at is not None:
+            bundle_file.seconds = round(job.finished_at - job.started_at, 3)
+        result = job.result if job.status == JOB_DONE else None
+        if result is not None:
+            for key, extension in OUTPUT_EXTENSIONS:
+                if result[key]:
+                    self._temp_paths.append(result[key])
+                    bundle_file.outputs[extension] = result[key]
+            if result["redacted_text"] is None:
+                bundle_file.status = JOB_FAILED if job.errors else FILE_EMPTY
+            else:
+                bundle_file.stats = result["stats"]
+                bundle_file.spans = [span.to_dict() for span in result["spans"]]
+                if len(bundle_file.outputs) < len(OUTPUT_EXTENSIONS):
+                    bundle_file.status = JOB_FAILED
+        if job.errors:
+            bundle_file.error = "; ".join(job.errors)
+
+    def cancel(self, queue):
+        """
+        Cancel every document that has not finished
+
+        Args:
+            queue (JobQueue): Queue the jobs were submitted to
+        """
+        for bundle_file in self.files:
+            if bundle_file.status == FILE_WAITING:
+                bundle_file.status = JOB_CANCELLED
+                bundle_file.document = None
+            elif not bundle_file.finished:
+                queue.cancel(bundle_file.job_id)
+        self.update(queue)
+
+    def zip_parts(self, max_bytes=BUNDLE_ZIP_PART_MB * 1024 * 1024):
+        """
+        Split the documents with outputs into ZIP parts of bounded size
+
+        Documents keep their order; a document whose outputs alone exceed
+        max_bytes gets a part of its own.
+
+        Args:
+            max_bytes (int): Output bytes per part
+
+        Returns:
+            list: Lists of BundleFile, one per part
+        """
+        if self._parts is None:
+            parts, size = [], 0
+            for bundle_file in self.files:
+                if not bundle_file.outputs:
+                    continue
+                file_size = sum(os.path.getsize(path) for path in bundle_file.outputs.values())
+                if not parts or size + file_size > max_bytes:
+                    parts.append([])
+                    size = 0
+                parts[-1].append(bundle_file)
+                size += file_size
+            self._parts = parts
+        return self._parts
+
+    def write_zip(self, output, files=None):
+        """
+        Stream redacted outputs and the bundle's manifest into a ZIP archive
+
+        Each output is copied from its temporary file in chunks. Members keep
+        the document's folder inside an uploaded ZIP and are named
+        ``<name>.redacted.pdf`` and ``<name>.redacted.docx``; manifest.jsonl
+        has one line per document of the whole bundle, skipped uploads
+        included, so every part carries the full manifest.
+
+        Args:
+            output: Path or seekable binary stream to write the archive to
+            files (list): BundleFile entries whose outputs to include, all by default
+        """
+        included = set(map(id, self.files if files is None else files))
+        # PDF and DOCX outputs are compressed already
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as archive:
+            manifest = []
+            for bundle_file in self.files:
+                record = dict(bundle_file.manifest_record(), outputs=[])
+                stem = posixpath.splitext(bundle_file.name)[0]
+                for extension, path in bundle_file.outputs.items():
+                    member = f"{stem}.redacted{extension}"
+                    if id(bundle_file) in included:
+                        archive.write(path, member)
+                    record["outputs"].append(member)
+                manifest.append(record)
+            manifest.extend({"file": name, "status": "skipped", "error": reason}
+                            for name, reason in self.skipped)
+            archive.writestr("manifest.jsonl",
+                             "".join(json.dumps(record) + "\n" for record in manifest),
+                             compress_type=zipfile.ZIP_DEFLATED)
+
+    def zip_path(self, part=0):
+        """
+        Write one ZIP part to a temporary file once all documents are finished
+
+        Args:
+            part (int): Index into zip_parts()
+
+        Returns:
+            str: Path of the ZIP, deleted with the bundle
+        """
+        if part not in self._zip_paths:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as archive:
+                self._temp_paths.append(archive.name)
+                self.write_zip(archive, self.zip_parts()[part])
+            self._zip_paths[part] = archive.name
+        return self._zip_paths[part]
+
+    def close(self):
+        """Delete the bundle's outputs and ZIP; spooled uploads go with their documents"""
+        for bundle_file in self.files:
+            bundle_file.document = None
+        self._finalizer()
@@ -0,0 +1,371 @@
+"""
+Page-structured PDF and Word writers for re-typeset exports
+
+Both writers take the redacted text one page at a time from any iterable
+and start a new output page for every source page, so time and memory
+grow linearly with the document:
+
+- PDF: each page is typeset with fpdf2 in a Unicode TrueType font
+  (EXPORT_FONT_PATHS, DejaVu Sans by default) that is subset and embedded.
+  Without one the writer falls back to Helvetica, which only covers
+  Latin-1, and other characters become '?'.
+- Word: WordprocessingML is streamed straight into the output zip, one
+  page at a time. python-docx is not used here because it scans the whole
+  body for every paragraph it adds, which is quadratic in document length.
+  The same font is embedded as an obfuscated font part, subset to the
+  characters used when fontTools (installed with fpdf2) is available, so
+  Word renders the document in it on machines without the font.
+"""
+
+import io
+import os
+import re
+import uuid
+import logging
+import zipfile
+import functools
+import importlib.util
+from xml.sax.saxutils import escape
+from config.settings import (
+    EXPORT_FONT_PATHS, EXPORT_FONT_NAME, EXPORT_FONT_SIZE, EXPORT_LINE_HEIGHT_MM,
+    EXPORT_DOCX_EMBED_FONT
+)
+
+# FPDF family name the embedded font is registered under
+PDF_FONT_FAMILY = "docshield-unicode"
+
+# Control characters XML 1.0 and FPDF cannot carry (PDF text layers contain form feeds)
+_CONTROL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# A4 page and 2 cm margins, in twentieths of a point
+_DOCX_PAGE = ('<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+              '<w:pgMar w:top="1134" w:right="1134" w:bottom="1134" w:left="1134" '
+              'w:header="709" w:footer="709" w:gutter="0"/></w:sectPr>')
+
+_DOCX_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_DOCX_RELATIONSHIPS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '{font_parts}</Types>'
+)
+
+# Content types, relationships and settings of an embedded font
+_DOCX_FONT_CONTENT_TYPES = (
+    '<Default Extension="odttf" '
+    'ContentType="application/vnd.openxmlformats-officedocument.obfuscatedFont"/>'
+    '<Override PartName="/word/fontTable.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.fontTable+xml"/>'
+    '<Override PartName="/word/settings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.settings+xml"/>'
+)
+
+_DOCX_FONT_DOCUMENT_RELS = (
+    f'<Relationship Id="rId2" Target="fontTable.xml" Type="{_DOCX_RELATIONSHIPS}/fontTable"/>'
+    f'<Relationship Id="rId3" Target="settings.xml" Type="{_DOCX_RELATIONSHIPS}/settings"/>'
+)
+
+_DOCX_FONT_TABLE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    f'<Relationship Id="rId1" Target="fonts/font1.odttf" Type="{_DOCX_RELATIONSHIPS}/font"/>'
+    '</Relationships>'
+)
+
+_DOCX_FONT_SETTINGS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<w:settings xmlns:w="{_DOCX_NAMESPACE}"><w:embedTrueTypeFonts/><w:saveSubsetFonts/>'
+    '</w:settings>'
+)
+
+_DOCX_PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" Type='
+    '"http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+_DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="styles.xml" Type='
+    '"http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+    '{font_parts}</Relationships>'
+)
+
+def clean_text(text):
+    """Drop control characters other than tab and newline"""
+    return _CONTROL_CHARS.sub("", text)
+
+@functools.lru_cache(maxsize=None)
+def find_unicode_font():
+    """
+    Locate the TrueType font embedded in PDF and Word exports
+
+    EXPORT_FONT_PATHS are tried in order, then the copy of DejaVu Sans that
+    matplotlib bundles, if matplotlib is installed (it is not imported).
+
+    Returns:
+        str: Font path, or None when no Unicode font is available
+    """
+    candidates = list(EXPORT_FONT_PATHS)
+    spec = importlib.util.find_spec("matplotlib")
+    if spec is not None and spec.origin:
+        candidates.append(os.path.join(os.path.dirname(spec.origin), "mpl-data", "fonts",
+                                       "ttf", "DejaVuSans.ttf"))
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    logging.getLogger("docshield").warning(
+        "No Unicode font found for exports (see EXPORT_FONT_PATHS); PDF characters "
+        "outside Latin-1 are replaced and Word documents only name EXPORT_FONT_NAME"
+    )
+    return None
+
+def _import_fpdf():
+    """
+    Import FPDF from fpdf2
+
+    Raises:
+        ImportError: If the fpdf module is the unmaintained fpdf 1.x, which
+            installs under the same name and lacks the API used here
+    """
+    import fpdf
+    version = getattr(fpdf, "FPDF_VERSION", "0")
+    if int(version.split(".")[0]) < 2:
+        raise ImportError(
+            f"PDF export needs fpdf2, but fpdf {version} is installed; "
+            "run 'pip uninstall fpdf' and 'pip install fpdf2'"
+        )
+    return fpdf.FPDF
+
+def _wrap_lines(text, max_width, text_width):
+    """
+    Break text into lines no wider than max_width, at spaces where possible
+
+    Args:
+        text (str): Page text
+        max_width (float): Line width available
+        text_width (callable): Width of a string in the current font
+
+    Yields:
+        str: Output lines
+    """
+    space = text_width(" ")
+    for paragraph in text.split("\n"):
+        line, line_width = [], 0.0
+        for word in paragraph.split(" "):
+            word_width = text_width(word)
+            if line and line_width + space + word_width > max_width:
+                yield " ".join(line)
+                line, line_width = [], 0.0
+            if word_width > max_width:
+                # A word wider than the page is split between characters
+                chunk = ""
+                for char in word:
+                    if chunk and text_width(chunk + char) > max_width:
+                        yield chunk
+                        chunk = ""
+                    chunk += char
+                word, word_width = chunk, text_width(chunk)
+            line_width += word_width + (space if line else 0.0)
+            line.append(word)
+        yield " ".join(line)
+
+def write_pdf(pages, output, font_path=None):
+    """
+    Typeset redacted pages into a PDF, one or more output pages per source page
+
+    Args:
+        pages: Iterable of page texts, consumed one at a time
+        output: Binary stream the PDF is written to
+        font_path (str): TrueType font to embed, found with
+            find_unicode_font when not given
+    """
+    FPDF = _import_fpdf()
+
+    font_path = font_path or find_unicode_font()
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    if font_path:
+        pdf.add_font(PDF_FONT_FAMILY, fname=font_path)
+        pdf.set_font(PDF_FONT_FAMILY, size=EXPORT_FONT_SIZE)
+        prepare = clean_text
+    else:
+        pdf.set_font("Helvetica", size=EXPORT_FONT_SIZE)
+        prepare = lambda text: clean_text(text).encode("latin-1", "replace").decode("latin-1")
+
+    # Lines are wrapped here and placed with text(): multi_cell re-measures
+    # a line for every character it adds, which dominates export time
+    widths = {}
+    def text_width(string):
+        width = widths.get(string)
+        if width is None:
+            width = widths[string] = pdf.get_string_width(string)
+        return width
+
+    top = pdf.t_margin + EXPORT_LINE_HEIGHT_MM
+    bottom = pdf.h - pdf.b_margin
+    for text in pages:
+        pdf.add_page()
+        y = top
+        for line in _wrap_lines(prepare(text).rstrip(), pdf.epw, text_width):
+            if y > bottom:
+                # The source page does not fit; continue on a new output page
+                pdf.add_page()
+                y = top
+            if line:
+                pdf.text(pdf.l_margin, y, line)
+            y += EXPORT_LINE_HEIGHT_MM
+        if len(widths) > 100000:
+            widths.clear()
+    if pdf.page == 0:
+        pdf.add_page()
+
+    output.write(pdf.output())
+
+def _docx_styles(font_name):
+    """styles.xml setting the document font, size and line spacing"""
+    font = escape(font_name, {'"': "&quot;"})
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:styles xmlns:w="{_DOCX_NAMESPACE}"><w:docDefaults><w:rPrDefault><w:rPr>'
+        f'<w:rFonts w:ascii="{font}" w:hAnsi="{font}" w:cs="{font}" w:eastAsia="{font}"/>'
+        f'<w:sz w:val="{EXPORT_FONT_SIZE * 2}"/><w:szCs w:val="{EXPORT_FONT_SIZE * 2}"/>'
+        '</w:rPr></w:rPrDefault><w:pPrDefault><w:pPr><w:spacing w:after="0" w:line="240" '
+        'w:lineRule="auto"/></w:pPr></w:pPrDefault></w:docDefaults>'
+        '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+        '</w:style></w:styles>'
+    )
+
+def _docx_page(text, page_break):
+    """WordprocessingML paragraphs of one page, one per line"""
+    parts = []
+    for index, line in enumerate(clean_text(text).split("\n")):
+        properties = "<w:pPr><w:pageBreakBefore/></w:pPr>" if page_break and index == 0 else ""
+        if line:
+            parts.append(f'<w:p>{properties}<w:r><w:t xml:space="preserve">{escape(line)}'
+                         '</w:t></w:r></w:p>')
+        else:
+            parts.append(f"<w:p>{properties}</w:p>")
+    return "".join(parts)
+
+class _DocxFont:
+    """A TrueType font to embed in a Word document, subset when fontTools is installed"""
+
+    def __init__(self, path, fallback_name):
+        """
+        Args:
+            path (str): TrueType font file
+            fallback_name (str): Family name used when the font can't be read
+        """
+        self.path = path
+        self.name = fallback_name
+        self._font = None
+        try:
+            from fontTools.ttLib import TTFont
+        except ImportError:
+            return  # Embedded whole
+        self._font = TTFont(path)
+        self.name = self._font["name"].getBestFamilyName() or fallback_name
+
+    def data(self, chars):
+        """
+        Font file bytes covering the given characters
+
+        Args:
+            chars (set): Characters used in the document
+
+        Returns:
+            bytes: Subset font, or the whole file without fontTools
+        """
+        if self._font is None:
+            with open(self.path, "rb") as f:
+                return f.read()
+        from fontTools import subset
+        options = subset.Options()
+        options.name_IDs = ["*"]
+        options.notdef_outline = True
+        options.drop_tables += ["FFTM"]  # FontForge timestamps, which fontTools cannot subset
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes={ord(char) for char in chars} | {0x20})
+        subsetter.subset(self._font)
+        buffer = io.BytesIO()
+        self._font.save(buffer)
+        return buffer.getvalue()
+
+def obfuscate_font(data, font_key):
+    """
+    Obfuscate an embedded font as Office Open XML requires
+
+    The first 32 bytes are XORed with the font key GUID, read as 16 bytes
+    from its last hex pair to its first (ECMA-376 Part 1, 17.8.1).
+
+    Args:
+        data (bytes): Font file
+        font_key (str): GUID in braces, as written to w:fontKey
+
+    Returns:
+        bytes: Obfuscated font part
+    """
+    key = bytes.fromhex(font_key.strip("{}").replace("-", ""))[::-1]
+    head = bytes(byte ^ key[index % 16] for index, byte in enumerate(data[:32]))
+    return head + data[32:]
+
+def _docx_font_table(font_name, font_key):
+    """fontTable.xml pointing at the embedded font part"""
+    font = escape(font_name, {'"': "&quot;"})
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:fonts xmlns:w="{_DOCX_NAMESPACE}" xmlns:r="{_DOCX_RELATIONSHIPS}">'
+        f'<w:font w:name="{font}"><w:embedRegular r:id="rId1" w:fontKey="{font_key}"/>'
+        '</w:font></w:fonts>'
+    )
+
+def write_docx(pages, output, font_name=EXPORT_FONT_NAME, font_path=None,
+               embed_font=EXPORT_DOCX_EMBED_FONT):
+    """
+    Write redacted pages into a Word document, each source page starting a new page
+
+    Args:
+        pages: Iterable of page texts, consumed one at a time
+        output: Binary stream the DOCX is written to; it need not be seekable
+        font_name (str): Font family the document is set in when no font is embedded
+        font_path (str): TrueType font to embed, found with find_unicode_font
+            when not given
+        embed_font (bool): Embed the font so Word shows it without it installed
+    """
+    font_path = font_path or (find_unicode_font() if embed_font else None)
+    font = _DocxFont(font_path, font_name) if embed_font and font_path else None
+    chars = set()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES.format(
+            font_parts=_DOCX_FONT_CONTENT_TYPES if font else ""))
+        package.writestr("_rels/.rels", _DOCX_PACKAGE_RELS)
+        package.writestr("word/_rels/document.xml.rels", _DOCX_DOCUMENT_RELS.format(
+            font_parts=_DOCX_FONT_DOCUMENT_RELS if font else ""))
+        package.writestr("word/styles.xml", _docx_styles(font.name if font else font_name))
+        with package.open("word/document.xml", "w") as document:
+            document.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                            f'<w:document xmlns:w="{_DOCX_NAMESPACE}"><w:body>').encode("utf-8"))
+            for page_index, text in enumerate(pages):
+                if font:
+                    chars.update(text)
+                document.write(_docx_page(text, page_index > 0).encode("utf-8"))
+            document.write(f"{_DOCX_PAGE}</w:body></w:document>".encode("utf-8"))
+        if font:
+            # Written last, once the characters to keep in the subset are known
+            font_key = "{" + str(uuid.uuid4()).upper() + "}"
+            package.writestr("word/fontTable.xml", _docx_font_table(font.name, font_key))
+            package.writestr("word/_rels/fontTable.xml.rels", _DOCX_FONT_TABLE_RELS)
+            package.writestr("word/settings.xml", _DOCX_FONT_SETTINGS)
+            package.writestr("word/fonts/font1.odttf",
+                             obfuscate_font(font.data(chars), font_key))
@@ -1,95 +1,231 @@
-"""
-File handling operations for PDF and Word documents
-"""
-
-import tempfile
-from fpdf import FPDF
-from docx import Document
-import streamlit as st
-
-class FileHandler:
-    def __init__(self):
-        """Initialize file handler"""
-        pass
-    
-    def export_to_pdf(self, redacted_text):
-        """
-        Export redacted text to PDF
-        
-        Args:
-            redacted_text (str): Text to export
-            
-        Returns:
-            str: Path to generated PDF file
-        """
-        try:
-            print(f"Redacted Text: {redacted_text[:100]}...") 
-            
-            # Create a temporary file for PDF
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmpfile:
-                tmpfile.close()
-                output_pdf_path = tmpfile.name
-
-            # Create PDF
-            pdf = FPDF()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-
-            # Handle encoding issues
-            try:
-                pdf.multi_cell(0, 10, redacted_text.encode('latin-1', 'replace').decode('latin-1'))
-            except:
-                # Fallback for special characters
-                cleaned_text = ''.join(char if ord(char) < 128 else '?' for char in redacted_text)
-                pdf.multi_cell(0, 10, cleaned_text)
-
-            # Save the PDF
-            pdf.output(output_pdf_path)
-            return output_pdf_path
-            
-        except Exception as e:
-            st.error(f"Error creating PDF: {str(e)}")
-            return None
-    
-    def export_to_word(self, redacted_text):
-        """
-        Export redacted text to Word document
-        
-        Args:
-            redacted_text (str): Text to export
-            
-        Returns:
-            str: Path to generated Word document
-        """
-        try:
-            # Create a temporary file for Word
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmpfile:
-                tmpfile.close()
-                output_word_path = tmpfile.name
-
-            # Create Word document
-            doc = Document()
-            doc.add_paragraph(redacted_text)
-            
-            # Save the Word document
-            doc.save(output_word_path)
-            return output_word_path
-            
-        except Exception as e:
-            st.error(f"Error creating Word document: {str(e)}")
-            return None
-    
-    def create_output_files(self, redacted_text):
-        """
-        Create both PDF and Word output files
-        
-        Args:
-            redacted_text (str): Text to export
-            
-        Returns:
-            tuple: (pdf_path, word_path)
-        """
-        pdf_path = self.export_to_pdf(redacted_text)
-        word_path = self.export_to_word(redacted_text)
-        return pdf_path, word_path
\ No newline at end of file
+"""
+File handling operations for PDF and Word documents
+
+Exports are written into memory, or straight into temporary files for
+callers that need paths (batch runs); they can be built concurrently, or
+wrapped in LazyExport so a format is only rendered when it is downloaded.
+Re-typeset text exports are written page by page by core.export_writers;
+fpdf is imported by the first PDF export.
+"""
+
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from core.reporting import report_error
+from core.ingest import open_pdf
+from core.export_writers import write_pdf, write_docx
+
+def _as_pages(redacted_text):
+    """Pages of an export: a plain string is exported as a single page"""
+    return [redacted_text] if isinstance(redacted_text, str) else redacted_text
+
+class LazyExport:
+    """One export format, rendered on first use and then kept in memory"""
+    
+    def __init__(self, builder):
+        """
+        Args:
+            builder (callable): Returns the export bytes, or None on failure
+        """
+        self._builder = builder
+        self._data = None
+        self._built = False
+        self._lock = threading.Lock()
+    
+    def __call__(self):
+        """
+        Render the export if it has not been rendered yet
+        
+        Returns:
+            bytes: Export contents, or None if rendering failed
+        """
+        with self._lock:
+            if not self._built:
+                self._data = self._builder()
+                self._built = True
+                self._builder = None  # Drop the redacted text and source file
+            return self._data
+    
+    @property
+    def ready(self):
+        """Whether the export has already been rendered"""
+        return self._built
+    
+    def prefetch(self):
+        """Start rendering in a background thread; a later call waits for it"""
+        threading.Thread(target=self, daemon=True).start()
+
+class FileHandler:
+    def __init__(self):
+        """Initialize file handler"""
+        pass
+    
+    def render_pdf(self, redacted_text):
+        """
+        Typeset redacted text into a PDF in memory
+        
+        Args:
+            redacted_text (str or list): Text to export, or its pages in order;
+                each page starts a new PDF page
+            
+        Returns:
+            bytes: PDF contents
+        """
+        buffer = io.BytesIO()
+        write_pdf(_as_pages(redacted_text), buffer)
+        return buffer.getvalue()
+    
+    def render_word(self, redacted_text):
+        """
+        Write redacted text into a Word document in memory
+        
+        Args:
+            redacted_text (str or list): Text to export, or its pages in order;
+                each page starts a new Word page
+            
+        Returns:
+            bytes: DOCX contents
+        """
+        buffer = io.BytesIO()
+        write_docx(_as_pages(redacted_text), buffer)
+        return buffer.getvalue()
+    
+    def render_redacted_original(self, pdf_file, pdf_redactor):
+        """
+        Redact the original PDF in place, keeping its layout, in memory
+        
+        Args:
+            pdf_file: SpooledDocument, path or file upload object of the source document
+            pdf_redactor (PDFRedactor): Redactions located during processing
+            
+        Returns:
+            bytes: PDF contents
+        """
+        doc = open_pdf(pdf_file)
+        try:
+            pdf_redactor.apply(doc)
+            # Drop the removed objects and compress what is left
+            return doc.tobytes(garbage=4, deflate=True)
+        finally:
+            doc.close()
+    
+    def _export(self, write, error_message, suffix, in_memory):
+        """
+        Run a writer and hand back its output as bytes or a temporary file
+        
+        Args:
+            write (callable): Writes the export to the binary stream it is given
+            error_message (str): Prefix of the error reported on failure
+            suffix (str): Temporary file suffix
+            in_memory (bool): Return bytes instead of a file path
+            
+        Returns:
+            bytes or str: Export contents or path, None if failed
+        """
+        path = None
+        try:
+            if in_memory:
+                buffer = io.BytesIO()
+                write(buffer)
+                return buffer.getvalue()
+            
+            # Written straight to disk, without a copy in memory
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmpfile:
+                path = tmpfile.name
+                write(tmpfile)
+            return path
+            
+        except Exception as e:
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+            report_error(f"{error_message}: {str(e)}")
+            return None
+    
+    def export_to_pdf(self, redacted_text, in_memory=False):
+        """
+        Export redacted text to PDF
+        
+        Args:
+            redacted_text (str or list): Text to export, or its pages in order
+            in_memory (bool): Return the PDF bytes instead of writing a file
+            
+        Returns:
+            str: Path to generated PDF file (bytes when in_memory)
+        """
+        return self._export(lambda stream: write_pdf(_as_pages(redacted_text), stream),
+                            "Error creating PDF", ".pdf", in_memory)
+    
+    def export_to_word(self, redacted_text, in_memory=False):
+        """
+        Export redacted text to Word document
+        
+        Args:
+            redacted_text (str or list): Text to export, or its pages in order
+            in_memory (bool): Return the DOCX bytes instead of writing a file
+            
+        Returns:
+            str: Path to generated Word document (bytes when in_memory)
+        """
+        return self._export(lambda stream: write_docx(_as_pages(redacted_text), stream),
+                            "Error creating Word document", ".docx", in_memory)
+    
+    def export_redacted_original(self, pdf_file, pdf_redactor, in_memory=False):
+        """
+        Redact the original PDF in place, keeping its layout
+        
+        Args:
+            pdf_file: SpooledDocument, path or file upload object of the source document
+            pdf_redactor (PDFRedactor): Redactions located during processing
+            in_memory (bool): Return the PDF bytes instead of writing a file
+            
+        Returns:
+            str: Path to generated PDF file (bytes when in_memory)
+        """
+        return self._export(
+            lambda stream: stream.write(self.render_redacted_original(pdf_file, pdf_redactor)),
+            "Error redacting original PDF", ".pdf", in_memory
+        )
+    
+    def _pdf_exporter(self, redacted_text, original):
+        """Pick the PDF export for the requested output mode"""
+        if original is not None:
+            pdf_file, pdf_redactor = original
+            return lambda in_memory: self.export_redacted_original(pdf_file, pdf_redactor, in_memory)
+        return lambda in_memory: self.export_to_pdf(redacted_text, in_memory)
+    
+    def create_output_files(self, redacted_text, in_memory=False, original=None):
+        """
+        Create both PDF and Word outputs, rendering the two concurrently
+        
+        Args:
+            redacted_text (str or list): Text to export, or its pages in order
+            in_memory (bool): Return bytes instead of temporary file paths
+            original (tuple): (pdf_file, pdf_redactor) to redact the source PDF
+                in place instead of re-typesetting the text
+            
+        Returns:
+            tuple: (pdf_path, word_path), or (pdf_bytes, word_bytes) when in_memory
+        """
+        export_pdf = self._pdf_exporter(redacted_text, original)
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="export") as executor:
+            pdf_future = executor.submit(export_pdf, in_memory)
+            word_future = executor.submit(self.export_to_word, redacted_text, in_memory)
+            return pdf_future.result(), word_future.result()
+    
+    def create_lazy_exports(self, redacted_text, original=None):
+        """
+        Prepare PDF and Word outputs that are only rendered when first used
+        
+        Args:
+            redacted_text (str or list): Text to export, or its pages in order
+            original (tuple): (pdf_file, pdf_redactor) to redact the source PDF
+                in place instead of re-typesetting the text
+            
+        Returns:
+            tuple: (pdf_export, word_export) LazyExport objects
+        """
+        export_pdf = self._pdf_exporter(redacted_text, original)
+        return (LazyExport(lambda: export_pdf(True)),
+                LazyExport(lambda: self.export_to_word(redacted_text, True)))
@@ -0,0 +1,210 @@
+"""
+Upload ingest: spool documents to disk once and open them by path
+
+An upload is copied into a temporary file a single time, in fixed-size
+chunks. From then on PyMuPDF opens the file by path and reads pages from
+disk as it needs them, so no stage holds another full in-memory copy of
+the document. Size and type checks use file metadata and the first bytes
+of the file instead of materializing the upload. PyMuPDF itself is only
+imported when a document is opened.
+"""
+
+import os
+import hashlib
+import tempfile
+import weakref
+
+# Bytes copied at a time while spooling
+CHUNK_SIZE = 1024 * 1024
+
+# PDF readers accept the header anywhere in the first kilobyte
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+def _remove_file(path):
+    """Delete a spooled file, ignoring files that are already gone"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class SpooledDocument:
+    """A document on disk, either spooled from an upload or an existing file"""
+
+    def __init__(self, path, name=None, owns_file=False):
+        """
+        Args:
+            path (str): Path of the PDF on disk
+            name (str): Display name, defaults to the file name
+            owns_file (bool): Delete the file when the document is closed
+        """
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.size = os.path.getsize(path)
+        self._digest = None
+        self._finalizer = weakref.finalize(self, _remove_file, path) if owns_file else None
+
+    @classmethod
+    def from_upload(cls, file_obj, name=None):
+        """
+        Spool a file-like upload to a temporary file
+
+        Args:
+            file_obj: Readable binary file object, e.g. a Streamlit upload
+            name (str): Display name, defaults to file_obj.name
+
+        Returns:
+            SpooledDocument: Document backed by the temporary file
+        """
+        file_obj.seek(0)
+        return cls.from_chunks(iter(lambda: file_obj.read(CHUNK_SIZE), b""),
+                               name or getattr(file_obj, "name", None))
+
+    @classmethod
+    def from_chunks(cls, chunks, name=None, max_bytes=None):
+        """
+        Spool an iterable of byte chunks, e.g. a streamed request body
+
+        Args:
+            chunks: Iterable of bytes
+            name (str): Display name
+            max_bytes (int): Stop and raise once more than this many bytes arrive
+
+        Returns:
+            SpooledDocument: Document backed by the temporary file
+
+        Raises:
+            ValueError: If the upload exceeds max_bytes
+        """
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as spool:
+            path = spool.name
+            try:
+                size = 0
+                for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise ValueError(f"Upload exceeds {max_bytes / (1024 * 1024):.0f} MB")
+                    spool.write(chunk)
+                    digest.update(chunk)
+            except BaseException:
+                spool.close()
+                _remove_file(path)
+                raise
+        document = cls(path, name, owns_file=True)
+        # Hashed while spooling, so the file is never read back for it
+        document._digest = digest.hexdigest()
+        return document
+    
+    @property
+    def digest(self):
+        """SHA-256 of the file contents"""
+        if self._digest is None:
+            with open(self.path, "rb") as f:
+                self._digest = _hash_stream(f)
+        return self._digest
+
+    def open(self):
+        """Open the document with PyMuPDF, reading pages from disk on demand"""
+        import fitz  # PyMuPDF
+        return fitz.open(self.path, filetype="pdf")
+
+    def read_header(self, size=PDF_HEADER_WINDOW):
+        """Read the first bytes of the file"""
+        with open(self.path, "rb") as f:
+            return f.read(size)
+
+    def close(self):
+        """Delete the spooled file now instead of when the object is collected"""
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_pdf(pdf_file):
+    """
+    Open a document for PyMuPDF, by path whenever one is available
+
+    Args:
+        pdf_file: SpooledDocument, path, or readable binary file object
+
+    Returns:
+        fitz.Document: Opened document
+    """
+    import fitz  # PyMuPDF
+    
+    if isinstance(pdf_file, SpooledDocument):
+        return pdf_file.open()
+    if isinstance(pdf_file, (str, os.PathLike)):
+        return fitz.open(pdf_file, filetype="pdf")
+    pdf_file.seek(0)
+    return fitz.open(stream=pdf_file.read(), filetype="pdf")
+
+def _hash_stream(stream):
+    """SHA-256 of a binary stream, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def document_digest(pdf_file):
+    """
+    Content hash of a document, used to key per-document caches
+    
+    Args:
+        pdf_file: SpooledDocument, path, or seekable binary file object
+        
+    Returns:
+        str: SHA-256 hex digest
+    """
+    if isinstance(pdf_file, SpooledDocument):
+        return pdf_file.digest
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            return _hash_stream(f)
+    pdf_file.seek(0)
+    digest = _hash_stream(pdf_file)
+    pdf_file.seek(0)
+    return digest
+
+def upload_size(file_obj):
+    """
+    Size of an upload in bytes, from metadata rather than its contents
+
+    Args:
+        file_obj: SpooledDocument, Streamlit upload or seekable file object
+
+    Returns:
+        int: Size in bytes
+    """
+    size = getattr(file_obj, "size", None)
+    if size is not None:
+        return size
+    position = file_obj.tell()
+    file_obj.seek(0, os.SEEK_END)
+    size = file_obj.tell()
+    file_obj.seek(position)
+    return size
+
+def looks_like_pdf(file_obj):
+    """
+    Check the PDF signature in the first bytes of an upload
+
+    Args:
+        file_obj: SpooledDocument or seekable file object
+
+    Returns:
+        bool: True if the header carries the PDF signature
+    """
+    if isinstance(file_obj, SpooledDocument):
+        header = file_obj.read_header()
+    else:
+        position = file_obj.tell()
+        file_obj.seek(0)
+        header = file_obj.read(PDF_HEADER_WINDOW)
+        file_obj.seek(position)
+    return PDF_MAGIC in header
@@ -0,0 +1,317 @@
+"""
+Background job queue for document processing
+
+Documents are submitted as jobs and processed on a bounded pool of worker
+threads, so long scans never block a Streamlit script thread. Submitting
+returns a job ID right away; callers poll the job for per-page progress
+and can cancel it. Pending jobs are kept per user and served round-robin,
+so one user queuing many documents cannot starve everyone else, and the
+queue rejects new jobs once it is full instead of piling them up.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from core.reporting import report_error, thread_error_handler
+from config.settings import (
+    JOB_WORKERS, JOB_MAX_QUEUE, JOB_MAX_PER_USER, JOB_RESULT_TTL_SECONDS
+)
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled"""
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit when a job cannot be accepted"""
+
+class Job:
+    def __init__(self, owner, func, args, kwargs, name=None):
+        """
+        Initialize a queued job
+
+        Args:
+            owner (str): User or session the job belongs to
+            func (callable): Called as func(job, *args, **kwargs) on a worker
+            args (tuple): Positional arguments for func
+            kwargs (dict): Keyword arguments for func
+            name (str): Display name, e.g. the uploaded file name
+        """
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.name = name
+        self.status = JOB_QUEUED
+        self.pages_done = 0
+        self.total_pages = 0
+        self.result = None
+        self.errors = []  # Messages reported while the job ran
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._call = (func, args, kwargs)
+        self._cancelled = threading.Event()
+
+    @property
+    def progress(self):
+        """Fraction of pages processed, 0.0 until the page count is known"""
+        if self.status == JOB_DONE:
+            return 1.0
+        if not self.total_pages:
+            return 0.0
+        return min(1.0, self.pages_done / self.total_pages)
+
+    @property
+    def finished(self):
+        """Whether the job has stopped, successfully or not"""
+        return self.status in FINISHED_STATES
+
+    @property
+    def cancel_requested(self):
+        """Whether cancel() has been called"""
+        return self._cancelled.is_set()
+
+    def report_progress(self, pages_done, total_pages):
+        """
+        Record progress from inside the job; stops the job if it was cancelled
+
+        Args:
+            pages_done (int): Pages processed so far
+            total_pages (int): Pages in the document
+
+        Raises:
+            JobCancelled: If the job has been cancelled
+        """
+        self.pages_done = pages_done
+        self.total_pages = total_pages
+        if self._cancelled.is_set():
+            raise JobCancelled(self.id)
+
+    def cancel(self):
+        """Ask the job to stop; a running job stops at its next progress report"""
+        self._cancelled.set()
+
+class JobQueue:
+    def __init__(self, workers=JOB_WORKERS, max_queue=JOB_MAX_QUEUE,
+                 max_per_user=JOB_MAX_PER_USER, result_ttl=JOB_RESULT_TTL_SECONDS):
+        """
+        Initialize an empty queue; worker threads start with the first job
+
+        Args:
+            workers (int): Number of jobs processed at once
+            max_queue (int): Maximum number of jobs waiting across all users
+            max_per_user (int): Maximum number of jobs waiting per user
+            result_ttl (float): Seconds finished jobs are kept for polling
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.result_ttl = result_ttl
+        self._jobs = {}  # job id -> Job
+        self._pending = OrderedDict()  # owner -> deque of queued jobs, in serving order
+        self._queued = 0
+        self._threads = []
+        self._condition = threading.Condition()
+
+    @property
+    def queued_jobs(self):
+        """Number of jobs waiting for a worker"""
+        return self._queued
+
+    def submit(self, owner, func, *args, name=None, **kwargs):
+        """
+        Queue a job
+
+        Args:
+            owner (str): User or session submitting the job
+            func (callable): Called as func(job, *args, **kwargs) on a worker;
+                should call job.report_progress as it goes
+            name (str): Display name of the job
+
+        Returns:
+            str: Job ID
+
+        Raises:
+            QueueFullError: If the queue or the owner's share of it is full
+        """
+        with self._condition:
+            self._prune()
+            self._check_capacity(owner)
+            job = Job(owner, func, args, kwargs, name=name)
+            self._jobs[job.id] = job
+            self._pending.setdefault(owner, deque()).append(job)
+            self._queued += 1
+            self._start_workers()
+            self._condition.notify()
+            return job.id
+
+    def check_capacity(self, owner, reserved=0, owner_reserved=0):
+        """
+        Check that a job could be queued, before doing expensive work for it
+
+        Args:
+            owner (str): User or session about to submit a job
+            reserved (int): Jobs being prepared for submission across all users
+            owner_reserved (int): Jobs being prepared for submission by this owner
+
+        Raises:
+            QueueFullError: If the queue or the owner's share of it is full
+        """
+        with self._condition:
+            self._check_capacity(owner, reserved, owner_reserved)
+
+    def _check_capacity(self, owner, reserved=0, owner_reserved=0):
+        """Raise QueueFullError if another job would not fit; caller holds the lock"""
+        if self._queued + reserved >= self.max_queue:
+            raise QueueFullError("The server is busy, please try again in a moment")
+        if len(self._pending.get(owner, ())) + owner_reserved >= self.max_per_user:
+            raise QueueFullError(
+                f"You already have {self.max_per_user} documents waiting; "
+                "wait for one to start or cancel it"
+            )
+
+    def get(self, job_id):
+        """
+        Look up a job
+
+        Args:
+            job_id (str): ID returned by submit
+
+        Returns:
+            Job: The job, or None if unknown or expired
+        """
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job; queued jobs are dropped, running jobs stop at the next page
+
+        Args:
+            job_id (str): ID returned by submit
+
+        Returns:
+            bool: True if the job was still queued or running
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel()
+            if job.status == JOB_QUEUED:
+                self._pending[job.owner].remove(job)
+                if not self._pending[job.owner]:
+                    del self._pending[job.owner]
+                self._queued -= 1
+                self._finish(job, JOB_CANCELLED)
+            return True
+
+    def queue_position(self, job_id):
+        """
+        Number of jobs that will start before a queued job
+
+        Jobs are served one per owner in turn, so the position counts at most
+        as many jobs from each other owner as are ahead of this one in its
+        own queue.
+
+        Args:
+            job_id (str): ID returned by submit
+
+        Returns:
+            int: Jobs ahead of this one, 0 if it is not queued
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JOB_QUEUED:
+                return 0
+            own_queue = self._pending[job.owner]
+            rank = own_queue.index(job)
+            position = rank
+            for owner, jobs in self._pending.items():
+                if owner == job.owner:
+                    continue
+                position += min(len(jobs), rank + 1)
+            return position
+
+    def _start_workers(self):
+        """Start worker threads up to the configured count"""
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, daemon=True,
+                                      name=f"docshield-job-{len(self._threads)}")
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self):
+        """Take the next job, rotating through owners so each gets a turn"""
+        owner, jobs = next(iter(self._pending.items()))
+        job = jobs.popleft()
+        del self._pending[owner]
+        if jobs:
+            self._pending[owner] = jobs  # Back of the line
+        self._queued -= 1
+        return job
+
+    def _work(self):
+        """Worker thread loop"""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                job = self._next_job()
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+            self._run(job)
+
+    def _run(self, job):
+        """Run one job and record its outcome"""
+        func, args, kwargs = job._call
+        status = JOB_DONE
+        try:
+            with thread_error_handler(job.errors.append):
+                job.result = func(job, *args, **kwargs)
+        except JobCancelled:
+            status = JOB_CANCELLED
+        except Exception as e:
+            status = JOB_FAILED
+            with thread_error_handler(job.errors.append):
+                report_error(f"Error processing document: {str(e)}")
+        with self._condition:
+            self._finish(job, status)
+
+    def _finish(self, job, status):
+        """Mark a job finished and release its arguments"""
+        job.status = status
+        job.finished_at = time.time()
+        job._call = None  # Drop the uploaded document
+
+    def _prune(self):
+        """Forget finished jobs older than the result TTL"""
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+# Shared by every session in the process
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """
+    Get the process-wide job queue
+
+    Returns:
+        JobQueue: Shared queue instance
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
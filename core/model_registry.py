@@ -0,0 +1,280 @@
+"""
+Process-wide registry for OCR models
+
+Loading an EasyOCR reader pulls the detector and recognizer weights into
+memory, which takes seconds. The registry loads each reader (and each OCR
+worker pool, keyed by engine profile) once per process and hands the same
+instance to every session and request. Loads run outside the registry lock,
+so lookups of models that are already loaded never wait for another load.
+A background sweep evicts entries that have been idle for too long; worker
+pools are leased while in use and only closed once no one holds them.
+"""
+
+import threading
+import time
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from config.settings import MODEL_IDLE_TTL_SECONDS, MODEL_MAX_LOADED, OCR_PROFILE
+
+class ModelRegistry:
+    def __init__(self, idle_ttl=MODEL_IDLE_TTL_SECONDS, max_models=MODEL_MAX_LOADED):
+        """
+        Initialize an empty registry
+
+        Args:
+            idle_ttl (float): Seconds an entry may go unused before it is evicted,
+                0 to keep entries until unloaded explicitly
+            max_models (int): Maximum number of entries kept loaded at once
+        """
+        self.idle_ttl = idle_ttl
+        self.max_models = max_models
+        # key -> {"model", "last_used", "close", "leases", "retired"}
+        self._entries = OrderedDict()
+        self._loading = {}  # key -> Future of a load in progress
+        self._lock = threading.RLock()
+        self._sweeper = None
+
+    def _get_or_load(self, key, loader, close=None, lease=False):
+        """
+        Return the entry for key, loading it with loader() on first use
+
+        Concurrent callers asking for a model that is being loaded wait for
+        that single load instead of each starting their own; the registry
+        lock is not held while loading, so other lookups go on meanwhile.
+
+        Returns:
+            dict: Registry entry; with lease, its lease count is raised and
+                must be returned through _return_lease
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["last_used"] = time.monotonic()
+                    if lease:
+                        entry["leases"] += 1
+                    self._entries.move_to_end(key)
+                    return entry
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = Future()
+                    break
+            # Another caller is loading it; take the entry once it is in
+            loading.result()
+
+        try:
+            model = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            loading.set_exception(e)
+            raise
+        with self._lock:
+            entry = {"model": model, "last_used": time.monotonic(), "close": close,
+                     "leases": 1 if lease else 0, "retired": False}
+            self._entries[key] = entry
+            del self._loading[key]
+            self._evict_over_capacity(keep=key)
+            self._start_sweeper()
+        loading.set_result(None)
+        return entry
+
+    def _return_lease(self, entry):
+        """Give back a lease from _get_or_load, closing the entry if it was evicted meanwhile"""
+        with self._lock:
+            entry["leases"] -= 1
+            entry["last_used"] = time.monotonic()
+            close = entry["retired"] and not entry["leases"]
+            if not close:
+                self._evict_over_capacity()
+        if close:
+            entry["close"](entry["model"])
+
+    def _start_sweeper(self):
+        """Start the background thread evicting idle entries, once per process"""
+        if not self.idle_ttl or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+        self._sweeper = threading.Thread(target=self._sweep, name="model-registry-sweep",
+                                         daemon=True)
+        self._sweeper.start()
+
+    def _sweep(self):
+        """Evict idle entries every half TTL until the registry is empty"""
+        while True:
+            time.sleep(self.idle_ttl / 2)
+            self.evict_idle()
+            with self._lock:
+                if not self._entries and not self._loading:
+                    self._sweeper = None
+                    return
+
+    def get_reader(self, languages=("en",), gpu=False, quantize=True, recog_network="standard"):
+        """
+        Get the shared EasyOCR reader for a language set and model choice
+
+        Args:
+            languages: EasyOCR language codes
+            gpu (bool): Whether the reader should use the GPU
+            quantize (bool): Use dynamically quantized (int8) models on CPU
+            recog_network (str): EasyOCR recognizer network
+
+        Returns:
+            easyocr.Reader: Loaded reader
+        """
+        def load():
+            import easyocr
+            return easyocr.Reader(list(languages), gpu=gpu, quantize=quantize,
+                                  recog_network=recog_network)
+
+        key = ("reader", tuple(languages), gpu, quantize, recog_network)
+        return self._get_or_load(key, load)["model"]
+
+    def get_nlp(self, model):
+        """
+        Get the shared spaCy pipeline for entity recognition
+
+        Only the NER component (and a tok2vec it listens to, if any) stays
+        enabled; tagging, parsing and lemmatization are switched off.
+
+        Args:
+            model (str): Installed spaCy model package, e.g. "en_core_web_sm"
+
+        Returns:
+            spacy.Language: Loaded pipeline
+        """
+        def load():
+            import spacy
+            nlp = spacy.load(model)
+            keep = {"ner"}
+            for name, component in nlp.pipeline:
+                if "ner" in getattr(component, "listening_components", ()):
+                    keep.add(name)
+            nlp.select_pipes(enable=[name for name in nlp.pipe_names if name in keep])
+            return nlp
+
+        return self._get_or_load(("nlp", model), load)["model"]
+
+    @contextmanager
+    def ocr_pool(self, profile, workers, torch_threads):
+        """
+        Lease the shared OCR worker pool for an engine profile and pool shape
+
+        The pool is not shut down by eviction while the block runs; if it is
+        evicted meanwhile, it is closed when the last lease is returned.
+
+        Args:
+            profile (str): OCR engine profile loaded by each worker
+            workers (int): Number of worker processes
+            torch_threads (int): Torch threads per worker
+
+        Yields:
+            ProcessPoolExecutor: Pool whose workers hold pre-loaded engines
+        """
+        from core.ocr_processor import _init_ocr_worker
+
+        def load():
+            # Spawn rather than fork so workers don't inherit torch thread state
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+                initargs=(profile, torch_threads)
+            )
+
+        key = ("ocr_pool", profile, workers, torch_threads)
+        entry = self._get_or_load(key, load, close=lambda pool: pool.shutdown(wait=False),
+                                  lease=True)
+        try:
+            yield entry["model"]
+        finally:
+            self._return_lease(entry)
+
+    def warmup(self, profile=OCR_PROFILE):
+        """
+        Load the OCR engine of a profile ahead of the first request
+
+        Args:
+            profile (str): Key of OCR_PROFILES
+        """
+        from core.ocr_backends import get_ocr_backend
+        get_ocr_backend(profile).load()
+
+    def evict_idle(self, now=None):
+        """
+        Unload entries that have not been used within the idle TTL
+
+        Args:
+            now (float): Current time.monotonic() value, for testing
+
+        Returns:
+            list: Keys of the evicted entries
+        """
+        if not self.idle_ttl:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [key for key, entry in self._entries.items()
+                       if not entry["leases"] and now - entry["last_used"] > self.idle_ttl]
+            for key in expired:
+                self._release(key)
+            return expired
+
+    def _evict_over_capacity(self, keep=None):
+        """Unload least recently used entries beyond max_models, skipping leased ones and keep"""
+        idle = [key for key, entry in self._entries.items()
+                if not entry["leases"] and key != keep]
+        excess = len(self._entries) - self.max_models if self.max_models else 0
+        for key in idle[:max(0, excess)]:
+            self._release(key)
+
+    def _release(self, key):
+        """Drop an entry, closing it if it owns resources; leased entries close on last return"""
+        entry = self._entries.pop(key)
+        if entry["close"] is None:
+            return
+        if entry["leases"]:
+            entry["retired"] = True
+        else:
+            entry["close"](entry["model"])
+
+    def unload(self, key=None):
+        """
+        Unload one entry, or every entry when no key is given
+
+        Args:
+            key: Registry key as listed by loaded_models()
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._entries)
+            for entry_key in keys:
+                if entry_key in self._entries:
+                    self._release(entry_key)
+
+    def loaded_models(self):
+        """
+        List the currently loaded entries
+
+        Returns:
+            list: Registry keys, least recently used first
+        """
+        with self._lock:
+            return list(self._entries)
+
+# Shared by every session and request in this process
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_model_registry():
+    """
+    Get the process-wide model registry
+
+    Returns:
+        ModelRegistry: Shared registry instance
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
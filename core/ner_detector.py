@@ -0,0 +1,119 @@
+"""
+Optional spaCy entity detector for person names and organizations
+
+The regex engine cannot recognize names, so aggressive mode can add a
+spaCy NER pass. It runs next to the regex engine under a fixed per-page
+time budget:
+
+- a cheap regex pre-filter skips pages without capitalized-word
+  candidates, so most tables and numeric pages never reach spaCy;
+- pages are sent through nlp.pipe in batches, optionally on several
+  processes;
+- the time spent is measured, and once a document averages more than the
+  per-page budget, NER is skipped for its remaining pages and the skipped
+  pages are counted in the stats.
+
+spaCy and the model are optional; when either is missing the detector
+reports it once and turns itself off.
+"""
+
+import re
+import time
+from core.model_registry import get_model_registry
+from core.redaction_engine import RedactionSpan
+from core.reporting import report_error
+from config.settings import (
+    NER_MODEL, NER_LABELS, NER_BATCH_SIZE, NER_PROCESSES, NER_PAGE_BUDGET_MS
+)
+
+# A capitalized word in mid-sentence, or two capitalized words in a row
+CANDIDATE_PATTERN = re.compile(r"[a-z,;:]\s+[A-Z][a-z]|\b[A-Z][a-z]+\s+[A-Z][a-z]")
+
+class NERDetector:
+    def __init__(self, model=NER_MODEL, labels=NER_LABELS, batch_size=NER_BATCH_SIZE,
+                 processes=NER_PROCESSES, page_budget_ms=NER_PAGE_BUDGET_MS):
+        """
+        Initialize the detector; the spaCy model is loaded on first use
+
+        Args:
+            model (str): spaCy model package
+            labels (dict): spaCy entity label -> redaction type
+            batch_size (int): Pages per nlp.pipe call
+            processes (int): nlp.pipe worker processes
+            page_budget_ms (float): Average NER time allowed per page
+        """
+        self.model = model
+        self.labels = labels
+        self.batch_size = batch_size
+        self.processes = processes
+        self.page_budget = page_budget_ms / 1000
+        self.available = True
+        self.reset()
+
+    def reset(self):
+        """Start the budget and stats of a new document"""
+        self.pages = 0  # Pages seen
+        self.pages_gated = 0  # Skipped by the candidate pre-filter
+        self.pages_over_budget = 0  # Skipped because the budget was spent
+        self.seconds = 0.0
+
+    def has_candidates(self, text):
+        """Whether a page has capitalized words that could be names"""
+        return CANDIDATE_PATTERN.search(text) is not None
+
+    def find_spans(self, texts, page_nums=None):
+        """
+        Detect entities on a batch of pages
+
+        Args:
+            texts (list): Page texts
+            page_nums (list): Page number of each text, recorded on the spans
+
+        Returns:
+            list: RedactionSpan records per page, offsets into each text
+        """
+        page_nums = page_nums or [None] * len(texts)
+        results = [[] for _ in texts]
+        self.pages += len(texts)
+        candidates = [index for index, text in enumerate(texts) if self.has_candidates(text)]
+        self.pages_gated += len(texts) - len(candidates)
+        if not candidates or not self.available:
+            return results
+        if self.seconds > self.page_budget * self.pages:
+            self.pages_over_budget += len(candidates)
+            return results
+
+        try:
+            nlp = get_model_registry().get_nlp(self.model)
+        except (ImportError, OSError) as e:
+            self.available = False
+            report_error(f"Name detection is unavailable ({self.model}): {str(e)}")
+            return results
+        # Model loading is a one-off and not charged to the page budget
+        started = time.perf_counter()
+        docs = nlp.pipe((texts[index] for index in candidates),
+                        batch_size=self.batch_size, n_process=self.processes)
+        for index, doc in zip(candidates, docs):
+            for entity in doc.ents:
+                redaction_type = self.labels.get(entity.label_)
+                if redaction_type is not None:
+                    results[index].append(RedactionSpan(
+                        redaction_type, entity.start_char, entity.end_char,
+                        f"ner:{entity.label_}", page=page_nums[index]
+                    ))
+        self.seconds += time.perf_counter() - started
+        return results
+
+    def get_stats(self):
+        """
+        Summarize NER work on the current document
+
+        Returns:
+            dict: Page counts and average milliseconds per page
+        """
+        return {
+            "ner_pages": self.pages,
+            "ner_pages_gated": self.pages_gated,
+            "ner_pages_over_budget": self.pages_over_budget,
+            "ner_ms_per_page": round(1000 * self.seconds / self.pages, 2) if self.pages else 0.0
+        }
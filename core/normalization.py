@@ -0,0 +1,168 @@
+"""
+Linear-time OCR error normalization with an offset map
+
+OCR often reads digits as look-alike letters (O for 0, l or I for 1, S for
+5) and dashes as angle brackets. Rather than widening every detector to
+tolerate these errors, text is normalized once before detection:
+
+- Runs of digits and look-alike letters are translated to digits, but only
+  when digits outnumber the letters in the run and the run is not part of
+  a longer word, so "SSN" or "12lbs" stay as they are.
+- '<' and '>' between digit-like characters become '-'.
+- A run shaped like an SSN with look-alike letters in the separator
+  positions ("123o45o6789") gets '-' there before the digit translation,
+  which would otherwise read the separators as zeros.
+- Runs of spaces or tabs between digit-like characters collapse to one
+  space.
+
+Everything is done in one regex pass over greedy tokens that never
+backtrack, so the time stays linear in the text length. Translations keep
+the text length; only whitespace collapsing shifts offsets, and each
+collapse is recorded as a breakpoint in an OffsetMap, so spans found in
+the normalized text map back to the exact original characters.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from config.settings import OCR_CORRECTIONS
+
+class OffsetMap:
+    """Maps offsets in normalized text back to the original text"""
+
+    __slots__ = ("breaks", "shifts")
+
+    def __init__(self):
+        # Normalized offsets from which the cumulative shift applies
+        self.breaks = array("q")
+        self.shifts = array("q")
+
+    def add(self, position, shift):
+        """
+        Record that offsets from position on are shift characters further in the original
+
+        Args:
+            position (int): Offset in the normalized text
+            shift (int): Cumulative shift from this offset on
+        """
+        self.breaks.append(position)
+        self.shifts.append(shift)
+
+    def to_original(self, position):
+        """
+        Translate an offset in the normalized text
+
+        Args:
+            position (int): Offset in the normalized text
+
+        Returns:
+            int: Offset of the same character in the original text
+        """
+        index = bisect_right(self.breaks, position) - 1
+        return position if index < 0 else position + self.shifts[index]
+
+class OCRNormalizer:
+    def __init__(self, corrections=OCR_CORRECTIONS):
+        """
+        Build translation tables from the OCR corrections
+
+        Args:
+            corrections (dict): Correct character -> characters OCR confuses it
+                with; digit entries are applied inside digit runs, '-'
+                substitutions between digits and '-' entries in the
+                separator positions of SSN-shaped runs, other entries are
+                ignored
+        """
+        digit_table = {}
+        separators = []
+        dash_lookalikes = []
+        for correct, misreads in corrections.items():
+            for misread in misreads:
+                if correct == "-":
+                    dash_lookalikes.append(misread)
+                elif correct.isdigit() and not misread.isdigit():
+                    digit_table[ord(misread)] = correct
+                elif misread == "-" and not correct.isalnum():
+                    separators.append(correct)
+        self.digit_table = digit_table
+
+        lookalikes = re.escape("".join(chr(code) for code in digit_table))
+        digit_like = f"[0-9{lookalikes}]"
+        self.pattern = re.compile(
+            # A whole run of digits and look-alikes; one greedy token that
+            # never backtracks, so the scan stays linear. normalize checks
+            # in Python that it holds a digit and is not part of a longer word
+            f"(?P<run>{digit_like}+)"
+            # A misread dash between digit-like characters
+            f"|(?P<dash>(?<={digit_like})[{re.escape(''.join(separators)) or '-'}](?={digit_like}))"
+            # Repeated spaces or tabs between digit-like characters
+            f"|(?P<space>(?<={digit_like})[^\\S\\r\\n]{{2,}}(?={digit_like}))"
+        )
+        self.lookalikes = frozenset(chr(code) for code in digit_table)
+        self.digit = re.compile(r"\d")
+        self.letter = re.compile(r"[^\W\d_]")
+        self.letter_or_digit = re.compile(r"[^\W_]")
+        dashes = re.escape("".join(dash_lookalikes))
+        # 3-2-4 digits with misread dashes, e.g. "123o45o6789"
+        self.ssn_shape = re.compile(
+            f"{digit_like}{{3}}[{dashes}]{digit_like}{{2}}[{dashes}]{digit_like}{{4}}"
+        ) if dash_lookalikes else None
+
+    def normalize(self, text):
+        """
+        Normalize OCR text for detection
+
+        Args:
+            text (str): Raw page text
+
+        Returns:
+            tuple: (normalized_text, offset_map)
+        """
+        offset_map = OffsetMap()
+        parts = []
+        position = 0
+        shift = 0
+        for match in self.pattern.finditer(text):
+            start, end = match.span()
+            kind = match.lastgroup
+            if kind == "run":
+                run = match.group()
+                if (not self.digit.search(run) or start and self.letter.match(text, start - 1)
+                        or self.letter_or_digit.match(text, end)):
+                    continue  # No digit, or part of a longer word
+                if self.ssn_shape is not None and self.ssn_shape.fullmatch(run):
+                    replacement = "-".join((run[:3], run[4:6], run[7:])).translate(self.digit_table)
+                else:
+                    lookalike_count = sum(1 for char in run if char in self.lookalikes)
+                    if not lookalike_count or lookalike_count * 2 >= len(run):
+                        continue  # Nothing to fix, or too few digits to be sure
+                    replacement = run.translate(self.digit_table)
+            elif kind == "dash":
+                replacement = "-"
+            else:
+                replacement = " "
+            parts.append(text[position:start])
+            parts.append(replacement)
+            position = end
+            if len(replacement) != end - start:
+                shift += end - start - len(replacement)
+                offset_map.add(end - shift, shift)
+        if not parts:
+            return text, offset_map
+        parts.append(text[position:])
+        return "".join(parts), offset_map
+
+# Built once per process and shared by every TextRedactor
+_normalizer = None
+
+def get_normalizer():
+    """
+    Get the shared normalizer built from OCR_CORRECTIONS
+
+    Returns:
+        OCRNormalizer: Shared instance
+    """
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = OCRNormalizer()
+    return _normalizer
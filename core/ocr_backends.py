@@ -0,0 +1,227 @@
+"""
+OCR engine backends and named engine profiles
+
+OCRProcessor reaches the OCR engine through a small backend interface:
+images go in, (box, text, confidence) lists come out, in the order
+EasyOCR's readtext reports them. Each entry of OCR_PROFILES names a
+backend and its settings, so a job can pick a point on the speed/accuracy
+curve by profile name:
+
+- "easyocr" profiles pass "reader" options to easyocr.Reader (quantize,
+  recog_network) and "readtext" options to detection and recognition.
+- "tesseract" runs a local Tesseract through pytesseract, when both are
+  installed.
+
+Results always carry one box and one confidence per text region, because
+in-place redaction and confidence reporting are built on them.
+"""
+
+import io
+import json
+import math
+import inspect
+import threading
+from core.model_registry import get_model_registry
+from config.settings import OCR_PROFILES, OCR_PROFILE, OCR_BATCH_SIZE
+
+class OCRBackend:
+    """Interface of an OCR engine"""
+
+    def __init__(self, profile_name, options):
+        """
+        Args:
+            profile_name (str): Key of the profile in OCR_PROFILES
+            options (dict): Profile settings
+        """
+        self.profile_name = profile_name
+        self.options = options
+        self.languages = tuple(options.get("languages", ()))
+
+    @property
+    def cache_namespace(self):
+        """Profile name and settings, so cached results never cross profiles"""
+        return f"{self.profile_name}:{json.dumps(self.options, sort_keys=True)}"
+
+    def load(self):
+        """Load the engine's models ahead of the first page"""
+
+    def readtext(self, image):
+        """
+        OCR one page image
+
+        Args:
+            image: Image bytes or NumPy array
+
+        Returns:
+            list: (box, text, confidence) per text region, box as four
+                [x, y] corner points
+        """
+        raise NotImplementedError
+
+    def readtext_many(self, images, batch_size=OCR_BATCH_SIZE):
+        """
+        OCR several page images; engines that can share work across pages override this
+
+        Args:
+            images: List of image bytes or NumPy arrays
+            batch_size (int): Text regions per recognizer call
+
+        Returns:
+            list: readtext results per image
+        """
+        return [self.readtext(image) for image in images]
+
+class EasyOCRBackend(OCRBackend):
+    @property
+    def reader(self):
+        """EasyOCR reader for this profile, loaded once per process by the model registry"""
+        return get_model_registry().get_reader(self.languages, **self.options.get("reader", {}))
+
+    def load(self):
+        self.reader
+
+    def readtext(self, image):
+        return self.reader.readtext(image, **self.options.get("readtext", {}))
+
+    def readtext_many(self, images, batch_size=OCR_BATCH_SIZE):
+        return readtext_batched(self.reader, images, batch_size, **self.options.get("readtext", {}))
+
+class TesseractBackend(OCRBackend):
+    def _pytesseract(self):
+        try:
+            import pytesseract
+        except ImportError:
+            raise ImportError("The tesseract OCR profile needs the pytesseract package "
+                              "and the tesseract binary")
+        return pytesseract
+
+    def load(self):
+        # Fails early when the tesseract binary is missing
+        self._pytesseract().get_tesseract_version()
+
+    def readtext(self, image):
+        from PIL import Image
+
+        pytesseract = self._pytesseract()
+        if isinstance(image, bytes):
+            image = Image.open(io.BytesIO(image))
+        else:
+            image = Image.fromarray(image)
+        data = pytesseract.image_to_data(
+            image, lang="+".join(self.languages) or "eng",
+            config=f"--psm {self.options.get('psm', 6)} --oem {self.options.get('oem', 1)}",
+            output_type=pytesseract.Output.DICT
+        )
+
+        # Tesseract reports words; join them into lines like EasyOCR's regions
+        lines = {}
+        for index, word in enumerate(data["text"]):
+            confidence = float(data["conf"][index])
+            if not word.strip() or confidence < 0:
+                continue
+            key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+            x0, y0 = data["left"][index], data["top"][index]
+            x1, y1 = x0 + data["width"][index], y0 + data["height"][index]
+            line = lines.setdefault(key, {"words": [], "confidences": [], "box": [x0, y0, x1, y1]})
+            line["words"].append(word)
+            line["confidences"].append(confidence / 100)
+            box = line["box"]
+            box[:] = [min(box[0], x0), min(box[1], y0), max(box[2], x1), max(box[3], y1)]
+
+        results = []
+        for line in lines.values():
+            x0, y0, x1, y1 = line["box"]
+            results.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], " ".join(line["words"]),
+                            sum(line["confidences"]) / len(line["confidences"])))
+        return results
+
+BACKENDS = {
+    "easyocr": EasyOCRBackend,
+    "tesseract": TesseractBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_ocr_backend(profile=OCR_PROFILE):
+    """
+    Get the backend for an engine profile
+
+    Args:
+        profile (str): Key of OCR_PROFILES
+
+    Returns:
+        OCRBackend: Shared backend instance for the profile
+
+    Raises:
+        ValueError: If the profile or its backend is unknown
+    """
+    with _backends_lock:
+        if profile not in _backends:
+            if profile not in OCR_PROFILES:
+                raise ValueError(f"Unknown OCR profile: {profile}")
+            options = OCR_PROFILES[profile]
+            backend_class = BACKENDS.get(options.get("backend"))
+            if backend_class is None:
+                raise ValueError(f"Unknown OCR backend: {options.get('backend')}")
+            _backends[profile] = backend_class(profile, options)
+        return _backends[profile]
+
+def readtext_batched(reader, images, batch_size=OCR_BATCH_SIZE, **options):
+    """
+    OCR several pages, recognizing their text regions in shared batches
+
+    readtext recognizes each page's boxes on their own, and on CPU EasyOCR
+    even feeds the recognizer one box at a time. Here text is detected page
+    by page, then the crops of all pages are sorted by width and recognized
+    in batches of batch_size, each padded only to the widest crop in it.
+    Results come back in the same order readtext reports them.
+
+    Args:
+        reader (easyocr.Reader): Loaded reader
+        images: List of image bytes or NumPy arrays
+        batch_size (int): Crops per recognizer call
+        **options: readtext options of the profile; detection options and
+            decoder, beamWidth, contrast_ths, adjust_contrast and filter_ths
+            are applied
+
+    Returns:
+        list: (box, text, confidence) lists per image, like readtext
+    """
+    from easyocr import recognition
+    from easyocr.easyocr import imgH
+    from easyocr.utils import get_image_list, reformat_input
+
+    detect_parameters = inspect.signature(reader.detect).parameters
+    detect_options = {name: value for name, value in options.items()
+                      if name in detect_parameters and name != "reformat"}
+
+    crops = []  # (page index, box, crop) in readtext order
+    for page_index, image in enumerate(images):
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list = reader.detect(img, reformat=False, **detect_options)
+        for boxes in ((horizontal_list[0], []), ([], free_list[0])):
+            image_list, _ = get_image_list(*boxes, img_cv_grey, model_height=imgH,
+                                           sort_output=False)
+            crops.extend((page_index, box, crop) for box, crop in image_list)
+
+    ignore_char = "".join(set(reader.character) - set(reader.lang_char))
+    order = sorted(range(len(crops)), key=lambda index: crops[index][2].shape[1])
+    recognized = [None] * len(crops)
+    for batch_start in range(0, len(order), batch_size):
+        batch = order[batch_start:batch_start + batch_size]
+        max_width = math.ceil(max(crops[index][2].shape[1] for index in batch) / imgH) * imgH
+        image_list = [(crops[index][1], crops[index][2]) for index in batch]
+        results = recognition.get_text(
+            reader.character, imgH, max_width, reader.recognizer, reader.converter, image_list,
+            ignore_char, options.get("decoder", "greedy"), options.get("beamWidth", 5), batch_size,
+            options.get("contrast_ths", 0.1), options.get("adjust_contrast", 0.5),
+            options.get("filter_ths", 0.003), 0, reader.device
+        )
+        for index, result in zip(batch, results):
+            recognized[index] = result
+
+    pages = [[] for _ in images]
+    for (page_index, _, _), result in zip(crops, recognized):
+        pages[page_index].append(result)
+    return pages
@@ -0,0 +1,191 @@
+"""
+Content-addressed on-disk cache for OCR results
+
+Entries are keyed by a hash of the rendered page, so re-uploads, re-runs
+with a different redaction mode and new revisions of a document only OCR
+the pages that actually changed. The cache lives in a SQLite database in
+WAL mode, which lets several worker processes read and write it at once.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from config.settings import OCR_CACHE_DIR, OCR_CACHE_MAX_MB
+
+# Bump when the stored result format changes so stale entries are ignored
+CACHE_FORMAT_VERSION = "2"
+
+class OCRCache:
+    def __init__(self, cache_dir=OCR_CACHE_DIR, max_size_mb=OCR_CACHE_MAX_MB):
+        """
+        Initialize the cache; the database is opened on first use
+
+        Args:
+            cache_dir (str): Directory holding the cache database
+            max_size_mb (float): Size cap for stored results, enforced by LRU eviction
+        """
+        self.path = os.path.join(cache_dir, "ocr_cache.sqlite3")
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """Open (or reopen after a fork) this process's database connection"""
+        if self._connection is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)"
+            )
+            # Running total of entry sizes, kept up to date by put, _evict and
+            # clear so inserts don't have to sum the whole table
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), total_size INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "INSERT OR IGNORE INTO meta (id, total_size) "
+                "SELECT 1, COALESCE(SUM(size), 0) FROM entries"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def make_key(page_bytes, namespace=""):
+        """
+        Build the cache key for a rendered page
+
+        Args:
+            page_bytes (bytes): Rendered page image
+            namespace (str): OCR settings that affect the result (languages, engine)
+
+        Returns:
+            str: Hex digest identifying the page content and OCR settings
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_FORMAT_VERSION}:{namespace}:".encode("utf-8"))
+        digest.update(page_bytes)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached result and mark it as recently used
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            connection.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key, value):
+        """
+        Store a result, evicting least recently used entries over the size cap
+
+        Args:
+            key (str): Key from make_key
+            value: JSON-serializable OCR result
+        """
+        payload = json.dumps(value)
+        with self._lock:
+            connection = self._connect()
+            # IMMEDIATE takes the write lock up front so concurrent writers
+            # queue on the busy timeout instead of failing mid-eviction
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, payload, len(payload), time.time())
+                )
+                total = self._add_size(connection, len(payload) - (row[0] if row else 0))
+                self._evict(connection, total)
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _add_size(connection, delta):
+        """Adjust the running size total and return the new value"""
+        connection.execute("UPDATE meta SET total_size = total_size + ? WHERE id = 1", (delta,))
+        return connection.execute("SELECT total_size FROM meta WHERE id = 1").fetchone()[0]
+
+    def _evict(self, connection, total):
+        """Delete least recently used entries until the cache fits its cap"""
+        if total <= self.max_size_bytes:
+            return
+        rows = connection.execute(
+            "SELECT key, size FROM entries ORDER BY last_access"
+        )
+        expired = []
+        freed = 0
+        for key, size in rows:
+            if total - freed <= self.max_size_bytes:
+                break
+            expired.append((key,))
+            freed += size
+        connection.executemany("DELETE FROM entries WHERE key = ?", expired)
+        self._add_size(connection, -freed)
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("DELETE FROM entries")
+                connection.execute("UPDATE meta SET total_size = 0 WHERE id = 1")
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    def get_stats(self):
+        """
+        Get hit/miss counters and current cache size
+
+        Returns:
+            dict: Cache statistics
+        """
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT (SELECT COUNT(*) FROM entries), total_size FROM meta WHERE id = 1"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": size
+        }
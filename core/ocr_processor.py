@@ -1,87 +1,530 @@
-"""
-OCR processing functionality for PDF documents
-"""
-
-import easyocr
-import fitz  # PyMuPDF for PDF handling
-import streamlit as st
-
-class OCRProcessor:
-    def __init__(self):
-        """Initialize EasyOCR reader"""
-        self.reader = easyocr.Reader(['en'])  # English language, CPU mode
-    
-    def pdf_to_images(self, pdf_file):
-        """
-        Convert PDF pages to images
-        
-        Args:
-            pdf_file: Streamlit file upload object
-            
-        Returns:
-            list: List of image bytes
-        """
-        try:
-            doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-            images = []
-            
-            for page_num in range(doc.page_count):
-                page = doc.load_page(page_num)
-                pix = page.get_pixmap()
-                img = pix.tobytes("ppm")
-                images.append(img)
-            
-            doc.close()
-            return images
-        except Exception as e:
-            st.error(f"Error converting PDF to images: {str(e)}")
-            return []
-    
-    def extract_text_from_images(self, images):
-        """
-        Extract text from images using EasyOCR
-        
-        Args:
-            images: List of image bytes
-            
-        Returns:
-            str: Extracted text from all images
-        """
-        try:
-            results = []
-            
-            for img in images:
-                result = self.reader.readtext(img)
-                # Extract text (ignoring bounding box and confidence score)
-                extracted_text = " ".join([text[1] for text in result])
-                results.append(extracted_text)
-            
-            return "\n".join(results)
-        except Exception as e:
-            st.error(f"Error extracting text from images: {str(e)}")
-            return ""
-    
-    def process_pdf(self, pdf_file):
-        """
-        Complete PDF processing pipeline
-        
-        Args:
-            pdf_file: Streamlit file upload object
-            
-        Returns:
-            str: Extracted text or None if failed
-        """
-        try:
-            images = self.pdf_to_images(pdf_file)
-            if not images:
-                return None
-                
-            extracted_text = self.extract_text_from_images(images)
-            
-            if not extracted_text.strip():
-                return None
-                
-            return extracted_text
-        except Exception as e:
-            st.error(f"Error processing PDF: {str(e)}")
-            return None
\ No newline at end of file
+"""
+OCR processing functionality for PDF documents
+"""
+
+import os
+from concurrent.futures import Future
+from contextlib import ExitStack
+from core.reporting import report_error
+from core.model_registry import get_model_registry
+from core.ocr_backends import get_ocr_backend
+from core.ocr_cache import OCRCache
+from core.ingest import open_pdf
+from core.profiling import NULL_PROFILER
+from core.page_screening import PageScreener, PAGE_BLANK, PAGE_DUPLICATE
+from config.settings import (
+    TEXT_LAYER_MIN_CHARS, TEXT_LAYER_MIN_COVERAGE, OCR_PARALLEL, OCR_WORKERS, OCR_TORCH_THREADS,
+    OCR_BATCHED, OCR_BATCH_SIZE, OCR_PROFILE, OCR_CACHE_ENABLED, PAGE_SCREENING, PIPELINE_PAGE_WINDOW, RENDER_DPI, RENDER_GRAYSCALE
+)
+
+# Page extraction paths reported per page by process_pdf
+SOURCE_TEXT_LAYER = "text_layer"
+SOURCE_OCR = "ocr"
+SOURCE_BLANK = "blank"  # Rendered but skipped: no ink
+SOURCE_DUPLICATE = "duplicate"  # Rendered, OCR result reused from an earlier copy
+
+# Backend owned by an OCR pool worker process, loaded once by _init_ocr_worker
+_worker_backend = None
+
+class ExtractedPage:
+    """Text extracted from one page, with OCR regions when the page was OCR'd"""
+    
+    __slots__ = ("page_num", "text", "source", "regions")
+    
+    def __init__(self, page_num, text, source, regions=None):
+        self.page_num = page_num
+        self.text = text
+        self.source = source
+        # [x0, y0, x1, y1, start, end, confidence] per OCR text box, in
+        # rendered pixel coordinates; start/end are offsets into text
+        self.regions = regions
+
+def build_page_result(readtext_result):
+    """
+    Join OCR output into page text while keeping box positions
+    
+    Args:
+        readtext_result: List of (box, text, confidence) from an OCR backend
+        
+    Returns:
+        dict: {"text": page text, "regions": [[x0, y0, x1, y1, start, end, confidence], ...]}
+    """
+    parts = []
+    regions = []
+    offset = 0
+    for box, text, confidence in readtext_result:
+        if parts:
+            offset += 1  # Joining space
+        xs = [float(point[0]) for point in box]
+        ys = [float(point[1]) for point in box]
+        regions.append([min(xs), min(ys), max(xs), max(ys), offset, offset + len(text),
+                        round(float(confidence), 4)])
+        parts.append(text)
+        offset += len(text)
+    return {"text": " ".join(parts), "regions": regions}
+
+def _init_ocr_worker(profile, torch_threads):
+    """
+    Load the OCR engine of a profile once when a pool worker process starts
+    
+    Args:
+        profile (str): Key of OCR_PROFILES
+        torch_threads (int): Torch intra-op threads for this worker
+    """
+    global _worker_backend
+    import torch
+    torch.set_num_threads(torch_threads)
+    _worker_backend = get_ocr_backend(profile)
+    _worker_backend.load()
+
+def _ocr_image_worker(img):
+    """
+    OCR a single page image inside a pool worker
+    
+    Args:
+        img: Image bytes or NumPy array
+        
+    Returns:
+        dict: Page result from build_page_result
+    """
+    return build_page_result(_worker_backend.readtext(img))
+
+def resolve_worker_count(workers, torch_threads):
+    """
+    Resolve the OCR pool size, deriving it from the CPU count when unset
+    
+    Args:
+        workers (int): Requested worker count, 0 for automatic
+        torch_threads (int): Torch threads used by each worker
+        
+    Returns:
+        int: Number of worker processes to start
+    """
+    if workers > 0:
+        return workers
+    return max(1, (os.cpu_count() or 1) // max(1, torch_threads))
+
+class OCRProcessor:
+    def __init__(self, text_layer_min_chars=TEXT_LAYER_MIN_CHARS, parallel=OCR_PARALLEL,
+                 workers=OCR_WORKERS, torch_threads=OCR_TORCH_THREADS, use_cache=OCR_CACHE_ENABLED,
+                 dpi=None, grayscale=RENDER_GRAYSCALE, batched=OCR_BATCHED,
+                 batch_size=OCR_BATCH_SIZE, ocr_profile=OCR_PROFILE, screen_pages=PAGE_SCREENING,
+                 text_layer_min_coverage=TEXT_LAYER_MIN_COVERAGE):
+        """
+        Initialize OCR settings; models come from the shared model registry
+        
+        Args:
+            ocr_profile (str): OCR engine profile, a key of OCR_PROFILES
+            dpi (int): Render resolution, defaults to the profile's dpi or RENDER_DPI
+            screen_pages (bool): Skip blank pages and reuse OCR for repeated pages
+            text_layer_min_coverage (float): Share of a page's image area its
+                text blocks must cover for the text layer to be used
+        """
+        self.ocr_profile = ocr_profile
+        self.backend = get_ocr_backend(ocr_profile)
+        self.text_layer_min_chars = text_layer_min_chars
+        self.text_layer_min_coverage = text_layer_min_coverage
+        self.dpi = dpi or self.backend.options.get("dpi", RENDER_DPI)
+        self.grayscale = grayscale
+        self.page_sources = []  # Extraction path taken by each page of the last PDF
+        self.page_count = 0  # Pages in the PDF being (or last) extracted
+        self.pages_done = 0  # Pages of that PDF extracted and handed on so far
+        self.screen_pages = screen_pages
+        self.cache = OCRCache() if use_cache else None
+        self.cache_hits = 0  # OCR pages of the last PDF served from the cache
+        self.profiler = NULL_PROFILER  # Set by DocumentProcessor when profiling
+        
+        # Parallel OCR settings; the worker pool is shared through the registry
+        self.parallel = parallel
+        self.workers = resolve_worker_count(workers, torch_threads)
+        self.torch_threads = torch_threads
+        
+        # Batched recognition across the pages of each window
+        self.batched = batched
+        self.batch_size = batch_size
+    
+    @property
+    def extraction_key(self):
+        """Settings that change the extracted text; worker and batch settings do not"""
+        return (self.backend.cache_namespace, self.dpi, self.grayscale,
+                self.text_layer_min_chars, self.text_layer_min_coverage, self.screen_pages)
+    
+    def open_document(self, pdf_file):
+        """
+        Open an uploaded PDF with PyMuPDF
+        
+        Spooled uploads and paths are opened from disk; other file objects
+        are read into memory.
+        
+        Args:
+            pdf_file: SpooledDocument, path or file upload object
+            
+        Returns:
+            fitz.Document: Opened document
+        """
+        return open_pdf(pdf_file)
+    
+    def render_page(self, page):
+        """
+        Rasterize a page for OCR without an encode/decode round trip
+        
+        Args:
+            page: PyMuPDF page
+            
+        Returns:
+            tuple: (pixmap, array) where array is a NumPy view of the pixmap
+                samples; the pixmap owns the memory and must outlive the array
+        """
+        import fitz  # PyMuPDF, imported when the first page is rendered
+        import numpy as np
+        
+        colorspace = fitz.csGRAY if self.grayscale else fitz.csRGB
+        pix = page.get_pixmap(dpi=self.dpi, colorspace=colorspace, alpha=False)
+        if pix.n == 1:
+            shape, strides = (pix.height, pix.width), (pix.stride, 1)
+        else:
+            shape, strides = (pix.height, pix.width, pix.n), (pix.stride, pix.n, 1)
+        array = np.ndarray(shape, dtype=np.uint8, buffer=pix.samples_mv, strides=strides)
+        return pix, array
+    
+    def extract_text_layer(self, page):
+        """
+        Read the native text layer of a page
+        
+        Args:
+            page: PyMuPDF page
+            
+        Returns:
+            str: Page text, or None if the page needs OCR: it has too little
+                selectable text (scanned or image-only pages), or its text
+                covers only part of its images
+        """
+        text = page.get_text("text")
+        content_chars = sum(1 for char in text if not char.isspace())
+        if content_chars < self.text_layer_min_chars:
+            return None
+        if not self.text_covers_images(page):
+            return None
+        return text.strip()
+    
+    def text_covers_images(self, page):
+        """
+        Check that the text layer accounts for the images on a page
+        
+        A scanned page with a typed header, stamp or Bates number has enough
+        text to pass the character threshold while its content is only in
+        the image. Small images such as logos are covered by the text
+        around them and do not send a page to OCR.
+        
+        Args:
+            page: PyMuPDF page
+            
+        Returns:
+            bool: True if the page has no images, or its text blocks cover at
+                least text_layer_min_coverage of their area
+        """
+        import fitz  # PyMuPDF
+        
+        page_rect = page.rect
+        image_area = sum(fitz.Rect(info["bbox"]).intersect(page_rect).get_area()
+                         for info in page.get_image_info())
+        if not image_area:
+            return True
+        text_area = sum(fitz.Rect(block[:4]).intersect(page_rect).get_area()
+                        for block in page.get_text("blocks") if block[6] == 0)
+        return text_area >= self.text_layer_min_coverage * image_area
+    
+    def pdf_to_images(self, pdf_file):
+        """
+        Convert PDF pages to images
+        
+        Args:
+            pdf_file: Streamlit file upload object
+            
+        Returns:
+            list: List of image bytes
+        """
+        try:
+            doc = self.open_document(pdf_file)
+            images = []
+            
+            for page_num in range(doc.page_count):
+                page = doc.load_page(page_num)
+                pix = page.get_pixmap()
+                img = pix.tobytes("ppm")
+                images.append(img)
+            
+            doc.close()
+            return images
+        except Exception as e:
+            report_error(f"Error converting PDF to images: {str(e)}")
+            return []
+    
+    def extract_text_from_images(self, images):
+        """
+        Extract text from images with the profile's OCR engine
+        
+        Args:
+            images: List of image bytes
+            
+        Returns:
+            str: Extracted text from all images
+        """
+        try:
+            return "\n".join(result["text"] for result in self.ocr_images(images))
+        except Exception as e:
+            report_error(f"Error extracting text from images: {str(e)}")
+            return ""
+    
+    def ocr_images(self, images):
+        """
+        Run the profile's OCR engine on each image
+        
+        In parallel mode pages are spread across the worker pool; in batched
+        mode the text regions of all images are recognized together. Results
+        are returned in page order either way.
+        
+        Args:
+            images: List of image bytes or NumPy arrays
+            
+        Returns:
+            list: Page result (text and regions) for each image, in input order
+        """
+        if self.parallel and len(images) > 1:
+            with get_model_registry().ocr_pool(self.ocr_profile, self.workers,
+                                               self.torch_threads) as pool:
+                return list(pool.map(_ocr_image_worker, images))
+        
+        if self.batched and len(images) > 1:
+            return [build_page_result(result)
+                    for result in self.backend.readtext_many(images, self.batch_size)]
+        
+        return [build_page_result(self.backend.readtext(img)) for img in images]
+    
+    def ocr_images_cached(self, images):
+        """
+        OCR images, reusing cached results for pages seen before
+        
+        Args:
+            images: List of image bytes or NumPy arrays
+            
+        Returns:
+            list: Page result (text and regions) for each image, in input order
+        """
+        if self.cache is None:
+            return self.ocr_images(images)
+        
+        namespace = self.backend.cache_namespace
+        keys = [self.cache.make_key(img, namespace) for img in images]
+        results = []
+        missing = []
+        for index, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is None:
+                missing.append(index)
+            else:
+                self.cache_hits += 1
+            results.append(cached)
+        
+        fresh = self.ocr_images([images[index] for index in missing])
+        for index, result in zip(missing, fresh):
+            results[index] = result
+            self.cache.put(keys[index], result)
+        
+        return results
+    
+    def iter_pages(self, pdf_file, window=PIPELINE_PAGE_WINDOW, progress=None):
+        """
+        Extract text page by page, holding at most ``window`` rendered pages
+        
+        Pages with a usable text layer are read directly and yielded as soon
+        as no earlier page is waiting for OCR; only scanned or image-only
+        pages are rasterized and OCR'd. Rendered pages are OCR'd together
+        once ``window`` pages are in flight, and dropped before the next
+        group is rendered, so peak memory does not grow with document
+        length. In parallel mode each rendered page goes to the worker pool
+        as soon as it is rendered and the window holds at least two pages
+        per worker, so workers keep busy while later pages render. With
+        page screening on, blank rendered pages are not OCR'd and repeats of
+        an earlier page reuse its result. The path taken by each page is
+        recorded in ``self.page_sources``.
+        
+        Args:
+            pdf_file: Streamlit file upload object
+            window (int): Maximum number of pages in flight, rendered or not
+            progress (callable): Called as progress(pages_done, total_pages)
+                before each page is read and as each page is handed on; may
+                raise (e.g. JobCancelled) to stop extraction
+            
+        Yields:
+            ExtractedPage: Extracted pages in page order
+        """
+        self.page_sources = []
+        self.cache_hits = 0
+        doc = self.open_document(pdf_file)
+        self.page_count = doc.page_count
+        self.pages_done = 0
+        screener = PageScreener() if self.screen_pages else None
+        leases = ExitStack()  # Holds the OCR pool lease until extraction ends
+        pending = []  # ExtractedPage objects awaiting OCR of their window
+        ocr_indices = []
+        ocr_images = []  # NumPy views into the pixmaps below
+        pixmaps = []
+        started = []  # (future, cache key) of pages sent to the pool, in parallel mode
+        signatures = []  # PageSignature of each OCR'd page, to share its result
+        duplicates = []  # (index in pending, signature of the earlier copy)
+        try:
+            pool = None
+            if self.parallel and not self.profiler.enabled:
+                pool = leases.enter_context(get_model_registry().ocr_pool(
+                    self.ocr_profile, self.workers, self.torch_threads))
+                # Enough pages in flight to keep every worker busy
+                window = max(window, 2 * self.workers)
+            for page_num in range(doc.page_count):
+                if progress is not None:
+                    progress(self.pages_done, doc.page_count)
+                page = doc.load_page(page_num)
+                text = self.extract_text_layer(page)
+                source = SOURCE_TEXT_LAYER if text is not None else SOURCE_OCR
+                extracted = ExtractedPage(page_num, text, source)
+                if text is None:
+                    with self.profiler.stage(f"render-page-{page_num + 1}"):
+                        pix, array = self.render_page(page)
+                        kind, signature = (screener.screen(page_num, array) if screener
+                                           else (None, None))
+                    if kind == PAGE_BLANK:
+                        extracted.source, extracted.text, extracted.regions = SOURCE_BLANK, "", []
+                    elif kind == PAGE_DUPLICATE:
+                        extracted.source = SOURCE_DUPLICATE
+                        duplicates.append((len(pending), signature))
+                    else:
+                        ocr_indices.append(len(pending))
+                        signatures.append(signature)
+                        if pool is not None:
+                            started.append(self._start_ocr(pool, array))
+                        else:
+                            pixmaps.append(pix)
+                            ocr_images.append(array)
+                    # Drop the view before the pixmap that owns its memory
+                    del array, pix
+                self.page_sources.append(extracted.source)
+                pending.append(extracted)
+                
+                # Pages ahead of any OCR'd page are handed on at once; OCR'd
+                # pages wait for their window, holding back the pages after them
+                if not ocr_indices or len(pending) >= window:
+                    yield from self._flush_pages(pending, ocr_indices, ocr_images, signatures, duplicates,
+                                                 progress, started)
+                    pending, ocr_indices, signatures, duplicates = [], [], [], []
+                    # Release the array views before the pixmaps that own their memory
+                    ocr_images.clear()
+                    pixmaps.clear()
+                    started.clear()
+            
+            yield from self._flush_pages(pending, ocr_indices, ocr_images, signatures, duplicates,
+                                         progress, started)
+        finally:
+            for future, _ in started:
+                future.cancel()
+            leases.close()
+            ocr_images.clear()
+            pixmaps.clear()
+            doc.close()
+    
+    def _start_ocr(self, pool, img):
+        """
+        Send one rendered page to the OCR worker pool
+        
+        Args:
+            pool (ProcessPoolExecutor): Shared OCR worker pool
+            img: NumPy view of the rendered page
+            
+        Returns:
+            tuple: (future, cache key); cached pages resolve at once and get
+                no key, fresh results are cached under the key once collected
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(img, self.backend.cache_namespace)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                future = Future()
+                future.set_result(cached)
+                return future, None
+        # The pool pickles its arguments later, so it gets its own copy
+        # rather than a view into a pixmap that is about to be freed
+        return pool.submit(_ocr_image_worker, img.copy()), key
+    
+    def _flush_pages(self, pending, ocr_indices, ocr_images, signatures, duplicates, progress,
+                     started):
+        """OCR a window of rendered pages and yield the window in page order"""
+        if started:
+            results = []
+            for future, key in started:
+                result = future.result()
+                if key is not None:
+                    self.cache.put(key, result)
+                results.append(result)
+        elif self.profiler.enabled:
+            # One page at a time so each page gets its own profile
+            results = []
+            for index, img in zip(ocr_indices, ocr_images):
+                with self.profiler.stage(f"ocr-page-{pending[index].page_num + 1}"):
+                    results.extend(self.ocr_images_cached([img]))
+        else:
+            results = self.ocr_images_cached(ocr_images) if ocr_images else []
+        for index, result, signature in zip(ocr_indices, results, signatures):
+            pending[index].text = result["text"]
+            pending[index].regions = result["regions"]
+            if signature is not None:
+                signature.result = result
+        # Earlier copies are in this window or an earlier one, so all have results now
+        for index, original in duplicates:
+            pending[index].text = original.result["text"]
+            pending[index].regions = original.result["regions"]
+        for extracted in pending:
+            self.pages_done += 1
+            if progress is not None:
+                progress(self.pages_done, self.page_count)
+            yield extracted
+    
+    def process_pdf(self, pdf_file):
+        """
+        Complete PDF processing pipeline
+        
+        Args:
+            pdf_file: Streamlit file upload object
+            
+        Returns:
+            str: Extracted text or None if failed
+        """
+        try:
+            extracted_text = "\n".join(page.text for page in self.iter_pages(pdf_file))
+            
+            if not extracted_text.strip():
+                return None
+                
+            return extracted_text
+        except Exception as e:
+            report_error(f"Error processing PDF: {str(e)}")
+            return None
+    
+    def get_extraction_stats(self):
+        """
+        Summarize which extraction path the pages of the last PDF took
+        
+        Returns:
+            dict: Page counts per extraction path
+        """
+        text_layer_pages = self.page_sources.count(SOURCE_TEXT_LAYER)
+        ocr_pages = self.page_sources.count(SOURCE_OCR)
+        return {
+            "total_pages": len(self.page_sources),
+            "text_layer_pages": text_layer_pages,
+            "ocr_pages": ocr_pages,
+            "blank_pages": self.page_sources.count(SOURCE_BLANK),
+            "duplicate_pages": self.page_sources.count(SOURCE_DUPLICATE),
+            "ocr_cache_hits": self.cache_hits,
+            "ocr_profile": self.ocr_profile
+        }
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Pre-OCR screening of rendered pages: blank and repeated page detection
+
+Scanned packets repeat cover sheets and disclaimers and carry blank
+separator pages. Before a rendered page is OCR'd it gets a cheap
+signature:
+
+- ink coverage, the fraction of dark pixels; pages below the blank
+  threshold are skipped;
+- a 64-bit difference hash (dHash) of the page, used to find earlier
+  pages of the document that look the same;
+- the page's ink mask, bit-packed, used to confirm a match. The two masks
+  may differ by at most a couple of pixels in any 4x4 window, so a single
+  changed digit is enough to keep pages apart: the same form with
+  different values filled in is never treated as a copy.
+
+A confirmed repeat reuses the OCR result of its first copy. Everything is
+plain NumPy on the rendered page array.
+"""
+
+from collections import OrderedDict
+from config.settings import (
+    PAGE_BLANK_MAX_INK, PAGE_HASH_MAX_DISTANCE, PAGE_DUPLICATE_MAX_PIXELS, PAGE_DEDUP_MAX_PAGES
+)
+
+# Gray level below which a pixel counts as ink
+INK_LEVEL = 128
+
+# Results of screen()
+PAGE_NEW = "new"
+PAGE_BLANK = "blank"
+PAGE_DUPLICATE = "duplicate"
+
+# Side of the window in which differing ink pixels are counted
+WINDOW = 4
+
+def _block_mean(gray, rows, cols):
+    """Average a 2-D array down to rows x cols blocks"""
+    import numpy as np
+
+    row_edges = np.linspace(0, gray.shape[0], rows + 1).astype(int)[:-1]
+    col_edges = np.linspace(0, gray.shape[1], cols + 1).astype(int)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(gray, row_edges, axis=0), col_edges, axis=1)
+    counts = np.outer(np.diff(np.append(row_edges, gray.shape[0])),
+                      np.diff(np.append(col_edges, gray.shape[1])))
+    return sums / counts
+
+class PageSignature:
+    """Ink coverage, perceptual hash and thumbnail of one rendered page"""
+
+    __slots__ = ("page_num", "ink", "dhash", "width", "mask", "result")
+
+    def __init__(self, page_num, image):
+        """
+        Args:
+            page_num (int): Zero-based page number
+            image: Rendered page as a grayscale or RGB NumPy array
+        """
+        import numpy as np
+
+        gray = image if image.ndim == 2 else image.mean(axis=2)
+        ink = gray < INK_LEVEL
+        self.page_num = page_num
+        self.ink = float(np.count_nonzero(ink)) / ink.size
+        self.width = ink.shape[1]
+        self.mask = np.packbits(ink, axis=1)
+        # Every fourth pixel is plenty for a 9x8 block average
+        small = _block_mean(gray[::4, ::4].astype(np.float32), 8, 9)
+        bits = (small[:, 1:] > small[:, :-1]).ravel()
+        self.dhash = int("".join("1" if bit else "0" for bit in bits), 2)
+        self.result = None  # OCR result, once the page has been OCR'd
+
+    @property
+    def blank(self):
+        """Whether the page has too little ink to hold any text"""
+        return self.ink < PAGE_BLANK_MAX_INK
+
+    def matches(self, other):
+        """
+        Check whether two pages are copies of each other
+
+        Args:
+            other (PageSignature): Signature of an earlier page
+
+        Returns:
+            bool: True if the hashes are close and no window of the ink
+                masks differs by more than PAGE_DUPLICATE_MAX_PIXELS pixels
+        """
+        import numpy as np
+
+        if (self.dhash ^ other.dhash).bit_count() > PAGE_HASH_MAX_DISTANCE:
+            return False
+        if self.mask.shape != other.mask.shape or self.width != other.width:
+            return False
+        packed = self.mask ^ other.mask
+        if not packed.any():
+            return True
+        diff = np.unpackbits(packed, axis=1, count=self.width).astype(np.int32)
+        # Differing pixels in every WINDOW x WINDOW window, from an integral image
+        integral = np.zeros((diff.shape[0] + 1, diff.shape[1] + 1), dtype=np.int32)
+        integral[1:, 1:] = diff.cumsum(axis=0).cumsum(axis=1)
+        windows = (integral[WINDOW:, WINDOW:] - integral[:-WINDOW, WINDOW:]
+                   - integral[WINDOW:, :-WINDOW] + integral[:-WINDOW, :-WINDOW])
+        return bool(windows.max(initial=0) <= PAGE_DUPLICATE_MAX_PIXELS)
+
+class PageScreener:
+    """Tracks the distinct pages of one document to spot blanks and repeats"""
+
+    def __init__(self, max_pages=PAGE_DEDUP_MAX_PAGES):
+        """
+        Args:
+            max_pages (int): Distinct page signatures kept for matching,
+                least recently matched dropped first
+        """
+        self.max_pages = max_pages
+        self._seen = OrderedDict()  # page_num -> PageSignature
+        self.blank_pages = 0
+        self.duplicate_pages = 0
+
+    def screen(self, page_num, image):
+        """
+        Screen a rendered page before OCR
+
+        Args:
+            page_num (int): Zero-based page number
+            image: Rendered page as a NumPy array
+
+        Returns:
+            tuple: (kind, signature). kind is PAGE_BLANK (signature None),
+                PAGE_DUPLICATE with the signature of the earlier copy, or
+                PAGE_NEW with the page's own signature; store the page's OCR
+                result on it so later copies can reuse it
+        """
+        signature = PageSignature(page_num, image)
+        if signature.blank:
+            self.blank_pages += 1
+            return PAGE_BLANK, None
+        for seen_num, seen in reversed(self._seen.items()):
+            if signature.matches(seen):
+                self.duplicate_pages += 1
+                self._seen.move_to_end(seen_num)
+                return PAGE_DUPLICATE, seen
+        self._seen[page_num] = signature
+        while len(self._seen) > self.max_pages:
+            self._seen.popitem(last=False)
+        return PAGE_NEW, signature
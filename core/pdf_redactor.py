@@ -0,0 +1,124 @@
+"""
+In-place redaction of the original PDF
+
+Detected spans are mapped back to page coordinates and burned into the
+source document with PyMuPDF redaction annotations, so the output keeps
+the input's layout. Text-layer pages are located with search_for; OCR'd
+pages use the bounding boxes EasyOCR reported for each text region, which
+are in the coordinates of the rendered (rotated) page.
+
+A redacted passage that search_for cannot find, e.g. because of ligatures
+or hyphenation, would stay visible in the output, so apply raises instead
+of producing a partially redacted PDF.
+"""
+
+class RedactionIncompleteError(Exception):
+    """Raised by PDFRedactor.apply when redacted text cannot be located on its page"""
+
+class PDFRedactor:
+    def __init__(self, scale=1.0, fill=(0, 0, 0)):
+        """
+        Initialize an empty set of page redactions
+
+        Args:
+            scale (float): PDF points per rendered pixel (72 / render DPI)
+            fill (tuple): RGB fill color of redacted areas
+        """
+        self.scale = scale
+        self.fill = fill
+        self.search_terms = {}  # page_num -> strings to locate in the text layer
+        self.rects = {}  # page_num -> (x0, y0, x1, y1) areas in rendered-page points
+
+    def add_page(self, page, spans):
+        """
+        Record where the spans detected on one page are located
+
+        Args:
+            page (ExtractedPage): Extracted page the spans were found in
+            spans (list): RedactionSpan records with offsets into page.text
+        """
+        if not spans:
+            return
+        if page.regions is None:
+            terms = self.search_terms.setdefault(page.page_num, [])
+            terms.extend(page.text[span.start:span.end] for span in spans)
+        else:
+            rects = self.rects.setdefault(page.page_num, [])
+            rects.extend(self.locate_ocr_spans(page.regions, spans))
+
+    def locate_ocr_spans(self, regions, spans):
+        """
+        Map text spans onto the OCR boxes they fall in
+
+        Both lists are sorted by offset, so they are merged in one pass. When
+        a span covers only part of a box, the box is cut proportionally to
+        the character offsets, padded by half a character on each side.
+
+        Args:
+            regions (list): [x0, y0, x1, y1, start, end, confidence] OCR boxes
+            spans (list): RedactionSpan records with offsets into the page text
+
+        Returns:
+            list: (x0, y0, x1, y1) rectangles in points on the rendered page
+        """
+        rects = []
+        index = 0
+        for span in spans:
+            start, end = span.start, span.end
+            while index < len(regions) and regions[index][5] <= start:
+                index += 1
+            position = index
+            while position < len(regions) and regions[position][4] < end:
+                x0, y0, x1, y1, region_start, region_end, _ = regions[position]
+                length = max(1, region_end - region_start)
+                char_width = (x1 - x0) / length
+                left = x0 + (max(start, region_start) - region_start - 0.5) * char_width
+                right = x0 + (min(end, region_end) - region_start + 0.5) * char_width
+                rects.append((max(x0, left) * self.scale, y0 * self.scale,
+                              min(x1, right) * self.scale, y1 * self.scale))
+                position += 1
+        return rects
+
+    def has_redactions(self):
+        """Whether any page has something to redact"""
+        return bool(self.search_terms or self.rects)
+
+    def apply(self, doc):
+        """
+        Burn the recorded redactions into a document
+
+        Text under a redaction is removed and overlapping image pixels are
+        blanked, so nothing redacted can be recovered from the output. OCR
+        boxes are mapped from the rendered page back through the page's
+        rotation; page coordinates are already relative to the cropbox.
+
+        Args:
+            doc (fitz.Document): Original document, modified in place
+
+        Raises:
+            RedactionIncompleteError: If redacted text could not be located in
+                a page's text layer; the document must not be saved then
+        """
+        import fitz  # PyMuPDF
+        
+        missed = {}  # page_num -> passages search_for could not find
+        for page_num in sorted(set(self.search_terms) | set(self.rects)):
+            page = doc.load_page(page_num)
+            for term in self.search_terms.get(page_num, []):
+                # search_for matches within a line; spans may wrap
+                for line in term.splitlines():
+                    if line.strip():
+                        rects = page.search_for(line.strip())
+                        if not rects:
+                            missed[page_num] = missed.get(page_num, 0) + 1
+                        for rect in rects:
+                            page.add_redact_annot(rect, fill=self.fill)
+            for rect in self.rects.get(page_num, []):
+                page.add_redact_annot(fitz.Rect(rect) * page.derotation_matrix, fill=self.fill)
+            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_PIXELS)
+        if missed:
+            pages = ", ".join(str(page_num + 1) for page_num in sorted(missed))
+            raise RedactionIncompleteError(
+                f"{sum(missed.values())} redacted passages could not be located on page(s) "
+                f"{pages} and would stay visible; use the re-typeset PDF instead"
+            )
@@ -0,0 +1,135 @@
+"""
+Opt-in per-document profiling of pipeline stages
+
+A StageProfiler wraps each stage of one document in a cProfile run and a
+tracemalloc snapshot and saves them as artifacts:
+
+    <output_dir>/<timestamp>-<document>/
+        03-ocr-page-2.prof         # open with pstats or snakeviz
+        03-ocr-page-2.tracemalloc  # tracemalloc.Snapshot.load()
+        summary.json               # wall time and peak allocation per stage
+
+When profiling is off the pipeline uses NULL_PROFILER, whose stages are a
+shared no-op context manager.
+
+tracemalloc is process-wide, so tracing runs from the first active profiler
+until the last one finishes, and profiled stages of documents processed at
+the same time (job workers, service threads) run one at a time; otherwise
+one stage's peak and snapshot would include another's allocations.
+"""
+
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger("docshield")
+
+# Serializes profiled stages across threads; see the module docstring
+_stage_lock = threading.RLock()
+_tracing_lock = threading.Lock()
+_active_profilers = 0
+_started_tracing = False  # Whether profilers, not the caller, started tracemalloc
+
+def _acquire_tracing():
+    """Start tracemalloc for the first active profiler"""
+    global _active_profilers, _started_tracing
+    with _tracing_lock:
+        if not _active_profilers and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _active_profilers += 1
+
+def _release_tracing():
+    """Stop tracemalloc once the last active profiler finishes, if profilers started it"""
+    global _active_profilers, _started_tracing
+    with _tracing_lock:
+        _active_profilers -= 1
+        if not _active_profilers and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+class NullProfiler:
+    """Profiler used when profiling is off; every stage is a no-op"""
+
+    enabled = False
+    _stage = contextlib.nullcontext()
+
+    def stage(self, name):
+        """Return a no-op context manager"""
+        return self._stage
+
+    def finish(self):
+        """Nothing to save"""
+        return None
+
+NULL_PROFILER = NullProfiler()
+
+class StageProfiler:
+    """Profiler that records CPU and allocation artifacts per stage"""
+
+    enabled = True
+
+    def __init__(self, output_dir, document_name="document"):
+        """
+        Create the artifact directory for one document
+
+        Args:
+            output_dir (str): Root directory for profiling artifacts
+            document_name (str): Name used in the artifact directory
+        """
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", document_name) or "document"
+        self.run_dir = os.path.join(output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_name}")
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.stages = []
+        self._finished = False
+        _acquire_tracing()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Profile one stage
+
+        Args:
+            name (str): Stage name, e.g. "render-page-1"
+        """
+        with _stage_lock:
+            prefix = os.path.join(self.run_dir, f"{len(self.stages):02d}-{name}")
+            profile = cProfile.Profile()
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                seconds = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                profile.dump_stats(prefix + ".prof")
+                tracemalloc.take_snapshot().dump(prefix + ".tracemalloc")
+                self.stages.append({
+                    "stage": name,
+                    "seconds": round(seconds, 6),
+                    "peak_alloc_mb": round(peak / (1024 * 1024), 3)
+                })
+                logger.info("[PROFILE] %s: %.3fs, peak %.1f MB", name, seconds,
+                            peak / (1024 * 1024))
+
+    def finish(self):
+        """
+        Write the stage summary; tracing stops when no other profiler is active
+
+        Returns:
+            str: Directory holding the artifacts
+        """
+        with open(os.path.join(self.run_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages}, f, indent=2)
+        if not self._finished:
+            self._finished = True
+            _release_tracing()
+        return self.run_dir
@@ -0,0 +1,145 @@
+"""
+Single-pass, span-based redaction engine
+
+All detectors of a mode are compiled into one alternation regex, so the
+text is scanned once to collect non-overlapping typed spans, and the output
+is built with a single join. Cost is linear in the text length regardless
+of how many matches are found.
+"""
+
+import re
+from config.settings import (
+    AGGRESSIVE_DETECTORS, CONSERVATIVE_DETECTORS, DETECTOR_CONTEXT_WINDOW,
+    REDACTION_LABELS
+)
+
+class RedactionSpan:
+    """One redaction made by the engine, without the redacted text itself"""
+
+    __slots__ = ("type", "start", "end", "page", "pattern", "confidence")
+
+    def __init__(self, redaction_type, start, end, pattern, page=None, confidence=None):
+        self.type = redaction_type
+        self.start = start  # Offsets into the page (or input) text
+        self.end = end
+        self.page = page  # Zero-based page number, None outside a document
+        self.pattern = pattern  # Detector that matched, "<engine>:<index>"
+        self.confidence = confidence  # Lowest OCR confidence under the span, None for text layer
+
+    def to_dict(self):
+        """
+        Serialize the span for stats exports and audit logs
+
+        Returns:
+            dict: Span fields by name
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"RedactionSpan({self.type!r}, {self.start}, {self.end}, page={self.page}, "
+                f"pattern={self.pattern!r}, confidence={self.confidence})")
+
+class RedactionEngine:
+    def __init__(self, detectors, labels=REDACTION_LABELS, context_window=DETECTOR_CONTEXT_WINDOW,
+                 name="custom"):
+        """
+        Compile detectors into a single pattern
+
+        Args:
+            detectors (list): (redaction type, regex, case-insensitive, context keywords)
+                entries in priority order
+            labels (dict): Replacement label per redaction type
+            context_window (int): Characters around a match searched for context keywords
+            name (str): Engine name used in the pattern id of each span
+        """
+        self.name = name
+        self.labels = labels
+        self.context_window = context_window
+        self.detectors = []  # (redaction type, context keywords) per group
+
+        alternatives = []
+        for index, (redaction_type, pattern, ignore_case, context) in enumerate(detectors):
+            flags = "(?i:%s)" if ignore_case else "(?:%s)"
+            alternatives.append(f"(?P<d{index}>{flags % pattern})")
+            self.detectors.append((redaction_type, context))
+        self.pattern = re.compile("|".join(alternatives))
+
+    def find_spans(self, text):
+        """
+        Scan text once for sensitive spans
+
+        Matches are leftmost-first; where several detectors match at the same
+        position the earlier one wins, and spans never overlap.
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            list: RedactionSpan records in text order
+        """
+        spans = []
+        for match in self.pattern.finditer(text):
+            index = int(match.lastgroup[1:])
+            redaction_type, context = self.detectors[index]
+            start, end = match.span()
+            if context:
+                window = text[max(0, start - self.context_window):end + self.context_window].lower()
+                if not any(indicator in window for indicator in context):
+                    continue
+            spans.append(RedactionSpan(redaction_type, start, end, f"{self.name}:{index}"))
+        return spans
+
+    def redact(self, text):
+        """
+        Replace every detected span with its redaction label
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            tuple: (redacted_text, spans)
+        """
+        spans = self.find_spans(text)
+        return self.apply(text, spans), spans
+
+    def apply(self, text, spans):
+        """
+        Replace spans of a text with their redaction labels in one join
+
+        Args:
+            text (str): Text the span offsets point into
+            spans (list): Non-overlapping RedactionSpan records in text order
+
+        Returns:
+            str: Redacted text
+        """
+        if not spans:
+            return text
+
+        parts = []
+        position = 0
+        for span in spans:
+            parts.append(text[position:span.start])
+            parts.append(self.labels[span.type])
+            position = span.end
+        parts.append(text[position:])
+        return "".join(parts)
+
+# Compiled once per process and shared by every TextRedactor
+_engines = {}
+
+def get_engine(mode):
+    """
+    Get the compiled engine for a redaction mode
+
+    Args:
+        mode (str): "conservative" or "aggressive"
+
+    Returns:
+        RedactionEngine: Shared engine instance
+    """
+    key = "conservative" if mode == "conservative" else "aggressive"
+    if key not in _engines:
+        detectors = CONSERVATIVE_DETECTORS if key == "conservative" else AGGRESSIVE_DETECTORS
+        _engines[key] = RedactionEngine(detectors, name=key)
+    return _engines[key]
@@ -1,142 +1,175 @@
-"""
-Text redaction functionality for sensitive information
-"""
-
-import re
-from config.settings import (
-    SSN_PATTERNS, CREDIT_CARD_PATTERNS, ADDRESS_PATTERNS,
-    OCR_CORRECTIONS, REDACTION_LABELS
-)
-
-class TextRedactor:
-    def __init__(self):
-        """Initialize the text redactor"""
-        pass
-    
-    def clean_ocr_text(self, text):
-        """
-        Clean common OCR errors before processing
-        
-        Args:
-            text (str): Raw OCR text
-            
-        Returns:
-            str: Cleaned text
-        """
-        cleaned_text = text
-        # Apply corrections conservatively
-        # For now, we'll be conservative and not auto-correct
-        # to avoid false corrections
-        return cleaned_text
-    
-    def detect_and_redact_patterns(self, text):
-        """
-        More sophisticated pattern detection that handles OCR errors
-        
-        Args:
-            text (str): Input text to redact
-            
-        Returns:
-            str: Text with sensitive information redacted
-        """
-        redacted_text = text
-        
-        # SSN Detection with OCR error tolerance
-        potential_ssns = re.finditer(r'\b\d{3}[-\s<>o]\d{2}[-\s<>o]\d{4}\b', text, re.IGNORECASE)
-        for match in potential_ssns:
-            redacted_text = redacted_text.replace(match.group(), REDACTION_LABELS["ssn"])
-        
-        # Credit card patterns
-        potential_ccs = re.finditer(r'\b\d{4}[\s\-]\d{4}[\s\-]\d{3}[A-Za-z0-9][\s\-][A-Za-z0-9]\d{2,3}\b', text)
-        for match in potential_ccs:
-            redacted_text = redacted_text.replace(match.group(), REDACTION_LABELS["credit_card"])
-        
-        # Standard credit card patterns
-        potential_ccs_standard = re.finditer(r'\b\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b', text)
-        for match in potential_ccs_standard:
-            redacted_text = redacted_text.replace(match.group(), REDACTION_LABELS["credit_card"])
-        
-        # Address patterns - be more conservative
-        address_matches = re.finditer(r'\b\d{1,4}\s+[A-Za-z]+\s+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)\b', text, re.IGNORECASE)
-        for match in address_matches:
-            redacted_text = redacted_text.replace(match.group(), REDACTION_LABELS["address"])
-        
-        # ZIP codes with context check
-        zip_matches = re.finditer(r'\b\d{5}(?:-\d{4})?\b', text)
-        for match in zip_matches:
-            context = text[max(0, match.start()-10):match.end()+10].lower()
-            if any(indicator in context for indicator in ['zip', 'postal', 'address', 'mail']):
-                redacted_text = redacted_text.replace(match.group(), REDACTION_LABELS["zip"])
-        
-        return redacted_text
-    
-    def redact_simple_patterns(self, text):
-        """
-        Very conservative redaction - only redacts very obvious patterns
-        
-        Args:
-            text (str): Input text to redact
-            
-        Returns:
-            str: Text with labeled sensitive information redacted
-        """
-        redacted_text = text
-        
-        # Only redact very clear SSN patterns
-        redacted_text = re.sub(r'\bSSN:\s*\d{3}[-\s<>]\d{2}[-\s<>]\d{4}\b', 
-                              REDACTION_LABELS["ssn"], redacted_text, flags=re.IGNORECASE)
-        redacted_text = re.sub(r'\bSocial Security:\s*\d{3}[-\s<>]\d{2}[-\s<>]\d{4}\b', 
-                              REDACTION_LABELS["ssn"], redacted_text, flags=re.IGNORECASE)
-        
-        # Only redact when explicitly labeled as credit card
-        redacted_text = re.sub(r'\bCredit Card:\s*\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b', 
-                              REDACTION_LABELS["credit_card"], redacted_text, flags=re.IGNORECASE)
-        redacted_text = re.sub(r'\bCard Number:\s*\d{4}[\s\-]\d{4}[\s\-]\d{4}[\s\-]\d{4}\b', 
-                              REDACTION_LABELS["credit_card"], redacted_text, flags=re.IGNORECASE)
-        
-        # Only redact when explicitly labeled as address
-        redacted_text = re.sub(r'\bAddress:\s*[^\n]+', 
-                              REDACTION_LABELS["address"], redacted_text, flags=re.IGNORECASE)
-        redacted_text = re.sub(r'\bZIP:\s*\d{5}(?:-\d{4})?\b', 
-                              REDACTION_LABELS["zip"], redacted_text, flags=re.IGNORECASE)
-        
-        return redacted_text
-    
-    def redact_text(self, text, mode="conservative"):
-        """
-        Main redaction function with selectable modes
-        
-        Args:
-            text (str): Input text to redact
-            mode (str): "conservative" or "aggressive"
-            
-        Returns:
-            str: Redacted text
-        """
-        # First clean the OCR text
-        cleaned_text = self.clean_ocr_text(text)
-        
-        # Apply redaction based on mode
-        if mode == "conservative":
-            return self.redact_simple_patterns(cleaned_text)
-        else:
-            return self.detect_and_redact_patterns(cleaned_text)
-    
-    def get_redaction_stats(self, redacted_text):
-        """
-        Get statistics about redactions performed
-        
-        Args:
-            redacted_text (str): Text after redaction
-            
-        Returns:
-            dict: Statistics about redactions
-        """
-        stats = {
-            "ssn_count": redacted_text.count(REDACTION_LABELS["ssn"]),
-            "credit_card_count": redacted_text.count(REDACTION_LABELS["credit_card"]),
-            "address_count": redacted_text.count(REDACTION_LABELS["address"]),
-            "zip_count": redacted_text.count(REDACTION_LABELS["zip"]),
-            "total_redactions": redacted_text.count('[REDACTED')
-        }
-        return stats
\ No newline at end of file
+"""
+Text redaction functionality for sensitive information
+"""
+
+from config.settings import REDACTION_LABELS
+from core.redaction_engine import get_engine
+from core.normalization import get_normalizer
+
+class TextRedactor:
+    def __init__(self):
+        """Initialize the text redactor"""
+        pass
+    
+    def clean_ocr_text(self, text):
+        """
+        Clean common OCR errors before processing
+        
+        Only corrections in digit context are applied (see
+        core.normalization), so ordinary words are left untouched.
+        
+        Args:
+            text (str): Raw OCR text
+            
+        Returns:
+            str: Cleaned text
+        """
+        cleaned_text, _ = get_normalizer().normalize(text)
+        return cleaned_text
+    
+    def detect_and_redact_patterns(self, text):
+        """
+        More sophisticated pattern detection that handles OCR errors
+        
+        Args:
+            text (str): Input text to redact
+            
+        Returns:
+            str: Text with sensitive information redacted
+        """
+        redacted_text, _ = self.redact_with_spans(text, mode="aggressive")
+        return redacted_text
+    
+    def redact_simple_patterns(self, text):
+        """
+        Very conservative redaction - only redacts very obvious patterns
+        
+        Args:
+            text (str): Input text to redact
+            
+        Returns:
+            str: Text with labeled sensitive information redacted
+        """
+        redacted_text, _ = self.redact_with_spans(text, mode="conservative")
+        return redacted_text
+    
+    def redact_text(self, text, mode="conservative"):
+        """
+        Main redaction function with selectable modes
+        
+        Args:
+            text (str): Input text to redact
+            mode (str): "conservative" or "aggressive"
+            
+        Returns:
+            str: Redacted text
+        """
+        # Apply redaction based on mode
+        if mode == "conservative":
+            return self.redact_simple_patterns(text)
+        else:
+            return self.detect_and_redact_patterns(text)
+    
+    def redact_with_spans(self, text, mode="conservative", page_num=None, regions=None,
+                          entity_spans=None):
+        """
+        Redact text and report where each redaction was made
+        
+        Detection runs on the OCR-normalized text; the spans are mapped back
+        and the original characters are replaced, so everything outside a
+        redaction is returned exactly as extracted.
+        
+        Args:
+            text (str): Input text to redact
+            mode (str): "conservative" or "aggressive"
+            page_num (int): Page the text came from, recorded on each span
+            regions (list): [x0, y0, x1, y1, start, end, confidence] OCR boxes
+                of the page, used to record OCR confidence on each span
+            entity_spans (list): RedactionSpan records from the NER detector,
+                in text order; pattern matches win where they overlap
+            
+        Returns:
+            tuple: (redacted_text, spans) with RedactionSpan records whose
+                offsets point into the input text
+        """
+        engine = get_engine(mode)
+        cleaned_text, offset_map = get_normalizer().normalize(text)
+        spans = engine.find_spans(cleaned_text)
+        for span in spans:
+            span.start = offset_map.to_original(span.start)
+            span.end = offset_map.to_original(span.end)
+            span.page = page_num
+        if entity_spans:
+            spans = self.merge_spans(spans, entity_spans)
+        if regions:
+            self.assign_ocr_confidence(spans, regions)
+        return engine.apply(text, spans), spans
+    
+    def merge_spans(self, spans, extra_spans):
+        """
+        Merge two sorted span lists, dropping extra spans that overlap a span
+        
+        Args:
+            spans (list): Non-overlapping RedactionSpan records in text order
+            extra_spans (list): RedactionSpan records in text order
+            
+        Returns:
+            list: Non-overlapping RedactionSpan records in text order
+        """
+        merged = []
+        index = 0
+        last_end = 0
+        for extra in extra_spans:
+            while index < len(spans) and spans[index].start < extra.end:
+                if spans[index].start >= last_end:
+                    merged.append(spans[index])
+                    last_end = spans[index].end
+                index += 1
+            if extra.start >= last_end:
+                merged.append(extra)
+                last_end = extra.end
+        merged.extend(spans[index:])
+        return merged
+    
+    def assign_ocr_confidence(self, spans, regions):
+        """
+        Record the lowest confidence of the OCR boxes under each span
+        
+        Both lists are sorted by offset, so they are merged in one pass.
+        
+        Args:
+            spans (list): RedactionSpan records of one page
+            regions (list): [x0, y0, x1, y1, start, end, confidence] OCR boxes
+        """
+        index = 0
+        for span in spans:
+            while index < len(regions) and regions[index][5] <= span.start:
+                index += 1
+            position = index
+            confidences = []
+            while position < len(regions) and regions[position][4] < span.end:
+                confidences.append(regions[position][6])
+                position += 1
+            if confidences:
+                span.confidence = min(confidences)
+    
+    def get_redaction_stats(self, spans):
+        """
+        Get statistics about redactions performed
+        
+        Counts come from the span records of the redaction pass, so labels
+        already present in the source text are not counted.
+        
+        Args:
+            spans (list): RedactionSpan records of the document
+            
+        Returns:
+            dict: Statistics about redactions
+        """
+        counts = dict.fromkeys(REDACTION_LABELS, 0)
+        for span in spans:
+            counts[span.type] = counts.get(span.type, 0) + 1
+        
+        stats = {f"{redaction_type}_count": count for redaction_type, count in counts.items()}
+        stats["total_redactions"] = len(spans)
+        return stats
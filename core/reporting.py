@@ -0,0 +1,57 @@
+"""
+Error reporting for the processing pipeline
+
+Core modules report user-facing errors through report_error instead of
+calling Streamlit directly, so the pipeline also runs headless (batch jobs,
+services). The Streamlit app routes errors to st.error; everything else
+logs them.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger("docshield")
+
+_error_handler = None
+_thread_state = threading.local()
+
+def set_error_handler(handler):
+    """
+    Route reported errors to a handler, e.g. st.error
+
+    Args:
+        handler: Callable taking the error message, or None to only log
+    """
+    global _error_handler
+    _error_handler = handler
+
+@contextmanager
+def thread_error_handler(handler):
+    """
+    Route errors reported on the current thread to a handler while the block runs
+    
+    Background jobs use this to collect their own errors; other threads keep
+    the process-wide handler.
+    
+    Args:
+        handler: Callable taking the error message
+    """
+    previous = getattr(_thread_state, "handler", None)
+    _thread_state.handler = handler
+    try:
+        yield
+    finally:
+        _thread_state.handler = previous
+
+def report_error(message):
+    """
+    Report a user-facing error
+
+    Args:
+        message (str): Error message
+    """
+    logger.error(message)
+    handler = getattr(_thread_state, "handler", None) or _error_handler
+    if handler is not None:
+        handler(message)
@@ -0,0 +1,96 @@
+"""
+Per-session memo of pipeline stage outputs
+
+A document goes through extraction (render and OCR), redaction and
+export. Each stage's output is stored under a key made of the document's
+content hash and the parameters of that stage and every stage before it:
+
+- extract: OCR profile, DPI, grayscale, text-layer threshold, screening
+- redact: the extract key plus redaction mode and NER
+- export: the redact key plus PDF layout and export kind
+
+Changing the redaction mode therefore reuses the extracted pages and only
+redacts and exports again; changing the PDF layout reuses the redaction
+too. Rendered page images are not kept: they are only needed for OCR, and
+the extracted pages are what later stages read.
+"""
+
+import threading
+from collections import OrderedDict
+from config.settings import STAGE_CACHE_MAX_ENTRIES
+
+STAGE_EXTRACT = "extract"
+STAGE_REDACT = "redact"
+STAGE_EXPORT = "export"
+
+class StageCache:
+    """Bounded LRU map from stage keys to stage outputs, shared by a session's jobs"""
+
+    def __init__(self, max_entries=STAGE_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            max_entries (int): Stage outputs kept, least recently used dropped first
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(stage, upstream_key, *params):
+        """
+        Build a stage key
+
+        Args:
+            stage (str): STAGE_EXTRACT, STAGE_REDACT or STAGE_EXPORT
+            upstream_key (tuple or str): Key of the previous stage, or the
+                document hash for extraction
+            *params: Parameters of this stage
+
+        Returns:
+            tuple: Hashable key that changes with any upstream parameter
+        """
+        return (upstream_key, stage) + params
+
+    def get(self, key):
+        """
+        Look up a stage output
+
+        Args:
+            key (tuple): Key from make_key
+
+        Returns:
+            Stored output, or None on a miss
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a stage output
+
+        Args:
+            key (tuple): Key from make_key
+            value: Stage output; must not be changed once stored
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def clear(self):
+        """Drop every stored output"""
+        with self._lock:
+            self._entries.clear()
@@ -1,95 +1,257 @@
-"""
-Main Streamlit application for AI-Powered Document Redaction System
-
-Author: Enamul Hasan Shagato
-"""
-
-import streamlit as st
-import sys
-import os
-
-# Add project root to Python path for imports
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from ui.components import UIComponents
-from utils.helpers import DocumentProcessor, validate_file_upload, get_redaction_mode_description
-
-def main():
-    """Main application function"""
-    
-    # Initialize components
-    ui = UIComponents()
-    processor = DocumentProcessor()
-    
-    # Configure page
-    ui.render_page_config()
-    ui.render_custom_css()
-    
-    # Render header
-    ui.render_header()
-    
-    # Render sidebar and get settings
-    redaction_mode, stats_placeholder = ui.render_sidebar()
-    
-    # Main content area
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        # File upload section
-        uploaded_pdf = ui.render_upload_section()
-        
-        if uploaded_pdf is not None:
-            # Validate file
-            if not validate_file_upload(uploaded_pdf):
-                return
-            
-            # Display file info
-            ui.render_file_info(uploaded_pdf)
-            
-            # Processing options
-            show_original, auto_download = ui.render_processing_options()
-            
-            # Process button
-            if st.button("🚀 Process Document", type="primary", use_container_width=True):
-                
-                # Progress indicators
-                progress_bar, status_text = ui.render_progress_section()
-                
-                # Processing steps with progress updates
-                ui.update_progress(progress_bar, status_text, 10, "🔄 Initializing OCR engine...")
-                ui.update_progress(progress_bar, status_text, 30, "📖 Extracting text from PDF...")
-                
-                # Process the document
-                result = processor.process_document(uploaded_pdf, redaction_mode)
-                redacted_text, output_pdf, output_word, stats = result
-                
-                ui.update_progress(progress_bar, status_text, 70, "🔍 Applying redaction patterns...")
-                ui.update_progress(progress_bar, status_text, 90, "📄 Generating output files...")
-                ui.update_progress(progress_bar, status_text, 100, "✅ Processing complete!")
-                
-                # Handle results
-                if redacted_text is None:
-                    st.error("❌ No text could be extracted. Please ensure the document contains readable text.")
-                else:
-                    # Success message
-                    ui.render_success_message()
-                    
-                    # Update statistics in sidebar
-                    if stats:
-                        ui.render_statistics(stats_placeholder, stats)
-                    
-                    # Display results in tabs
-                    ui.render_results_tabs(redacted_text, stats, redaction_mode, show_original)
-                    
-                    # Download section
-                    ui.render_download_section(output_pdf, output_word)
-    
-    # Right column - Tips and information
-    with col2:
-        ui.render_tips_section()
-    
-    # Footer
-    ui.render_footer()
-
-if __name__ == "__main__":
+"""
+Main Streamlit application for AI-Powered Document Redaction System
+
+Author: Enamul Hasan Shagato
+"""
+
+import streamlit as st
+import sys
+import os
+import uuid
+
+# Add project root to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ui.components import UIComponents
+from utils.helpers import (
+    process_document_job, reprocess_document, validate_file_upload, get_redaction_mode_description
+)
+from core.model_registry import get_model_registry
+from core.reporting import set_error_handler
+from core.ingest import SpooledDocument
+from core.bundles import DocumentBundle, is_zip_upload
+from core.jobs import get_job_queue, QueueFullError, JOB_CANCELLED, JOB_DONE
+from core.stage_cache import StageCache
+from config.settings import JOB_POLL_SECONDS
+
+@st.cache_resource(show_spinner="🔄 Loading OCR models...")
+def warm_up_models():
+    """Load OCR models once per server process; every session reuses them"""
+    registry = get_model_registry()
+    registry.warmup()
+    return registry
+
+def get_session_owner():
+    """Identify this browser session for fair sharing of the job queue"""
+    if "owner_id" not in st.session_state:
+        st.session_state.owner_id = uuid.uuid4().hex
+    return st.session_state.owner_id
+
+def get_stage_cache():
+    """This session's memo of extracted, redacted and exported documents"""
+    if "stage_cache" not in st.session_state:
+        st.session_state.stage_cache = StageCache()
+    return st.session_state.stage_cache
+
+def apply_changed_options(job, redaction_mode, options):
+    """
+    Redo a finished job's downstream stages after its options changed
+    
+    Extraction is reused from the session memo, so only redaction and
+    export run, in this script run. The result is kept until the options
+    change again, so reruns do not redact (and audit-log) the document again.
+    
+    Args:
+        job (Job): Finished document job
+        redaction_mode: Redaction mode selected now
+        options (dict): pdf_output, ner and ocr_profile selected now
+        
+    Returns:
+        dict: Result under the new options, or the job's own result when
+            the text has to be extracted again (a different OCR engine)
+    """
+    key = (job.id, redaction_mode, options)
+    previous = st.session_state.get("changed_result")
+    if previous is not None and previous[0] == key:
+        return previous[1]
+    result = reprocess_document(st.session_state.document, redaction_mode, get_stage_cache(),
+                                export="lazy", **options)
+    if result is None:
+        st.info("🔁 Click Process Document to extract the text with the new OCR engine.")
+        return job.result
+    st.session_state.changed_result = (key, result)
+    return result
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_job_progress(ui, job_id):
+    """Poll a job's progress, rerunning the whole app once it finishes"""
+    jobs = get_job_queue()
+    job = jobs.get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    if ui.render_job_progress(job, jobs.queue_position(job_id)):
+        jobs.cancel(job_id)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_bundle_progress(ui, bundle):
+    """Feed a bundle's documents to the job queue and poll them, rerunning the app once all finish"""
+    jobs = get_job_queue()
+    bundle.submit_pending(jobs, get_session_owner())
+    bundle.update(jobs)
+    if bundle.finished:
+        st.rerun()
+    if ui.render_bundle_progress(bundle):
+        bundle.cancel(jobs)
+        st.rerun()
+
+def drop_bundle():
+    """Cancel this session's bundle and delete its outputs"""
+    bundle = st.session_state.get("bundle")
+    if bundle is not None:
+        bundle.cancel(get_job_queue())
+        bundle.close()
+        st.session_state.bundle = None
+
+def render_bundle_section(ui, uploads, redaction_mode):
+    """
+    Process several PDFs, or ZIP archives of PDFs, as one bundle
+    
+    Each document is a job on the shared queue; the bundle submits more
+    as the session's share of the queue frees up, and the finished
+    outputs are offered as a single ZIP.
+    
+    Args:
+        ui (UIComponents): UI components
+        uploads (list): Streamlit uploaded files
+        redaction_mode: Redaction mode selected in the sidebar
+    """
+    ui.render_bundle_info(uploads)
+    _, _, pdf_output, ner, ocr_profile = ui.render_processing_options()
+    
+    if st.button(f"🚀 Process {len(uploads)} Files", type="primary", use_container_width=True):
+        drop_bundle()
+        bundle = DocumentBundle(process_document_job, redaction_mode,
+                                pdf_output=pdf_output, ner=ner, ocr_profile=ocr_profile)
+        # Spool every PDF to disk once; ZIP archives are unpacked member by member
+        with st.spinner("📦 Unpacking uploads..."):
+            for upload in uploads:
+                bundle.add_upload(upload)
+        st.session_state.bundle = bundle
+        st.session_state.bundle_uploads = [upload.file_id for upload in uploads]
+    
+    bundle = st.session_state.get("bundle")
+    if bundle is None:
+        return
+    if not bundle.finished:
+        render_bundle_progress(ui, bundle)
+    else:
+        ui.render_bundle_results(bundle)
+
+def main():
+    """Main application function"""
+    
+    # Show pipeline errors in the app
+    set_error_handler(st.error)
+    
+    # Initialize components
+    ui = UIComponents()
+    
+    # Configure page
+    ui.render_page_config()
+    ui.render_custom_css()
+    
+    # Shared OCR models (no-op after the first session)
+    warm_up_models()
+    
+    # Render header
+    ui.render_header()
+    
+    # Render sidebar and get settings
+    redaction_mode, stats_placeholder = ui.render_sidebar()
+    
+    # Main content area
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        # File upload section
+        uploads = ui.render_upload_section()
+        if st.session_state.get("bundle_uploads") != [upload.file_id for upload in uploads]:
+            # Different files were uploaded since the bundle was made
+            drop_bundle()
+        
+        if len(uploads) > 1 or (uploads and is_zip_upload(uploads[0])):
+            render_bundle_section(ui, uploads, redaction_mode)
+        elif uploads:
+            uploaded_pdf = uploads[0]
+            
+            # Validate file
+            if not validate_file_upload(uploaded_pdf):
+                return
+            
+            # Display file info
+            ui.render_file_info(uploaded_pdf)
+            
+            # Processing options
+            show_original, auto_download, pdf_output, ner, ocr_profile = ui.render_processing_options()
+            options = {"pdf_output": pdf_output, "ner": ner, "ocr_profile": ocr_profile}
+            
+            # Process button: queue the document and keep polling its job
+            jobs = get_job_queue()
+            if st.button("🚀 Process Document", type="primary", use_container_width=True):
+                # Spool the upload to disk once; the job opens it from there
+                document = SpooledDocument.from_upload(uploaded_pdf)
+                try:
+                    st.session_state.job_id = jobs.submit(
+                        get_session_owner(), process_document_job,
+                        document, uploaded_pdf.name, redaction_mode,
+                        name=uploaded_pdf.name, export="lazy", stage_cache=get_stage_cache(),
+                        **options
+                    )
+                    st.session_state.document = document
+                    st.session_state.job_options = (redaction_mode, options)
+                except QueueFullError as e:
+                    document.close()
+                    st.warning(f"⏳ {e}")
+            
+            job = jobs.get(st.session_state.get("job_id"))
+            if job is not None and job.name != uploaded_pdf.name:
+                # A different file was uploaded since
+                jobs.cancel(job.id)
+                job = None
+            
+            if job is not None and not job.finished:
+                render_job_progress(ui, job.id)
+            elif job is not None:
+                for message in job.errors:
+                    st.error(message)
+                
+                if job.status == JOB_CANCELLED:
+                    st.info("✖️ Processing was cancelled.")
+                elif job.status == JOB_DONE:
+                    result = job.result
+                    if st.session_state.job_options != (redaction_mode, options):
+                        result = apply_changed_options(job, redaction_mode, options)
+                    redacted_text, stats = result["redacted_text"], result["stats"]
+                    output_pdf, output_word = result["output_pdf"], result["output_word"]
+                    
+                    # Handle results
+                    if redacted_text is None:
+                        st.error("❌ No text could be extracted. Please ensure the document contains readable text.")
+                    else:
+                        # Success message
+                        ui.render_success_message()
+                        
+                        # Update statistics in sidebar
+                        if stats:
+                            ui.render_statistics(stats_placeholder, stats)
+                        
+                        # Display results in tabs
+                        ui.render_results_tabs(redacted_text, stats, redaction_mode, show_original)
+                        
+                        # Download section; exports render on first click unless
+                        # auto-generation starts them in the background now
+                        if auto_download:
+                            for export in (output_pdf, output_word):
+                                if not export.ready:
+                                    export.prefetch()
+                        ui.render_download_section(output_pdf, output_word)
+    
+    # Right column - Tips and information
+    with col2:
+        ui.render_tips_section()
+    
+    # Footer
+    ui.render_footer()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,355 @@
+"""
+Local HTTP redaction service for other internal services
+
+Usage:
+    python service.py [--host 127.0.0.1] [--port 8765] [--workers 2]
+
+Endpoints:
+    POST   /redact?mode=aggressive&layout=in_place&ocr=accurate&ner=1&async=1
+           Body: the PDF (Content-Length or chunked). Without async the call
+           waits for the result (200); large documents that take longer than
+           SERVICE_SYNC_TIMEOUT_SECONDS, and async calls, answer 202 with a
+           job to poll. Add output=pdf or output=docx to a synchronous call
+           to receive the redacted file itself instead of JSON. ner=1
+           also redacts names and organizations in aggressive mode; ocr
+           picks an OCR engine profile (OCR_PROFILES).
+    GET    /jobs/<id>           Status, per-page progress, stats and spans
+    GET    /jobs/<id>/pdf       Redacted PDF (rendered on first download)
+    GET    /jobs/<id>/docx      Redacted Word document
+    DELETE /jobs/<id>           Cancel a job
+    GET    /health              Queue and model status
+
+Uploads are streamed into a temporary file that PyMuPDF opens by path, so
+request bodies are never held in memory whole. Documents run on the shared job queue, which
+caps how many are processed at once and how many may wait; when it is
+full, counting uploads still being received, the service answers 503
+before reading the body. The service uses only the standard library
+and local models, and every request shares the OCR models warmed at
+startup. Clients may send an X-Client-Id header so the queue shares
+capacity fairly between calling services.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Add project root to Python path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.ingest import SpooledDocument, looks_like_pdf
+from core.jobs import get_job_queue, QueueFullError, JOB_DONE
+from core.model_registry import get_model_registry
+from utils.helpers import process_document_job
+from config.settings import (
+    MAX_FILE_SIZE_MB, SERVICE_HOST, SERVICE_PORT, SERVICE_SYNC_TIMEOUT_SECONDS,
+    OCR_PROFILES, OCR_PROFILE
+)
+
+# Bytes read from the request body at a time
+CHUNK_SIZE = 64 * 1024
+
+OUTPUT_TYPES = {
+    "pdf": ("output_pdf", "application/pdf"),
+    "docx": ("output_word",
+             "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+}
+
+# Uploads being streamed to disk, per owner; they count against the queue
+# limits so a full queue can't be flooded with bodies it will turn away
+_uploads = Counter()
+_uploads_lock = threading.Lock()
+
+class RequestError(Exception):
+    """Client error answered with the given HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+@contextmanager
+def reserve_upload(queue, owner):
+    """
+    Hold a queue slot for an upload while its body is read
+
+    Args:
+        queue (JobQueue): Queue the job will be submitted to
+        owner (str): Client submitting the upload
+
+    Raises:
+        QueueFullError: If the queue, counting uploads in progress, is full
+    """
+    with _uploads_lock:
+        queue.check_capacity(owner, sum(_uploads.values()), _uploads[owner])
+        _uploads[owner] += 1
+    try:
+        yield
+    finally:
+        with _uploads_lock:
+            _uploads[owner] -= 1
+            if not _uploads[owner]:
+                del _uploads[owner]
+
+def job_status(job):
+    """
+    Describe a job for API responses
+
+    Args:
+        job (Job): Job to describe
+
+    Returns:
+        dict: Status, progress and, once finished, stats, spans and output links
+    """
+    body = {
+        "job_id": job.id,
+        "status": job.status,
+        "pages_done": job.pages_done,
+        "total_pages": job.total_pages,
+        "progress": round(job.progress, 3),
+        "errors": job.errors,
+    }
+    if job.status == JOB_DONE:
+        result = job.result
+        if result["redacted_text"] is None:
+            # process_document reports failures and empty documents as no text
+            body["status"] = "failed" if job.errors else "empty"
+        else:
+            body["stats"] = result["stats"]
+            body["spans"] = [span.to_dict() for span in result["spans"]]
+            body["outputs"] = {name: f"/jobs/{job.id}/{name}" for name in OUTPUT_TYPES}
+    return body
+
+class RedactionHandler(BaseHTTPRequestHandler):
+    """Request handler; each request runs on its own server thread"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "DocShield"
+
+    def do_GET(self):
+        self._dispatch(self._get)
+
+    def do_POST(self):
+        self._dispatch(self._post)
+
+    def do_DELETE(self):
+        self._dispatch(self._delete)
+
+    def _dispatch(self, handler):
+        """Run a method handler, turning errors into JSON responses"""
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            handler(parts, query)
+        except RequestError as e:
+            self.close_connection = True  # The request body may be unread
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            logging.exception("Request failed")
+            self.close_connection = True
+            self._send_json(500, {"error": str(e)})
+
+    def _get(self, parts, query):
+        if parts == ["health"]:
+            queue = get_job_queue()
+            self._send_json(200, {
+                "status": "ok",
+                "models": get_model_registry().loaded_models(),
+                "queued_jobs": queue.queued_jobs,
+                "workers": queue.workers,
+            })
+        elif len(parts) == 2 and parts[0] == "jobs":
+            self._send_json(200, job_status(self._find_job(parts[1])))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] in OUTPUT_TYPES:
+            self._send_output(self._find_job(parts[1]), parts[2])
+        else:
+            raise RequestError(404, "Not found")
+
+    def _delete(self, parts, query):
+        if len(parts) != 2 or parts[0] != "jobs":
+            raise RequestError(404, "Not found")
+        job = self._find_job(parts[1])
+        get_job_queue().cancel(job.id)
+        self._send_json(200, job_status(job))
+
+    def _post(self, parts, query):
+        if parts != ["redact"]:
+            raise RequestError(404, "Not found")
+        mode = query.get("mode", "conservative")
+        layout = query.get("layout", "retypeset")
+        output = query.get("output")
+        ocr_profile = query.get("ocr", OCR_PROFILE)
+        if mode not in ("conservative", "aggressive"):
+            raise RequestError(400, "mode must be conservative or aggressive")
+        if layout not in ("retypeset", "in_place"):
+            raise RequestError(400, "layout must be retypeset or in_place")
+        if output is not None and output not in OUTPUT_TYPES:
+            raise RequestError(400, "output must be pdf or docx")
+        if ocr_profile not in OCR_PROFILES:
+            raise RequestError(400, f"ocr must be one of {', '.join(OCR_PROFILES)}")
+
+        name = query.get("name", "upload.pdf")
+        owner = self.headers.get("X-Client-Id") or self.client_address[0]
+        redaction_mode = "Conservative" if mode == "conservative" else "Aggressive"
+        queue = get_job_queue()
+        try:
+            # Answer 503 before reading a body the queue would turn away
+            with reserve_upload(queue, owner):
+                # Stream the body to disk; the file is deleted once the job and
+                # its lazy exports are released
+                upload = self._read_upload(name)
+                try:
+                    job_id = queue.submit(owner, process_document_job, upload, name,
+                                          redaction_mode, name=name, pdf_output=layout,
+                                          export="lazy", ner=query.get("ner") == "1",
+                                          ocr_profile=ocr_profile)
+                except QueueFullError:
+                    upload.close()
+                    raise
+        except QueueFullError as e:
+            self.close_connection = True  # The request body may be unread
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "5"})
+            return
+        job = queue.get(job_id)
+
+        if query.get("async") not in ("1", "true"):
+            deadline = time.monotonic() + SERVICE_SYNC_TIMEOUT_SECONDS
+            while not job.finished and time.monotonic() < deadline:
+                time.sleep(0.05)
+        if not job.finished:
+            self._send_json(202, job_status(job), {"Location": f"/jobs/{job.id}"})
+        elif output is not None and job.status == JOB_DONE:
+            self._send_output(job, output)
+        else:
+            self._send_json(200, job_status(job))
+
+    def _find_job(self, job_id):
+        job = get_job_queue().get(job_id)
+        if job is None:
+            raise RequestError(404, "Unknown or expired job")
+        return job
+
+    def _read_upload(self, name):
+        """
+        Stream the request body into a temporary file
+
+        Args:
+            name (str): Display name of the document
+
+        Returns:
+            SpooledDocument: Upload on disk, deleted once released
+
+        Raises:
+            RequestError: If the body is missing, too large or not a PDF
+        """
+        max_bytes = MAX_FILE_SIZE_MB * 1024 * 1024
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = self._iter_chunked()
+        elif self.headers.get("Content-Length"):
+            length = int(self.headers["Content-Length"])
+            if length > max_bytes:
+                raise RequestError(413, f"Upload exceeds {MAX_FILE_SIZE_MB} MB")
+            chunks = self._iter_length(length)
+        else:
+            raise RequestError(411, "Content-Length or chunked transfer encoding required")
+
+        try:
+            upload = SpooledDocument.from_chunks(chunks, name, max_bytes=max_bytes)
+        except ValueError as e:
+            raise RequestError(413, str(e))
+        if not looks_like_pdf(upload):
+            upload.close()
+            raise RequestError(415, "Body is not a PDF")
+        return upload
+
+    def _iter_length(self, length):
+        """Yield a Content-Length body in chunks"""
+        remaining = length
+        while remaining:
+            chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise RequestError(400, "Upload ended early")
+            remaining -= len(chunk)
+            yield chunk
+
+    def _iter_chunked(self):
+        """Yield a chunked transfer-encoded body in chunks"""
+        while True:
+            size_line = self.rfile.readline(1024)
+            try:
+                size = int(size_line.split(b";")[0], 16)
+            except ValueError:
+                raise RequestError(400, "Malformed chunked body")
+            if size == 0:
+                # Skip trailers up to the blank line ending the body
+                while self.rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield from self._iter_length(size)
+            self.rfile.readline(1024)  # CRLF after each chunk
+
+    def _send_output(self, job, output):
+        """Send a finished job's redacted file, rendering it if needed"""
+        if job.status != JOB_DONE or job.result["redacted_text"] is None:
+            raise RequestError(409, f"Job is {job_status(job)['status']}")
+        key, content_type = OUTPUT_TYPES[output]
+        data = job.result[key]()
+        if data is None:
+            raise RequestError(500, "; ".join(job.errors) or "Export failed")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Redactions", str(len(job.result["spans"])))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logging.info("%s %s", self.address_string(), format % args)
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Serve document redaction over HTTP")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Address to bind")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Port to listen on")
+    parser.add_argument("--workers", type=int,
+                        help="Documents processed at once (default: JOB_WORKERS)")
+    parser.add_argument("--warmup-profiles", nargs="+", choices=list(OCR_PROFILES),
+                        default=[OCR_PROFILE], help="OCR engine profiles to load at start-up")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if args.workers:
+        get_job_queue().workers = args.workers
+    # Load the OCR models once; every request shares them
+    for profile in args.warmup_profiles:
+        get_model_registry().warmup(profile)
+
+    server = ThreadingHTTPServer((args.host, args.port), RedactionHandler)
+    logging.info("Serving on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Tests for OCR error normalization and its offset map
+"""
+
+import time
+import unittest
+from core.normalization import OCRNormalizer
+
+class NormalizeTest(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = OCRNormalizer()
+
+    def test_fixes_lookalikes_in_digit_runs(self):
+        self.assertEqual(self.normalizer.normalize("SSN: l23-45-67B9")[0], "SSN: 123-45-6789")
+        self.assertEqual(self.normalizer.normalize("123o45o6789")[0], "123-45-6789")
+        self.assertEqual(self.normalizer.normalize("Call 555<1234")[0], "Call 555-1234")
+
+    def test_leaves_words_alone(self):
+        for text in ("SSN", "SOLD", "12lbs", "abc1O2", "1O2abc", "4111 1111 111A 1111"):
+            self.assertEqual(self.normalizer.normalize(text)[0], text)
+
+    def test_long_run_before_a_letter_is_linear(self):
+        # A run the word check rejects used to backtrack through every split
+        for run in ("1" * 200000, "1O" * 100000):
+            start = time.perf_counter()
+            normalized, _ = self.normalizer.normalize(run + "a")
+            self.assertLess(time.perf_counter() - start, 1.0)
+            self.assertEqual(normalized, run + "a")
+
+class OffsetMapTest(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = OCRNormalizer()
+
+    def assert_round_trip(self, text, value, original_value):
+        normalized, offset_map = self.normalizer.normalize(text)
+        start = normalized.index(value)
+        end = start + len(value)
+        self.assertEqual(
+            text[offset_map.to_original(start):offset_map.to_original(end)], original_value
+        )
+
+    def test_unchanged_text_maps_to_itself(self):
+        text = "no numbers here"
+        normalized, offset_map = self.normalizer.normalize(text)
+        self.assertEqual(normalized, text)
+        for position in range(len(text) + 1):
+            self.assertEqual(offset_map.to_original(position), position)
+
+    def test_collapsed_spaces_map_back(self):
+        text = "SSN:  l23   45  6789 and 4111    1111 after"
+        self.assert_round_trip(text, "123 45 6789", "l23   45  6789")
+        self.assert_round_trip(text, "4111 1111", "4111    1111")
+        self.assert_round_trip(text, "after", "after")
+
+    def test_every_offset_maps_to_the_same_character(self):
+        text = "a 1  2   3    4 b lO000  8B8 c"
+        normalized, offset_map = self.normalizer.normalize(text)
+        self.assertEqual(normalized, "a 1 2 3 4 b 10000 888 c")
+        for position, char in enumerate(normalized):
+            original = text[offset_map.to_original(position)]
+            self.assertIn(char, (original, original.translate(self.normalizer.digit_table)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,11 @@
-"""
-UI components and styling for Document Redaction System
-"""
-
-from .components import UIComponents
-from .styles import CUSTOM_CSS
-
-__all__ = [
-    'UIComponents',
-    'CUSTOM_CSS'
-]
+"""
+UI components and styling for Document Redaction System
+"""
+
+from .components import UIComponents
+from .styles import CUSTOM_CSS
+
+__all__ = [
+    'UIComponents',
+    'CUSTOM_CSS'
+]
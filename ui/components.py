@@ -1,295 +1,477 @@
-"""
-UI components for the Streamlit application
-"""
-
-import streamlit as st
-import os
-from ui.styles import CUSTOM_CSS
-
-class UIComponents:
-    def __init__(self):
-        """Initialize UI components"""
-        pass
-    
-    def render_page_config(self):
-        """Configure Streamlit page settings"""
-        st.set_page_config(
-            page_title="DocShield",
-            page_icon="🔒",
-            layout="wide",
-            initial_sidebar_state="expanded"
-        )
-    
-    def render_custom_css(self):
-        """Apply custom CSS styles"""
-        st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
-    
-    def render_header(self):
-        """Render the main header"""
-        st.markdown("""
-        <div class="main-header">
-            <h1>🔒 DocShield</h1>
-            <p>Securely redact sensitive information from your PDF documents</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    def render_sidebar(self):
-        """
-        Render sidebar with settings and info
-        
-        Returns:
-            tuple: (redaction_mode, stats_placeholder)
-        """
-        with st.sidebar:
-            st.markdown("### 🎛️ Settings & Info")
-            
-            # Redaction mode selection
-            st.markdown("**Redaction Mode:**")
-            redaction_mode = st.radio(
-                "",
-                ["Conservative (Labeled data only)", "Aggressive (Pattern matching)"],
-                help="Conservative mode only redacts explicitly labeled sensitive data. Aggressive mode uses pattern matching to find unlabeled sensitive information."
-            )
-            
-            st.markdown("---")
-            
-            # Features info
-            st.markdown("### ✨ Features")
-            st.markdown("""
-            - 🔍 **OCR Text Extraction**
-            - 🏛️ **Social Security Numbers**
-            - 💳 **Credit Card Details**
-            - 🏠 **Address Information**
-            - 📄 **PDF Export**
-            - 📝 **Word Export**
-            """)
-            
-            st.markdown("---")
-            
-            # Statistics placeholder
-            st.markdown("### 📊 Statistics")
-            stats_placeholder = st.empty()
-            
-            st.markdown("---")
-            
-            # Security notice
-            st.markdown("### 🛡️ Security Notice")
-            st.info("Your documents are processed locally and are not stored or transmitted to external servers.")
-        
-        return redaction_mode, stats_placeholder
-    
-    def render_upload_section(self):
-        """
-        Render file upload section
-        
-        Returns:
-            uploaded_file: Streamlit file uploader object
-        """
-        st.markdown("""
-        <div class="upload-section">
-            <h3>📄 Upload Your Document</h3>
-            <p>Select a PDF document to redact sensitive information</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        uploaded_pdf = st.file_uploader(
-            "",
-            type="pdf",
-            help="Upload a PDF document containing sensitive information"
-        )
-        
-        return uploaded_pdf
-    
-    def render_file_info(self, uploaded_file):
-        """Render information about uploaded file"""
-        if uploaded_file is not None:
-            file_size = len(uploaded_file.getvalue()) / 1024  # KB
-            st.success(f"✅ File uploaded: **{uploaded_file.name}** ({file_size:.1f} KB)")
-    
-    def render_processing_options(self):
-        """
-        Render processing options
-        
-        Returns:
-            tuple: (show_original, auto_download)
-        """
-        with st.expander("🔧 Processing Options", expanded=True):
-            col_a, col_b = st.columns(2)
-            with col_a:
-                show_original = st.checkbox("Show original text", value=False)
-            with col_b:
-                auto_download = st.checkbox("Auto-generate downloads", value=True)
-        
-        return show_original, auto_download
-    
-    def render_progress_section(self):
-        """
-        Render progress indicators
-        
-        Returns:
-            tuple: (progress_bar, status_text)
-        """
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        return progress_bar, status_text
-    
-    def update_progress(self, progress_bar, status_text, progress, message):
-        """Update progress indicators"""
-        progress_bar.progress(progress)
-        status_text.text(message)
-    
-    def render_success_message(self):
-        """Render success message"""
-        st.markdown("""
-        <div class="success-message">
-            <strong>🎉 Processing completed successfully!</strong><br>
-            Your document has been processed and sensitive information has been redacted.
-        </div>
-        """, unsafe_allow_html=True)
-    
-    def render_statistics(self, stats_placeholder, stats):
-        """Render statistics in sidebar"""
-        stats_placeholder.markdown(f"""
-        <div class="stats-card">
-            <strong>{stats['total_redactions']}</strong><br>
-            <small>Items Redacted</small>
-        </div>
-        <div class="stats-card" style="margin-top: 0.5rem;">
-            <strong>{len(str(stats))}</strong><br>
-            <small>Stats Generated</small>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    def render_results_tabs(self, redacted_text, stats, redaction_mode, show_original):
-        """Render results in tabbed interface"""
-        st.markdown("### 📋 Results")
-        
-        # Tabs for different views
-        tab1, tab2, tab3 = st.tabs(["📄 Redacted Text", "📊 Summary", "⚙️ Settings"])
-        
-        with tab1:
-            if show_original:
-                col_orig, col_red = st.columns(2)
-                with col_orig:
-                    st.markdown("**Original Text (Preview):**")
-                    st.text_area("", "Original text would be shown here...", height=300, disabled=True)
-                with col_red:
-                    st.markdown("**Redacted Text:**")
-                    st.text_area("", redacted_text, height=300, disabled=True)
-            else:
-                st.markdown("**Redacted Text:**")
-                st.markdown(f'<div class="redaction-preview">{redacted_text}</div>', unsafe_allow_html=True)
-        
-        with tab2:
-            self.render_summary_metrics(stats)
-        
-        with tab3:
-            st.markdown("**Current Settings:**")
-            st.write(f"- Redaction Mode: {redaction_mode}")
-            st.write(f"- Show Original: {show_original}")
-    
-    def render_summary_metrics(self, stats):
-        """Render summary metrics and charts"""
-        col_metric1, col_metric2, col_metric3, col_metric4 = st.columns(4)
-        
-        with col_metric1:
-            st.metric("SSN Redacted", stats['ssn_count'])
-        
-        with col_metric2:
-            st.metric("Credit Cards", stats['credit_card_count'])
-        
-        with col_metric3:
-            st.metric("Addresses", stats['address_count'])
-        
-        with col_metric4:
-            st.metric("Total Redactions", stats['total_redactions'])
-        
-        # Redaction breakdown chart
-        if stats['total_redactions'] > 0:
-            st.markdown("### 📊 Redaction Breakdown")
-            chart_data = {
-                "Type": ["SSN", "Credit Cards", "Addresses", "ZIP Codes"],
-                "Count": [stats['ssn_count'], stats['credit_card_count'], 
-                         stats['address_count'], stats['zip_count']]
-            }
-            st.bar_chart(chart_data, x="Type", y="Count")
-    
-    def render_download_section(self, output_pdf, output_word):
-        """Render download buttons"""
-        st.markdown("### 💾 Download Files")
-        
-        download_col1, download_col2 = st.columns(2)
-        
-        with download_col1:
-            if output_pdf and os.path.exists(output_pdf):
-                with open(output_pdf, "rb") as f:
-                    st.download_button(
-                        "📄 Download Redacted PDF",
-                        f.read(),
-                        file_name="redacted_document.pdf",
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
-        
-        with download_col2:
-            if output_word and os.path.exists(output_word):
-                with open(output_word, "rb") as f:
-                    st.download_button(
-                        "📝 Download Word Document",
-                        f.read(),
-                        file_name="redacted_document.docx",
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                        use_container_width=True
-                    )
-    
-    def render_tips_section(self):
-        """Render tips and information cards"""
-        st.markdown("### 💡 Tips")
-        
-        st.markdown("""
-        <div class="feature-card">
-            <h4>🎯 Best Practices</h4>
-            <ul>
-                <li>Ensure PDF text is selectable</li>
-                <li>Review redacted output carefully</li>
-                <li>Use conservative mode for higher accuracy</li>
-                <li>Check download files before sharing</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="feature-card">
-            <h4>🔍 What Gets Redacted</h4>
-            <ul>
-                <li><strong>SSN:</strong> XXX-XX-XXXX format</li>
-                <li><strong>Credit Cards:</strong> 16-digit numbers</li>
-                <li><strong>Addresses:</strong> Street addresses</li>
-                <li><strong>ZIP Codes:</strong> 5 or 9-digit codes</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="feature-card">
-            <h4>⚠️ Limitations</h4>
-            <ul>
-                <li>OCR quality affects accuracy in Streamlit(CPU Only)</li>
-                <li>Handwritten text may not be detected</li>
-                <li>Complex layouts may cause issues</li>
-                <li>Always manual review recommended</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    def render_footer(self):
-        """Render footer with credits"""
-        st.markdown("""
-        <div class="footer">
-            <hr>
-            <p>🚀 Made with ❤️ by <strong><a href="https://www.linkedin.com/in/shagatomte19/" target="_blank">Enamul Hasan Shagato</a></strong></p>
-            <p><small>🔒 DocShield | Protecting Your Privacy</small></p>
-        </div>
-
-        """, unsafe_allow_html=True)
-
+"""
+UI components for the Streamlit application
+"""
+
+import streamlit as st
+import os
+from ui.styles import CUSTOM_CSS
+from config.settings import (
+    PDF_OUTPUT_MODE, NER_ENABLED, REDACTION_LABELS, OCR_PROFILES, OCR_PROFILE, BUNDLE_ZIP_PART_MB
+)
+
+class UIComponents:
+    def __init__(self):
+        """Initialize UI components"""
+        pass
+    
+    def render_page_config(self):
+        """Configure Streamlit page settings"""
+        st.set_page_config(
+            page_title="DocShield",
+            page_icon="🔒",
+            layout="wide",
+            initial_sidebar_state="expanded"
+        )
+    
+    def render_custom_css(self):
+        """Apply custom CSS styles"""
+        st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    
+    def render_header(self):
+        """Render the main header"""
+        st.markdown("""
+        <div class="main-header">
+            <h1>🔒 DocShield</h1>
+            <p>Securely redact sensitive information from your PDF documents</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    def render_sidebar(self):
+        """
+        Render sidebar with settings and info
+        
+        Returns:
+            tuple: (redaction_mode, stats_placeholder)
+        """
+        with st.sidebar:
+            st.markdown("### 🎛️ Settings & Info")
+            
+            # Redaction mode selection
+            st.markdown("**Redaction Mode:**")
+            redaction_mode = st.radio(
+                "",
+                ["Conservative (Labeled data only)", "Aggressive (Pattern matching)"],
+                help="Conservative mode only redacts explicitly labeled sensitive data. Aggressive mode uses pattern matching to find unlabeled sensitive information."
+            )
+            
+            st.markdown("---")
+            
+            # Features info
+            st.markdown("### ✨ Features")
+            st.markdown("""
+            - 🔍 **OCR Text Extraction**
+            - 🏛️ **Social Security Numbers**
+            - 💳 **Credit Card Details**
+            - 🏠 **Address Information**
+            - 📄 **PDF Export**
+            - 📝 **Word Export**
+            """)
+            
+            st.markdown("---")
+            
+            # Statistics placeholder
+            st.markdown("### 📊 Statistics")
+            stats_placeholder = st.empty()
+            
+            st.markdown("---")
+            
+            # Security notice
+            st.markdown("### 🛡️ Security Notice")
+            st.info("Your documents are processed locally and are not stored or transmitted to external servers.")
+        
+        return redaction_mode, stats_placeholder
+    
+    def render_upload_section(self):
+        """
+        Render file upload section
+        
+        Returns:
+            list: Streamlit uploaded files, PDFs and ZIP archives of PDFs
+        """
+        st.markdown("""
+        <div class="upload-section">
+            <h3>📄 Upload Your Documents</h3>
+            <p>Select one or more PDF documents, or ZIP archives of them, to redact sensitive information</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        uploads = st.file_uploader(
+            "",
+            type=["pdf", "zip"],
+            accept_multiple_files=True,
+            help="Upload PDF documents containing sensitive information; ZIP archives are unpacked"
+        )
+        
+        return uploads
+    
+    def render_file_info(self, uploaded_file):
+        """Render information about uploaded file"""
+        if uploaded_file is not None:
+            file_size = uploaded_file.size / 1024  # KB
+            st.success(f"✅ File uploaded: **{uploaded_file.name}** ({file_size:.1f} KB)")
+    
+    def render_processing_options(self):
+        """
+        Render processing options
+        
+        Returns:
+            tuple: (show_original, auto_download, pdf_output, ner, ocr_profile)
+        """
+        with st.expander("🔧 Processing Options", expanded=True):
+            col_a, col_b = st.columns(2)
+            with col_a:
+                show_original = st.checkbox("Show original text", value=False)
+            with col_b:
+                auto_download = st.checkbox("Auto-generate downloads", value=True)
+            keep_layout = st.checkbox(
+                "Keep original layout in PDF",
+                value=PDF_OUTPUT_MODE == "in_place",
+                help="Black out detected information directly in the uploaded PDF instead of re-typesetting the text"
+            )
+            ner = st.checkbox(
+                "Detect names and organizations",
+                value=NER_ENABLED,
+                help="Aggressive mode only. Uses a spaCy model, which must be installed"
+            )
+            profiles = list(OCR_PROFILES)
+            ocr_profile = st.selectbox(
+                "OCR engine",
+                profiles,
+                index=profiles.index(OCR_PROFILE),
+                help="Used for scanned pages: fast is quicker, accurate reads small or poor print better"
+            )
+        
+        pdf_output = "in_place" if keep_layout else "retypeset"
+        return show_original, auto_download, pdf_output, ner, ocr_profile
+    
+    def render_progress_section(self):
+        """
+        Render progress indicators
+        
+        Returns:
+            tuple: (progress_bar, status_text)
+        """
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        return progress_bar, status_text
+    
+    def update_progress(self, progress_bar, status_text, progress, message):
+        """Update progress indicators"""
+        progress_bar.progress(progress)
+        status_text.text(message)
+    
+    def render_job_progress(self, job, queue_position=0):
+        """
+        Render progress of a queued or running job
+        
+        Args:
+            job (Job): Job being polled
+            queue_position (int): Jobs that will start before a queued job
+            
+        Returns:
+            bool: True if the user asked to cancel the job
+        """
+        progress_bar, status_text = self.render_progress_section()
+        if job.status == "queued":
+            message = f"⏳ Waiting in queue ({queue_position} ahead)..."
+        elif job.cancel_requested:
+            message = "✖️ Cancelling..."
+        elif job.total_pages:
+            message = f"📖 Processed page {job.pages_done} of {job.total_pages}..."
+        else:
+            message = "🔄 Opening document..."
+        self.update_progress(progress_bar, status_text, int(job.progress * 100), message)
+        return st.button("✖️ Cancel", key=f"cancel-{job.id}", disabled=job.cancel_requested)
+    
+    def render_bundle_info(self, uploads):
+        """Render information about several uploaded files"""
+        total_size = sum(upload.size for upload in uploads) / (1024 * 1024)  # MB
+        archives = sum(1 for upload in uploads if upload.name.lower().endswith(".zip"))
+        st.success(
+            f"✅ {len(uploads)} files uploaded ({total_size:.1f} MB"
+            + (f", including {archives} ZIP" if archives else "") + ")"
+        )
+    
+    def render_bundle_progress(self, bundle):
+        """
+        Render overall progress and the per-document table of a bundle
+        
+        Args:
+            bundle (DocumentBundle): Bundle being processed
+            
+        Returns:
+            bool: True if the user asked to cancel the bundle
+        """
+        done = sum(1 for bundle_file in bundle.files if bundle_file.finished)
+        running = sum(1 for bundle_file in bundle.files if bundle_file.status == "running")
+        progress_bar, status_text = self.render_progress_section()
+        self.update_progress(progress_bar, status_text, int(bundle.progress * 100),
+                             f"📚 {done} of {len(bundle.files)} documents finished, {running} in progress...")
+        self.render_bundle_table(bundle)
+        return st.button("✖️ Cancel All", key="cancel-bundle")
+    
+    def render_bundle_table(self, bundle):
+        """Render one row per document of a bundle, plus skipped uploads"""
+        rows = [{
+            "File": bundle_file.name,
+            "Status": bundle_file.status,
+            "Progress": bundle_file.progress,
+            "Pages": bundle_file.total_pages or None,
+            "Redactions": bundle_file.stats["total_redactions"] if bundle_file.stats else None,
+            "Seconds": bundle_file.seconds,
+            "Error": bundle_file.error
+        } for bundle_file in bundle.files]
+        rows.extend({"File": name, "Status": "skipped", "Error": reason}
+                    for name, reason in bundle.skipped)
+        st.dataframe(
+            rows,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Progress": st.column_config.ProgressColumn("Progress", min_value=0.0, max_value=1.0)
+            }
+        )
+    
+    def render_bundle_results(self, bundle):
+        """
+        Render a finished bundle's table and its ZIP download
+        
+        Args:
+            bundle (DocumentBundle): Bundle whose documents have all finished
+        """
+        counts = {}
+        for bundle_file in bundle.files:
+            counts[bundle_file.status] = counts.get(bundle_file.status, 0) + 1
+        st.markdown("### 📋 Results")
+        st.caption(" · ".join(f"{count} {status}" for status, count in counts.items()))
+        self.render_bundle_table(bundle)
+        
+        parts = bundle.zip_parts()
+        if parts:
+            st.markdown("### 💾 Download Files")
+            if len(parts) > 1:
+                st.caption(f"📦 Outputs are split into {len(parts)} ZIP files of at most "
+                           f"{BUNDLE_ZIP_PART_MB} MB; each contains the full manifest.")
+            # Each part is written to disk on its first click; Streamlit then
+            # holds that one part in memory to serve it
+            for part in range(len(parts)):
+                suffix = f" (part {part + 1} of {len(parts)})" if len(parts) > 1 else ""
+                st.download_button(
+                    f"🗜️ Download Redacted Documents{suffix}",
+                    lambda part=part: self._download_data(bundle.zip_path(part)),
+                    file_name=(f"redacted_documents_part{part + 1}.zip" if len(parts) > 1
+                               else "redacted_documents.zip"),
+                    mime="application/zip",
+                    key=f"bundle-zip-{part}",
+                    on_click="ignore",
+                    use_container_width=True
+                )
+    
+    def render_success_message(self):
+        """Render success message"""
+        st.markdown("""
+        <div class="success-message">
+            <strong>🎉 Processing completed successfully!</strong><br>
+            Your document has been processed and sensitive information has been redacted.
+        </div>
+        """, unsafe_allow_html=True)
+    
+    def render_statistics(self, stats_placeholder, stats):
+        """Render statistics in sidebar"""
+        stats_placeholder.markdown(f"""
+        <div class="stats-card">
+            <strong>{stats['total_redactions']}</strong><br>
+            <small>Items Redacted</small>
+        </div>
+        <div class="stats-card" style="margin-top: 0.5rem;">
+            <strong>{len(str(stats))}</strong><br>
+            <small>Stats Generated</small>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    def render_results_tabs(self, redacted_text, stats, redaction_mode, show_original):
+        """Render results in tabbed interface"""
+        st.markdown("### 📋 Results")
+        
+        # Tabs for different views
+        tab1, tab2, tab3 = st.tabs(["📄 Redacted Text", "📊 Summary", "⚙️ Settings"])
+        
+        with tab1:
+            if show_original:
+                col_orig, col_red = st.columns(2)
+                with col_orig:
+                    st.markdown("**Original Text (Preview):**")
+                    st.text_area("", "Original text would be shown here...", height=300, disabled=True)
+                with col_red:
+                    st.markdown("**Redacted Text:**")
+                    st.text_area("", redacted_text, height=300, disabled=True)
+            else:
+                st.markdown("**Redacted Text:**")
+                st.markdown(f'<div class="redaction-preview">{redacted_text}</div>', unsafe_allow_html=True)
+        
+        with tab2:
+            self.render_summary_metrics(stats)
+        
+        with tab3:
+            st.markdown("**Current Settings:**")
+            st.write(f"- Redaction Mode: {redaction_mode}")
+            st.write(f"- Show Original: {show_original}")
+    
+    def render_summary_metrics(self, stats):
+        """Render summary metrics and charts"""
+        col_metric1, col_metric2, col_metric3, col_metric4 = st.columns(4)
+        
+        with col_metric1:
+            st.metric("SSN Redacted", stats['ssn_count'])
+        
+        with col_metric2:
+            st.metric("Credit Cards", stats['credit_card_count'])
+        
+        with col_metric3:
+            st.metric("Addresses", stats['address_count'])
+        
+        with col_metric4:
+            st.metric("Total Redactions", stats['total_redactions'])
+        
+        # Extraction path hit rate
+        if stats.get('total_pages'):
+            st.caption(
+                f"📖 {stats['text_layer_pages']} of {stats['total_pages']} pages read from the "
+                f"text layer, {stats['ocr_pages']} OCR'd "
+                f"({stats.get('ocr_cache_hits', 0)} from cache, {stats.get('ocr_profile', OCR_PROFILE)} engine)"
+            )
+        if stats.get('blank_pages') or stats.get('duplicate_pages'):
+            st.caption(
+                f"⏭️ OCR skipped for {stats['blank_pages']} blank and "
+                f"{stats['duplicate_pages']} repeated pages"
+            )
+        if 'extract' in stats.get('reused_stages', ()):
+            st.caption("♻️ Extracted text reused from the last run; only redaction and export ran again")
+        if 'ner_pages' in stats:
+            st.caption(
+                f"🧠 Name detection: {stats['ner_pages'] - stats['ner_pages_gated']} of "
+                f"{stats['ner_pages']} pages had candidates, {stats['ner_pages_over_budget']} "
+                f"skipped over budget, {stats['ner_ms_per_page']} ms per page"
+            )
+        
+        # Redaction breakdown chart
+        if stats['total_redactions'] > 0:
+            st.markdown("### 📊 Redaction Breakdown")
+            chart_data = {
+                "Type": [label.strip("[]").replace("REDACTED ", "")
+                         for label in REDACTION_LABELS.values()],
+                "Count": [stats.get(f"{redaction_type}_count", 0) for redaction_type in REDACTION_LABELS]
+            }
+            st.bar_chart(chart_data, x="Type", y="Count")
+    
+    def render_download_section(self, output_pdf, output_word):
+        """
+        Render download buttons
+        
+        Args:
+            output_pdf: PDF export as a LazyExport, bytes or file path
+            output_word: Word export as a LazyExport, bytes or file path
+        """
+        st.markdown("### 💾 Download Files")
+        
+        download_col1, download_col2 = st.columns(2)
+        
+        with download_col1:
+            pdf_data = self._download_data(output_pdf)
+            if pdf_data is not None:
+                st.download_button(
+                    "📄 Download Redacted PDF",
+                    pdf_data,
+                    file_name="redacted_document.pdf",
+                    mime="application/pdf",
+                    on_click="ignore",
+                    use_container_width=True
+                )
+            else:
+                st.warning(
+                    "⚠️ The redacted PDF could not be created. With the original layout kept, "
+                    "this happens when redacted text cannot be found in the PDF; turn off "
+                    "'Keep original layout in PDF' for a re-typeset copy."
+                )
+        
+        with download_col2:
+            word_data = self._download_data(output_word)
+            if word_data is not None:
+                st.download_button(
+                    "📝 Download Word Document",
+                    word_data,
+                    file_name="redacted_document.docx",
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    on_click="ignore",
+                    use_container_width=True
+                )
+    
+    def _download_data(self, output):
+        """
+        Turn an export into download button data
+        
+        LazyExport objects are passed through as callables, so Streamlit
+        only renders the file when its button is clicked; exports that
+        were already rendered and failed give None.
+        """
+        if callable(output):
+            return None if output.ready and output() is None else output
+        if output is None or isinstance(output, bytes):
+            return output
+        if os.path.exists(output):
+            with open(output, "rb") as f:
+                return f.read()
+        return None
+    
+    def render_tips_section(self):
+        """Render tips and information cards"""
+        st.markdown("### 💡 Tips")
+        
+        st.markdown("""
+        <div class="feature-card">
+            <h4>🎯 Best Practices</h4>
+            <ul>
+                <li>Ensure PDF text is selectable</li>
+                <li>Review redacted output carefully</li>
+                <li>Use conservative mode for higher accuracy</li>
+                <li>Check download files before sharing</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("""
+        <div class="feature-card">
+            <h4>🔍 What Gets Redacted</h4>
+            <ul>
+                <li><strong>SSN:</strong> XXX-XX-XXXX format</li>
+                <li><strong>Credit Cards:</strong> 16-digit numbers</li>
+                <li><strong>Addresses:</strong> Street addresses</li>
+                <li><strong>ZIP Codes:</strong> 5 or 9-digit codes</li>
+                <li><strong>Names:</strong> People and organizations (optional)</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("""
+        <div class="feature-card">
+            <h4>⚠️ Limitations</h4>
+            <ul>
+                <li>OCR quality affects accuracy in Streamlit(CPU Only)</li>
+                <li>Handwritten text may not be detected</li>
+                <li>Complex layouts may cause issues</li>
+                <li>Always manual review recommended</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    def render_footer(self):
+        """Render footer with credits"""
+        st.markdown("""
+        <div class="footer">
+            <hr>
+            <p>🚀 Made with ❤️ by <strong><a href="https://www.linkedin.com/in/shagatomte19/" target="_blank">Enamul Hasan Shagato</a></strong></p>
+            <p><small>🔒 DocShield | Protecting Your Privacy</small></p>
+        </div>
+
+        """, unsafe_allow_html=True)
+
@@ -1,19 +1,19 @@
-"""
-Utility functions and helpers for Document Redaction System
-"""
-
-from .helpers import (
-    DocumentProcessor,
-    validate_file_upload,
-    format_file_size,
-    get_redaction_mode_description,
-    log_processing_step
-)
-
-__all__ = [
-    'DocumentProcessor',
-    'validate_file_upload',
-    'format_file_size',
-    'get_redaction_mode_description',
-    'log_processing_step'
+"""
+Utility functions and helpers for Document Redaction System
+"""
+
+from .helpers import (
+    DocumentProcessor,
+    validate_file_upload,
+    format_file_size,
+    get_redaction_mode_description,
+    log_processing_step
+)
+
+__all__ = [
+    'DocumentProcessor',
+    'validate_file_upload',
+    'format_file_size',
+    'get_redaction_mode_description',
+    'log_processing_step'
 ]
\ No newline at end of file
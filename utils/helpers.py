@@ -1,121 +1,459 @@
-"""
-Utility functions and helpers for the document redaction system
-"""
-
-import streamlit as st
-from core.ocr_processor import OCRProcessor
-from core.redactor import TextRedactor
-from core.file_handler import FileHandler
-
-class DocumentProcessor:
-    """Main document processing orchestrator"""
-    
-    def __init__(self):
-        self.ocr_processor = OCRProcessor()
-        self.text_redactor = TextRedactor()
-        self.file_handler = FileHandler()
-    
-    def process_document(self, pdf_file, redaction_mode="conservative"):
-        """
-        Complete document processing pipeline
-        
-        Args:
-            pdf_file: Streamlit file upload object
-            redaction_mode: "conservative" or "aggressive"
-            
-        Returns:
-            tuple: (redacted_text, output_pdf, output_word, stats)
-        """
-        try:
-            # Extract text from PDF
-            extracted_text = self.ocr_processor.process_pdf(pdf_file)
-            
-            if not extracted_text or not extracted_text.strip():
-                return None, None, None, None
-            
-            # Determine redaction mode
-            mode = "conservative" if "Conservative" in redaction_mode else "aggressive"
-            
-            # Redact sensitive information
-            redacted_text = self.text_redactor.redact_text(extracted_text, mode=mode)
-            
-            # Get redaction statistics
-            stats = self.text_redactor.get_redaction_stats(redacted_text)
-            
-            # Create output files
-            output_pdf, output_word = self.file_handler.create_output_files(redacted_text)
-            
-            return redacted_text, output_pdf, output_word, stats
-            
-        except Exception as e:
-            st.error(f"Error processing document: {str(e)}")
-            return None, None, None, None
-
-def validate_file_upload(uploaded_file, max_size_mb=50):
-    """
-    Validate uploaded file
-    
-    Args:
-        uploaded_file: Streamlit file upload object
-        max_size_mb: Maximum file size in MB
-        
-    Returns:
-        bool: True if valid, False otherwise
-    """
-    if uploaded_file is None:
-        return False
-    
-    # Check file size
-    file_size_mb = len(uploaded_file.getvalue()) / (1024 * 1024)
-    if file_size_mb > max_size_mb:
-        st.error(f"File size ({file_size_mb:.1f} MB) exceeds maximum allowed size ({max_size_mb} MB)")
-        return False
-    
-    # Check file type
-    if not uploaded_file.name.lower().endswith('.pdf'):
-        st.error("Please upload a PDF file")
-        return False
-    
-    return True
-
-def format_file_size(size_bytes):
-    """
-    Format file size in human readable format
-    
-    Args:
-        size_bytes: Size in bytes
-        
-    Returns:
-        str: Formatted size string
-    """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} TB"
-
-def get_redaction_mode_description(mode):
-    """
-    Get description for redaction mode
-    
-    Args:
-        mode: Redaction mode string
-        
-    Returns:
-        str: Mode description
-    """
-    if "Conservative" in mode:
-        return "Only redacts explicitly labeled sensitive data (SSN:, Credit Card:, Address:)"
-    else:
-        return "Uses pattern matching to detect unlabeled sensitive information"
-
-def log_processing_step(step_name, details=""):
-    """
-    Log processing step (for debugging)
-    
-    Args:
-        step_name: Name of the processing step
-        details: Additional details
-    """
-    # For debugging purposes - can be extended to write to logs
-    print(f"[PROCESSING] {step_name}: {details}")
\ No newline at end of file
+"""
+Utility functions and helpers for the document redaction system
+"""
+
+import io
+import os
+import json
+import logging
+from core.reporting import report_error
+from core.jobs import JobCancelled
+from core.profiling import NULL_PROFILER, StageProfiler
+from core.ocr_processor import OCRProcessor
+from core.redactor import TextRedactor
+from core.file_handler import FileHandler
+from core.pdf_redactor import PDFRedactor
+from core.ingest import upload_size, looks_like_pdf, document_digest
+from core.stage_cache import StageCache, STAGE_EXTRACT, STAGE_REDACT, STAGE_EXPORT
+from config.settings import (
+    PIPELINE_PAGE_WINDOW, PROFILING_ENABLED, PROFILE_OUTPUT_DIR, PDF_OUTPUT_MODE,
+    MAX_FILE_SIZE_MB, NER_ENABLED, NER_BATCH_SIZE, OCR_PROFILE
+)
+
+class DocumentProcessor:
+    """Main document processing orchestrator"""
+    
+    def __init__(self, page_window=PIPELINE_PAGE_WINDOW, **ocr_options):
+        self.ocr_processor = OCRProcessor(**ocr_options)
+        self.text_redactor = TextRedactor()
+        self.file_handler = FileHandler()
+        self.page_window = page_window
+        self.profiler = NULL_PROFILER
+        self.spans = []  # RedactionSpan records of the last document
+        self._ner_detector = None
+    
+    @property
+    def ner_detector(self):
+        """NER detector, created on first use so spaCy is only imported when enabled"""
+        if self._ner_detector is None:
+            from core.ner_detector import NERDetector
+            self._ner_detector = NERDetector()
+        return self._ner_detector
+    
+    def iter_redacted_pages(self, pdf_file, mode="conservative", ner=False, pages=None,
+                            progress=None):
+        """
+        Stream a document through extraction and redaction one page at a time
+        
+        Each page is rendered, OCR'd (or read from its text layer) and
+        redacted before later pages are rendered; at most ``page_window``
+        rendered pages are held in memory. With NER on, extracted pages are
+        collected into batches of NER_BATCH_SIZE for the entity detector.
+        
+        Args:
+            pdf_file: Streamlit file upload object
+            mode: "conservative" or "aggressive"
+            ner (bool): Also detect names and organizations with spaCy
+            pages (list): Already extracted pages to redact instead of
+                extracting pdf_file
+            progress (callable): Passed to OCRProcessor.iter_pages, which
+                reports pages as they are extracted; unused with pages
+            
+        Yields:
+            tuple: (page, redacted_text, spans) where page is the ExtractedPage
+                and spans are RedactionSpan records with offsets into page.text
+        """
+        if pages is None:
+            pages = self.ocr_processor.iter_pages(pdf_file, window=self.page_window,
+                                                  progress=progress)
+        if not ner:
+            for page in pages:
+                yield self._redact_page(page, mode)
+            return
+        
+        self.ner_detector.reset()
+        batch = []
+        for page in pages:
+            batch.append(page)
+            if len(batch) == NER_BATCH_SIZE:
+                yield from self._redact_batch(batch, mode)
+                batch = []
+        yield from self._redact_batch(batch, mode)
+    
+    def _redact_page(self, page, mode, entity_spans=None):
+        """Redact one extracted page for iter_redacted_pages"""
+        with self.profiler.stage(f"redact-page-{page.page_num + 1}"):
+            redacted_page, spans = self.text_redactor.redact_with_spans(
+                page.text, mode=mode, page_num=page.page_num, regions=page.regions,
+                entity_spans=entity_spans
+            )
+        return page, redacted_page, spans
+    
+    def _redact_batch(self, pages, mode):
+        """Run the NER detector over a batch of pages, then redact each page"""
+        if not pages:
+            return
+        with self.profiler.stage(f"ner-pages-{pages[0].page_num + 1}-{pages[-1].page_num + 1}"):
+            entity_spans = self.ner_detector.find_spans(
+                [page.text for page in pages], [page.page_num for page in pages]
+            )
+        for page, page_entities in zip(pages, entity_spans):
+            yield self._redact_page(page, mode, page_entities)
+    
+    def process_document(self, pdf_file, redaction_mode="conservative", profile=PROFILING_ENABLED,
+                         pdf_output=PDF_OUTPUT_MODE, export="files", progress=None,
+                         ner=NER_ENABLED, stage_cache=None):
+        """
+        Complete document processing pipeline
+        
+        Args:
+            pdf_file: Streamlit file upload object
+            redaction_mode: "conservative" or "aggressive"
+            profile (bool): Save CPU and allocation profiles of every stage
+                under PROFILE_OUTPUT_DIR
+            pdf_output (str): "retypeset" to typeset the redacted text into a new
+                PDF, "in_place" to black out detected spans in the original PDF
+            export (str): "files" for temporary file paths, "memory" for bytes,
+                "lazy" for LazyExport objects rendered on first download
+            progress (callable): Called as progress(pages_done, total_pages)
+                as pages are extracted; may raise JobCancelled to stop processing
+            ner (bool): Also redact names and organizations with the spaCy
+                detector; only used in aggressive mode
+            stage_cache (StageCache): Session memo of stage outputs; stages
+                whose inputs have not changed since an earlier call are reused
+            
+        Returns:
+            tuple: (redacted_text, output_pdf, output_word, stats); the
+                redaction records are kept in ``self.spans``
+        """
+        self.spans = []
+        try:
+            # Determine redaction mode
+            mode = "conservative" if "Conservative" in redaction_mode else "aggressive"
+            
+            if profile:
+                document_name = os.path.basename(getattr(pdf_file, "name", "document"))
+                self.profiler = StageProfiler(PROFILE_OUTPUT_DIR, document_name)
+                self.ocr_processor.profiler = self.profiler
+            try:
+                ner = ner and mode == "aggressive"
+                result = self._run_pipeline(pdf_file, mode, pdf_output, export, progress, ner,
+                                            stage_cache)
+                log_redaction_audit(getattr(pdf_file, "name", "document"), self.spans)
+                return result
+            finally:
+                if self.profiler.enabled:
+                    log_processing_step("Profile saved", self.profiler.finish())
+                self.profiler = NULL_PROFILER
+                self.ocr_processor.profiler = NULL_PROFILER
+            
+        except JobCancelled:
+            raise
+        except Exception as e:
+            report_error(f"Error processing document: {str(e)}")
+            return None, None, None, None
+    
+    def extract_key(self, pdf_file):
+        """
+        Stage cache key of a document's extraction under this processor's OCR settings
+        
+        Args:
+            pdf_file: SpooledDocument, path or binary file object
+            
+        Returns:
+            tuple: Extraction stage key
+        """
+        return StageCache.make_key(STAGE_EXTRACT, document_digest(pdf_file),
+                                   *self.ocr_processor.extraction_key)
+    
+    def stage_keys(self, pdf_file, mode, ner, pdf_output, export):
+        """
+        Stage cache keys of a document under the given options
+        
+        Args:
+            pdf_file: SpooledDocument, path or binary file object
+            mode (str): "conservative" or "aggressive"
+            ner (bool): Whether NER is applied
+            pdf_output (str): "retypeset" or "in_place"
+            export (str): "files", "memory" or "lazy"
+            
+        Returns:
+            tuple: (extract_key, redact_key, export_key)
+        """
+        extract_key = self.extract_key(pdf_file)
+        redact_key = StageCache.make_key(STAGE_REDACT, extract_key, mode, ner)
+        return extract_key, redact_key, StageCache.make_key(STAGE_EXPORT, redact_key, pdf_output, export)
+    
+    def _run_pipeline(self, pdf_file, mode, pdf_output, export, progress, ner=False,
+                      stage_cache=None):
+        """Run extraction, redaction and export for process_document"""
+        if stage_cache is None:
+            redaction = self._redact_document(pdf_file, mode, pdf_output, progress, ner)
+            self.spans = redaction["spans"]
+            if redaction["redacted_text"] is None:
+                return None, None, None, None
+            output_pdf, output_word = self._export(pdf_file, redaction, pdf_output, export)
+            return redaction["redacted_text"], output_pdf, output_word, redaction["stats"]
+        
+        # Memoized: each stage is looked up under a key of the document hash
+        # and the options of that stage and the ones before it
+        extract_key, redact_key, export_key = self.stage_keys(pdf_file, mode, ner, pdf_output, export)
+        reused = []
+        redaction = stage_cache.get(redact_key)
+        if redaction is None:
+            extraction = stage_cache.get(extract_key)
+            if extraction is not None:
+                reused.append(STAGE_EXTRACT)
+            redaction = self._redact_document(pdf_file, mode, pdf_output, progress, ner,
+                                              extraction, keep_pages=True)
+            if extraction is None:
+                stage_cache.put(extract_key, redaction["extraction"])
+            stage_cache.put(redact_key, redaction)
+        else:
+            reused += [STAGE_EXTRACT, STAGE_REDACT]
+        self.spans = list(redaction["spans"])
+        if redaction["redacted_text"] is None:
+            return None, None, None, None
+        
+        # Exports written to files are handed over to the caller, so only
+        # in-memory and lazy exports are memoized
+        outputs = stage_cache.get(export_key) if export != "files" else None
+        if outputs is None:
+            outputs = self._export(pdf_file, redaction, pdf_output, export)
+            if export != "files":
+                stage_cache.put(export_key, outputs)
+        else:
+            reused.append(STAGE_EXPORT)
+        stats = dict(redaction["stats"], reused_stages=reused)
+        return redaction["redacted_text"], outputs[0], outputs[1], stats
+    
+    def _redact_document(self, pdf_file, mode, pdf_output, progress, ner, extraction=None,
+                         keep_pages=False):
+        """
+        Extraction and redaction stages of _run_pipeline
+        
+        Args:
+            extraction (dict): Memoized extraction stage ({"pages", "stats"});
+                None to extract pdf_file
+            keep_pages (bool): Keep the extracted pages and their spans for
+                later runs; otherwise only redacted text (and, for in-place
+                output, the located redaction areas) is kept
+        
+        Returns:
+            dict: redacted_text (None if the document has no text),
+                redacted_pages, spans, stats, pdf_redactor (in-place output only), and with
+                keep_pages page_spans ((page, spans) per page) and the
+                extraction stage output
+        """
+        pages = extraction["pages"] if extraction is not None else None
+        pdf_redactor = PDFRedactor(scale=72 / self.ocr_processor.dpi) if pdf_output == "in_place" else None
+        redacted_pages = []
+        page_spans = []
+        all_spans = []
+        has_text = False
+        for page, redacted_page, spans in self.iter_redacted_pages(pdf_file, mode, ner, pages,
+                                                                   progress):
+            has_text = has_text or bool(page.text.strip())
+            redacted_pages.append(redacted_page)
+            all_spans.extend(spans)
+            if keep_pages:
+                page_spans.append((page, spans))
+            if pdf_redactor is not None:
+                pdf_redactor.add_page(page, spans)
+            # Extraction reports its own progress, and checks for
+            # cancellation, as pages are read
+            if progress is not None and pages is not None:
+                progress(page.page_num + 1, len(pages))
+        
+        if extraction is None:
+            extraction = {"pages": [page for page, _ in page_spans] if keep_pages else None,
+                          "stats": self.ocr_processor.get_extraction_stats()}
+        redaction = {
+            "redacted_text": "\n".join(redacted_pages) if has_text else None,
+            "redacted_pages": redacted_pages,
+            "spans": all_spans,
+            "page_spans": page_spans,
+            "pdf_redactor": pdf_redactor,
+            "extraction": extraction if keep_pages else None
+        }
+        
+        # Get redaction statistics
+        stats = self.text_redactor.get_redaction_stats(all_spans)
+        stats.update(extraction["stats"])
+        if ner:
+            stats.update(self.ner_detector.get_stats())
+        redaction["stats"] = stats
+        return redaction
+    
+    def _export(self, pdf_file, redaction, pdf_output, export):
+        """Export stage of _run_pipeline; returns (output_pdf, output_word)"""
+        # Text exports keep the source page breaks
+        redacted_pages = redaction["redacted_pages"]
+        original = None
+        if pdf_output == "in_place":
+            pdf_redactor = redaction["pdf_redactor"]
+            if pdf_redactor is None:
+                # Redaction memoized for the other layout: locate its spans on the kept pages
+                pdf_redactor = PDFRedactor(scale=72 / self.ocr_processor.dpi)
+                for page, spans in redaction["page_spans"]:
+                    pdf_redactor.add_page(page, spans)
+            original = (pdf_file, pdf_redactor)
+        
+        # Create output files
+        in_memory = export != "files"
+        if export == "lazy":
+            return self.file_handler.create_lazy_exports(redacted_pages, original)
+        if self.profiler.enabled:
+            # One export at a time so each gets its own profile
+            with self.profiler.stage("export-pdf"):
+                if original is not None:
+                    output_pdf = self.file_handler.export_redacted_original(*original, in_memory=in_memory)
+                else:
+                    output_pdf = self.file_handler.export_to_pdf(redacted_pages, in_memory=in_memory)
+            with self.profiler.stage("export-word"):
+                output_word = self.file_handler.export_to_word(redacted_pages, in_memory=in_memory)
+            return output_pdf, output_word
+        return self.file_handler.create_output_files(
+            redacted_pages, in_memory=in_memory, original=original
+        )
+
+def process_document_job(job, pdf_data, file_name, redaction_mode, ocr_profile=OCR_PROFILE, **options):
+    """
+    Process an uploaded document as a background job
+    
+    Args:
+        job (Job): Running job, used for progress reports and cancellation
+        pdf_data: Uploaded PDF as bytes, a SpooledDocument or a binary file object
+        file_name (str): Uploaded file name
+        redaction_mode: "conservative" or "aggressive"
+        ocr_profile (str): OCR engine profile, a key of OCR_PROFILES
+        **options: Extra process_document arguments (pdf_output, export, ner,
+            stage_cache)
+        
+    Returns:
+        dict: redacted_text, output_pdf, output_word and stats from
+            process_document, plus the document's RedactionSpan records
+    """
+    pdf_file = io.BytesIO(pdf_data) if isinstance(pdf_data, bytes) else pdf_data
+    if isinstance(pdf_file, io.BytesIO):
+        pdf_file.name = file_name
+    processor = DocumentProcessor(ocr_profile=ocr_profile)
+    return _document_result(processor, processor.process_document(
+        pdf_file, redaction_mode, progress=job.report_progress, **options
+    ))
+
+def reprocess_document(pdf_file, redaction_mode, stage_cache, ocr_profile=OCR_PROFILE, **options):
+    """
+    Re-run an already processed document with new options, without OCR
+    
+    Runs in the caller's thread: with the extraction memoized only
+    redaction and export run, which takes milliseconds per page.
+    
+    Args:
+        pdf_file: SpooledDocument the document was processed from
+        redaction_mode: "conservative" or "aggressive"
+        stage_cache (StageCache): Session memo the document was processed with
+        ocr_profile (str): OCR engine profile, a key of OCR_PROFILES
+        **options: Extra process_document arguments (pdf_output, export, ner)
+        
+    Returns:
+        dict: Result like process_document_job, or None if the document has
+            not been extracted with these OCR settings and needs a new job
+    """
+    processor = DocumentProcessor(ocr_profile=ocr_profile)
+    if processor.extract_key(pdf_file) not in stage_cache:
+        return None
+    return _document_result(processor, processor.process_document(
+        pdf_file, redaction_mode, stage_cache=stage_cache, **options
+    ))
+
+def _document_result(processor, outputs):
+    """Package process_document outputs and spans for job results"""
+    redacted_text, output_pdf, output_word, stats = outputs
+    return {
+        "redacted_text": redacted_text,
+        "output_pdf": output_pdf,
+        "output_word": output_word,
+        "stats": stats,
+        "spans": processor.spans
+    }
+
+def validate_file_upload(uploaded_file, max_size_mb=MAX_FILE_SIZE_MB):
+    """
+    Validate uploaded file from its size metadata and header bytes
+    
+    Args:
+        uploaded_file: Streamlit file upload object
+        max_size_mb: Maximum file size in MB
+        
+    Returns:
+        bool: True if valid, False otherwise
+    """
+    if uploaded_file is None:
+        return False
+    
+    # Check file size
+    file_size_mb = upload_size(uploaded_file) / (1024 * 1024)
+    if file_size_mb > max_size_mb:
+        report_error(f"File size ({file_size_mb:.1f} MB) exceeds maximum allowed size ({max_size_mb} MB)")
+        return False
+    
+    # Check file type
+    if not uploaded_file.name.lower().endswith('.pdf') or not looks_like_pdf(uploaded_file):
+        report_error("Please upload a PDF file")
+        return False
+    
+    return True
+
+def format_file_size(size_bytes):
+    """
+    Format file size in human readable format
+    
+    Args:
+        size_bytes: Size in bytes
+        
+    Returns:
+        str: Formatted size string
+    """
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.1f} TB"
+
+def get_redaction_mode_description(mode):
+    """
+    Get description for redaction mode
+    
+    Args:
+        mode: Redaction mode string
+        
+    Returns:
+        str: Mode description
+    """
+    if "Conservative" in mode:
+        return "Only redacts explicitly labeled sensitive data (SSN:, Credit Card:, Address:)"
+    else:
+        return "Uses pattern matching to detect unlabeled sensitive information"
+
+def log_processing_step(step_name, details=""):
+    """
+    Log processing step (for debugging)
+    
+    Args:
+        step_name: Name of the processing step
+        details: Additional details
+    """
+    logging.getLogger("docshield").info(f"[PROCESSING] {step_name}: {details}")
+
+def log_redaction_audit(document_name, spans):
+    """
+    Log one audit entry per redaction, without the redacted values
+    
+    Args:
+        document_name: Name of the processed document
+        spans: RedactionSpan records of the document
+    """
+    logger = logging.getLogger("docshield.audit")
+    for span in spans:
+        logger.info(json.dumps({"document": document_name, **span.to_dict()}))
\ No newline at end of file